@@ -1,297 +1,538 @@
 import numpy as np
-from utils import Point
+from utils import Point, Profile, Checkpoint, eval_vectorized
+from autodiff import AutoDiff
 from typing import Callable, Any
-import itertools
+from concurrent.futures import Executor
+from dataclasses import dataclass
+import contextlib
+import functools
+import inspect
 import math
+import time
+import steps
+from steps import BRUTE_FORCE_BLOCK_SIZE, get_init_points_gr, get_fixed_init_points
+
+# the iterative methods run the generators of steps, so the same code serves algos, async_algos and portfolio
+
+@contextlib.contextmanager
+def _running(profile: Profile):
+  start = time.perf_counter()
+  profile.running = True
+  try:
+    yield
+  finally:
+    profile.running = False
+    profile.wall_time = time.perf_counter() - start
+
+def _profiled(method):
+  """
+  handles the profile= keyword of a method (or a coroutine function): counts calls of f, fd1 and fd2
+  and measures the wall time, iterations are reported by the method itself. A method called with the profile
+  of a running method reports its iterations into that run, its f is already counted
+  """
+  signature = inspect.signature(method)
+
+  def wrap(profile: Profile, args, kwargs)->inspect.BoundArguments:
+    profile.reset(method=method.__name__)
+
+    bound = signature.bind(*args, **kwargs)
+    autodiffs = {}
+    for name in ('f', 'fd1', 'fd2'):
+      arg = bound.arguments.get(name)
+      if isinstance(arg, AutoDiff):
+        # evaluations of the objective are counted, one per jet
+        if id(arg) not in autodiffs:
+          autodiffs[id(arg)] = AutoDiff(profile.wrap(f=arg.func, name='f'))
+        bound.arguments[name] = autodiffs[id(arg)]
+      elif arg is not None:
+        bound.arguments[name] = profile.wrap(f=arg, name=name)
+
+    return bound
+
+  if inspect.iscoroutinefunction(method):
+    @functools.wraps(method)
+    async def async_wrapper(*args, **kwargs):
+      profile = kwargs.get('profile')
+      if profile is None or profile.running:
+        return await method(*args, **kwargs)
+
+      bound = wrap(profile=profile, args=args, kwargs=kwargs)
+      with _running(profile):
+        return await method(*bound.args, **bound.kwargs)
+
+    return async_wrapper
+
+  @functools.wraps(method)
+  def wrapper(*args, **kwargs):
+    profile = kwargs.get('profile')
+    if profile is None or profile.running:
+      return method(*args, **kwargs)
+
+    bound = wrap(profile=profile, args=args, kwargs=kwargs)
+    with _running(profile):
+      return method(*bound.args, **bound.kwargs)
+
+  return wrapper
+
+def _checkpointed(method):
+  """
+  handles the checkpoint= keyword of a method (or a coroutine function): snapshots are taken under the method name
+  and removed when the method returns
+  """
+  if inspect.iscoroutinefunction(method):
+    @functools.wraps(method)
+    async def async_wrapper(*args, **kwargs):
+      checkpoint = kwargs.get('checkpoint')
+      if checkpoint is None:
+        return await method(*args, **kwargs)
 
-def brute_force(f: Callable[[Any], Any], a, b, eps)->Point:
-  assert a <= b
-  assert eps > 0
-
-  n = int(math.ceil((b - a) / eps))
+      checkpoint.start(method=method.__name__)
+      result = await method(*args, **kwargs)
+      checkpoint.clear()
 
-  x = np.linspace(a, b, n + 1, endpoint=True)
-  y = np.array([f(el) for el in x])
+      return result
 
-  ind_min = np.argmin(y)
+    return async_wrapper
 
-  return Point(x=x[ind_min], y=y[ind_min])
+  @functools.wraps(method)
+  def wrapper(*args, **kwargs):
+    checkpoint = kwargs.get('checkpoint')
+    if checkpoint is None:
+      return method(*args, **kwargs)
 
-def bitwise_search(f: Callable[[Any], Any], a, b, eps, get_init_delta=lambda: 0.25)->Point:
-  assert a <= b
-  assert eps > 0
+    checkpoint.start(method=method.__name__)
+    result = method(*args, **kwargs)
+    checkpoint.clear()
 
-  delta1 = get_init_delta()
-  assert delta1 > eps
-  points = {}
+    return result
 
-  while True:
-    def get_f(x):
-      if x in points:
-        return points[x]
-      else:
-        return f(x)
+  return wrapper
 
-    f_curr = get_f(a)
-    points[a] = f_curr
+@_profiled
+@_checkpointed
+def brute_force(f: Callable[[Any], Any], a, b, eps, vectorized=False, block_size=None,
+                executor: Executor | None=None, chunk_size=None,
+                *, profile: Profile | None=None, checkpoint: Checkpoint | None=None)->Point:
+  """
+  :param vectorized: call f on whole chunks of the grid, falls back to per-element calls if f rejects arrays
+  :param block_size: number of grid points evaluated at once, BRUTE_FORCE_BLOCK_SIZE by default
+  :param executor: if set, every block is split into chunks evaluated by it (f must be picklable for a process pool)
+  :param chunk_size: number of grid points per task of executor, about 4 tasks per cpu by default
+  :param checkpoint: a snapshot holds the minimum of the done blocks
+  """
+  return steps.run(steps.brute_force_steps(f=f, a=a, b=b, eps=eps, block_size=block_size, profile=profile, checkpoint=checkpoint),
+                   vectorized=vectorized, executor=executor, chunk_size=chunk_size)
 
-    x = a + delta1
+@_profiled
+def multires_brute_force(f: Callable[[Any], Any], a, b, eps, coarse_eps=None, top_k: int=3, refine=None,
+                         vectorized=False, *, profile: Profile | None=None)->Point:
+  """
+  brute force on a coarse grid, then the top_k lowest local minima of the grid are refined by a bracketing method
+  within their neighbouring nodes, so a basin costs O(log(coarse_eps / eps)) evaluations instead of O(coarse_eps / eps)
+  :param coarse_eps: step of the coarse grid, (b - a) / 100 by default; smaller steps miss fewer basins
+  :param top_k: number of basins refined
+  :param refine: 1-D method with the (f, a, b, eps) signature, golden_ratio by default
+  :param vectorized: evaluate the coarse grid by one call of f, as in brute_force
+  """
+  assert a <= b
+  assert eps > 0
+  assert top_k > 0
 
-    while x <= b:
-      f_next = get_f(x)
-      points[x] = f_next
-      if f_curr <= f_next: break
-      f_curr = f_next
-      x += delta1
+  if coarse_eps is None:
+    coarse_eps = (b - a) / 100
+  if coarse_eps <= eps:
+    return brute_force(f=f, a=a, b=b, eps=eps, vectorized=vectorized, profile=profile)
 
-    if x > b:
-      return Point(x=b, y=f_curr)
+  refine = golden_ratio if refine is None else refine
 
-    if abs(delta1) <= eps:
-      return Point(x=x-delta1, y=f_curr)
+  n = int(math.ceil((b - a) / coarse_eps))
+  x = np.linspace(a, b, n + 1, endpoint=True)
+  y = eval_vectorized(f=f, x=x) if vectorized else None
+  if y is None:
+    y = np.array([f(el) for el in x])
 
-    delta1 = -delta1 / 4
-    a = x
+  # strict on the left so a plateau gives one basin
+  is_min = np.ones(n + 1, dtype=bool)
+  is_min[1:] &= y[1:] < y[:-1]
+  is_min[:-1] &= y[:-1] <= y[1:]
+  basins = np.flatnonzero(is_min)
+  basins = basins[np.argsort(y[basins], kind='stable')[:top_k]]
 
-def dichotomy(f: Callable[[Any], Any], a, b, eps)->Point:
-  assert a <= b
-  assert eps > 0
+  ind_min = np.argmin(y)
+  min_point = Point(x=x[ind_min], y=y[ind_min])
 
-  delta = eps / 5
+  for i in basins:
+    lo, hi = x[max(i - 1, 0)], x[min(i + 1, n)]
+    basin_point = refine(f=f, a=lo, b=hi, eps=eps)
+    if basin_point.y is None:
+      basin_point = Point(x=basin_point.x, y=f(basin_point.x))
 
-  while True:
-    x1 = (b + a - delta) / 2
-    x2 = (b + a + delta) / 2
+    if profile is not None: profile.iteration(width=hi - lo)
 
-    y1 = f(x1)
-    y2 = f(x2)
+    if basin_point.y < min_point.y:
+      min_point = basin_point
 
-    if y1 <= y2:
-      b = x2
-    else:
-      a = x1
+  return min_point
 
-    eps_n = (b - a) / 2
+@_profiled
+@_checkpointed
+def bitwise_search(f: Callable[[Any], Any], a, b, eps, get_init_delta=lambda: 0.25,
+                   *, profile: Profile | None=None, checkpoint: Checkpoint | None=None)->Point:
+  """
+  scans with a step that is reversed and divided by 4 each time f stops decreasing.
+  The points lie on the grid of the last step and are stored by their index on it, so revisited points are found
+  exactly, and each pass is limited to the bracket between the stored neighbours of the best point
+  """
+  return steps.run(steps.bitwise_search_steps(f=f, a=a, b=b, eps=eps, get_init_delta=get_init_delta, profile=profile,
+                                              checkpoint=checkpoint))
+
+@_profiled
+@_checkpointed
+def dichotomy(f: Callable[[Any], Any], a, b, eps, *, profile: Profile | None=None, checkpoint: Checkpoint | None=None)->Point:
+  return steps.run(steps.dichotomy_steps(f=f, a=a, b=b, eps=eps, profile=profile, checkpoint=checkpoint))
+
+@_profiled
+@_checkpointed
+def golden_ratio(f: Callable[[Any], Any], a, b, eps, *, profile: Profile | None=None, checkpoint: Checkpoint | None=None)->Point:
+  return steps.run(steps.golden_ratio_steps(f=f, a=a, b=b, eps=eps, profile=profile, checkpoint=checkpoint))
+
+@_profiled
+@_checkpointed
+def k_section(f: Callable[[Any], Any], a, b, eps, k: int | None=None, executor: Executor | None=None,
+              *, profile: Profile | None=None, checkpoint: Checkpoint | None=None)->Point:
+  """
+  probes k equally spaced interior points per iteration and keeps the two subintervals around the best one,
+  so the interval shrinks (k+1)/2 times per iteration, k=2 is the trisection
+  :param k: number of probes per iteration, the number of CPUs by default
+  :param executor: if set, the probes of an iteration are evaluated by it concurrently
+                   (f must be picklable for a process pool)
+  """
+  return steps.run(steps.k_section_steps(f=f, a=a, b=b, eps=eps, k=k, profile=profile, checkpoint=checkpoint),
+                   executor=executor)
 
-    if eps_n <= eps: break
+def _broadcast_batch(a, b, eps)->tuple[np.ndarray, np.ndarray, np.ndarray]:
+  a, b, eps = np.broadcast_arrays(np.asarray(a, dtype=float), np.asarray(b, dtype=float), np.asarray(eps, dtype=float))
 
-  x_min = (a + b) / 2
+  assert np.all(a <= b)
+  assert np.all(eps > 0)
 
-  return Point(x=x_min, y=f(x_min))
+  return a.ravel().copy(), b.ravel().copy(), eps.ravel().copy()
 
-def golden_ratio(f: Callable[[Any], Any], a, b, eps)->Point:
-  assert a <= b
-  assert eps > 0
+@_profiled
+def dichotomy_batch(f: Callable[[np.ndarray], np.ndarray], a, b, eps, *, profile: Profile | None=None)->Point:
+  """
+  runs dichotomy on many independent intervals at once
+  :param f: vectorized objective, called on 1-d arrays of points
+  :param a, b, eps: arrays (or scalars) broadcastable to a common shape
+  :return: Point(x, y) of arrays shaped like the broadcast of a, b and eps
+  """
+  shape = np.broadcast_shapes(np.shape(a), np.shape(b), np.shape(eps))
+  a, b, eps = _broadcast_batch(a=a, b=b, eps=eps)
 
-  x1 = a + (3 - math.sqrt(5)) / 2 * (b - a)
-  x2 = a + (math.sqrt(5) - 1) / 2 * (b - a)
+  delta = eps / 5
+  idx = np.arange(a.size)
 
-  y1 = f(x1)
-  y2 = f(x2)
+  while idx.size:
+    x1 = (b[idx] + a[idx] - delta[idx]) / 2
+    x2 = (b[idx] + a[idx] + delta[idx]) / 2
 
-  tau = (math.sqrt(5) - 1) / 2
-  eps_n = (b - a) / 2
+    y1 = np.asarray(f(x1), dtype=float)
+    y2 = np.asarray(f(x2), dtype=float)
 
-  while eps_n > eps:
-    if y1 <= y2:
-      b = x2
-      x2 = x1
-      y2 = y1
-      x1 = a + b - x2
+    left = y1 <= y2
+    b[idx[left]] = x2[left]
+    a[idx[~left]] = x1[~left]
 
-      y1 = f(x1)
-    else:
-      a = x1
-      x1 = x2
-      y1 = y2
-      x2 = a + b - x1
+    eps_n = (b[idx] - a[idx]) / 2
 
-      y2 = f(x2)
+    if profile is not None: profile.iteration(width=2 * eps_n.max())
 
-    eps_n = tau * eps_n
+    idx = idx[eps_n > eps[idx]]
 
   x_min = (a + b) / 2
 
-  return Point(x=x_min, y=f(x_min))
+  return Point(x=x_min.reshape(shape), y=np.asarray(f(x_min), dtype=float).reshape(shape))
 
-def get_init_points_gr(f: Callable[[Any], Any], a, b)->list[Point]:
-  assert a <= b
+@_profiled
+def golden_ratio_batch(f: Callable[[np.ndarray], np.ndarray], a, b, eps, *, profile: Profile | None=None)->Point:
+  """
+  runs golden_ratio on many independent intervals at once
+  :param f: vectorized objective, called on 1-d arrays of points
+  :param a, b, eps: arrays (or scalars) broadcastable to a common shape
+  :return: Point(x, y) of arrays shaped like the broadcast of a, b and eps
+  """
+  shape = np.broadcast_shapes(np.shape(a), np.shape(b), np.shape(eps))
+  a, b, eps = _broadcast_batch(a=a, b=b, eps=eps)
 
   x1 = a + (3 - math.sqrt(5)) / 2 * (b - a)
   x2 = a + (math.sqrt(5) - 1) / 2 * (b - a)
 
-  y1 = f(x1)
-  y2 = f(x2)
+  y1 = np.asarray(f(x1), dtype=float)
+  y2 = np.asarray(f(x2), dtype=float)
 
-  ret_points = None
+  tau = (math.sqrt(5) - 1) / 2
+  eps_n = (b - a) / 2
 
-  if y1 <= y2:
-    ret_points = [Point(x=a, y=None), Point(x=x1, y=y1), Point(x=x2, y=y2)]
-  else:
-    ret_points = [Point(x=x1, y=y1), Point(x=x2, y=y2), Point(x=b, y=None)]
+  idx = np.flatnonzero(eps_n > eps)
 
-  assert ret_points[0].x < ret_points[1].x < ret_points[2].x
+  while idx.size:
+    left = y1[idx] <= y2[idx]
+    l, r = idx[left], idx[~left]
 
-  return ret_points
+    b[l] = x2[l]
+    x2[l] = x1[l]
+    y2[l] = y1[l]
+    x1[l] = a[l] + b[l] - x2[l]
 
-def get_fixed_init_points(*args, **kwargs):
-  return (Point(x=0.25, y=None), Point(x=0.5, y=None), Point(x=0.75, y=None))
+    a[r] = x1[r]
+    x1[r] = x2[r]
+    y1[r] = y2[r]
+    x2[r] = a[r] + b[r] - x1[r]
 
-def parabola(f: Callable[[Any], Any], a, b, eps, get_init_points=get_fixed_init_points)->Point:
-  assert a <= b
-  assert eps > 0
+    y_new = np.asarray(f(np.where(left, x1[idx], x2[idx])), dtype=float)
+    y1[l] = y_new[left]
+    y2[r] = y_new[~left]
 
-  init_points = get_init_points(f=f, a=a, b=b)
-  for i in range(len(init_points)):
-    if init_points[i].y is None:
-      init_points[i].y = f(init_points[i].x)
+    eps_n[idx] = tau * eps_n[idx]
 
-  x1, x2, x3 = init_points[0].x, init_points[1].x, init_points[2].x
-  f1, f2, f3 = init_points[0].y, init_points[1].y, init_points[2].y
-  assert x1 < x2 < x3
-  assert f1 >= f2 <= f3
+    if profile is not None: profile.iteration(width=np.max(b[idx] - a[idx]))
 
-  old_x_min = None
+    idx = idx[eps_n[idx] > eps[idx]]
 
-  while True:
-    a0 = f1
-    a1 = (f2 - f1) / (x2 - x1)
-    a2 = 1 / (x3 - x2) * ((f3 - f1) / (x3 - x1) - (f2 - f1) / (x2 - x1))
+  x_min = (a + b) / 2
 
-    x_min = 1 / 2 * (x1 + x2 - a1 / a2)
+  return Point(x=x_min.reshape(shape), y=np.asarray(f(x_min), dtype=float).reshape(shape))
 
-    if (old_x_min is not None) and (abs(old_x_min - x_min) <= eps): return Point(x=x_min, y=None)
+@_profiled
+@_checkpointed
+def parabola(f: Callable[[Any], Any], a, b, eps, get_init_points=get_fixed_init_points,
+             *, profile: Profile | None=None, checkpoint: Checkpoint | None=None)->Point:
+  return steps.run(steps.parabola_steps(f=f, a=a, b=b, eps=eps, get_init_points=get_init_points, profile=profile,
+                                        checkpoint=checkpoint))
 
-    f_min = f(x_min)
+@_profiled
+@_checkpointed
+def brent(f: Callable[[Any], Any], a, b, eps, *, profile: Profile | None=None, checkpoint: Checkpoint | None=None)->Point:
+  """
+  Brent's method: parabola steps through the three best points when they stay inside the bracket
+  and shrink it fast enough, golden ratio steps otherwise
+  :return: Point(x, f(x)) with x within eps of the local min in [a, b]
+  """
+  return steps.run(steps.brent_steps(f=f, a=a, b=b, eps=eps, profile=profile, checkpoint=checkpoint))
 
-    if x_min < x2:
-      if f_min >= f2:
-        x1 = x_min
-        f1 = f_min
-      else:
-        x3 = x2
-        f3 = f2
-        x2 = x_min
-        f2 = f_min
+@_profiled
+@_checkpointed
+def midpoint(f: Callable[[Any], Any] | AutoDiff, a, b, eps, *, profile: Profile | None=None, checkpoint: Checkpoint | None=None)->Point:
+  """
+  solves f(x) = 0, f is usually the derivative of the objective; for AutoDiff(objective) its fd1 is used
+  """
+  return steps.run(steps.midpoint_steps(f=f, a=a, b=b, eps=eps, profile=profile, checkpoint=checkpoint))
 
-    else:
-      if f_min < f2:
-        x1 = x2
-        f1 = f2
-        x2 = x_min
-        f2 = f_min
-      else:
-        x3 = x_min
-        f3 = f_min
+@_profiled
+@_checkpointed
+def chord(f: Callable[[Any], Any] | AutoDiff, a, b, eps, *, profile: Profile | None=None, checkpoint: Checkpoint | None=None)->Point:
+  """
+  solves f(x) = 0, f is usually the derivative of the objective; for AutoDiff(objective) its fd1 is used
+  """
+  return steps.run(steps.chord_steps(f=f, a=a, b=b, eps=eps, profile=profile, checkpoint=checkpoint))
 
-    old_x_min = x_min
+@_profiled
+@_checkpointed
+def newton(fd1: Callable[[Any], Any] | AutoDiff, fd2: Callable[[Any], Any] | None,
+           x0: Any,	eps, use_tau=False, f=None, kmax: int=1000,
+           *, profile: Profile | None=None, checkpoint: Checkpoint | None=None) -> Point:
+  """
+  solves f'(x) = 0 by Newton's method with precision eps
+  :param fd1: f', or AutoDiff(f) to get f' and f'' from one evaluation of f
+  :param fd2: f'', None if fd1 is AutoDiff
+  :param x0: starting point
+  :param eps: precision wanted
+  :param f: f for the Marquardt method, may be the same AutoDiff as fd1
+  :return: root Point(x, y) of f'(x) = 0
+  """
+  return steps.run(steps.newton_steps(fd1=fd1, fd2=fd2, x0=x0, eps=eps, use_tau=use_tau, f=f, kmax=kmax, profile=profile,
+                                      checkpoint=checkpoint))
 
-def midpoint(f: Callable[[Any], Any], a, b, eps)->Point:
-  assert a <= b
+@dataclass
+class NewtonBatchResult:
+  """
+  :param converged: lanes where |f'| <= eps was achieved
+  :param diverged: lanes stopped because x or the step became non-finite or a division by zero,
+                   the lanes that are neither hit kmax
+  """
+  x: np.ndarray
+  y: np.ndarray | None
+  converged: np.ndarray
+  diverged: np.ndarray
+  iterations: np.ndarray
+
+@_profiled
+def newton_batch(fd1: Callable[[np.ndarray], np.ndarray] | AutoDiff, fd2: Callable[[np.ndarray], np.ndarray] | None,
+                 x0, eps, use_tau=False, f=None, kmax: int=1000, *, profile: Profile | None=None) -> NewtonBatchResult:
+  """
+  runs newton from every starting point of x0 at once, each lane keeps its own τ and μ
+  :param fd1, fd2, f: vectorized, called on 1-d arrays of points; fd1 (fd2=None) and f may be AutoDiff as in newton
+  :return: per lane x, y (None if f is None), whether |f'| <= eps was achieved, whether it diverged
+           and the number of iterations; lanes where newton would raise ValueError have converged == False
+  """
   assert eps > 0
 
-  while True:
-    x_mid = (a + b) / 2
-    f_mid = f(x_mid)
+  if isinstance(fd1, AutoDiff):
+    fd1, fd2 = fd1.fd1, fd1.fd2
+  if isinstance(f, AutoDiff):
+    f = f.f
+
+  x0 = np.asarray(x0, dtype=float)
+  x = x0.ravel().copy()
+  y = np.asarray(f(x), dtype=float) if f is not None else None
+  tau = np.ones_like(x)
+  mu = np.zeros_like(x)
+  converged = np.zeros(x.shape, dtype=bool)
+  diverged = np.zeros(x.shape, dtype=bool)
+  iterations = np.zeros(x.shape, dtype=int)
+  idx = np.arange(x.size)
+
+  while idx.size:
+    x_i = x[idx]
+    yd1 = np.asarray(fd1(x_i), dtype=float)
+    yd2 = np.asarray(fd2(x_i), dtype=float)
+
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+      # a lane fails where the scalar method divides by zero
+      failed = np.zeros(idx.shape, dtype=bool)
 
-    if abs(f_mid) <= eps:
-      return Point(x=x_mid, y=None)
+      if use_tau:
+        failed |= yd2 == 0
+        x_tau = np.where(failed, x_i, x_i - yd1 / yd2)
+        yd1_tau = np.asarray(fd1(x_tau), dtype=float)
+        tau_denom = yd1**2 + yd1_tau**2
+        failed |= tau_denom == 0
+        tau[idx] = np.where(failed, tau[idx], yd1**2 / tau_denom)
 
-    if f_mid > 0:
-      b = x_mid
-    else:
-      a = x_mid
+      if f is not None:
+        mu[idx] = np.where(mu[idx] == 0, yd2 * 10, mu[idx])
 
-def chord(f: Callable[[Any], Any], a, b, eps)->Point:
-  assert a <= b
-  assert eps > 0
+      denom = yd2 + mu[idx]
+      failed |= denom == 0
+      x_new = x_i - tau[idx] * yd1 / denom
+      failed |= ~np.isfinite(x_new)
 
-  fa = f(a)
-  fb = f(b)
+    diverged[idx[failed]] = True
+    ok = ~failed
+    idx, yd1, x_new = idx[ok], yd1[ok], x_new[ok]
 
-  while True:
-    x_tilda = a - fa / (fa - fb) * (a - b)
+    if f is not None:
+      y_new = np.asarray(f(x_new), dtype=float)
+      mu[idx] = np.where(y_new < y[idx], mu[idx] / 2, mu[idx] * 2)
+      y[idx] = y_new
 
-    fx = f(x_tilda)
+    if profile is not None: profile.iteration(width=np.max(np.abs(x_new - x[idx]), initial=0))
 
-    if abs(fx) <= eps:
-      return Point(x=x_tilda, y=None)
+    x[idx] = x_new
+    iterations[idx] += 1
 
-    if fx > 0:
-      b = x_tilda
-      fb = fx
-    else:
-      a = x_tilda
-      fa = fx
+    done = np.abs(yd1) <= eps
+    converged[idx] = done & (iterations[idx] < kmax)
 
-def newton(fd1: Callable[[Any], Any], fd2: Callable[[Any], Any],
-           x0: Any,	eps, use_tau=False, f=None, kmax: int=1000) -> Point:
-  """
-  solves f'(x) = 0 by Newton's method with precision eps
-  :param fd1: f'
-  :param fd2: f''
-  :param x0: starting point
-  :param eps: precision wanted
-  :return: root Point(x, y) of f'(x) = 0
-  """
+    idx = idx[~done & (iterations[idx] < kmax)]
 
-  assert eps > 0
+  shape = x0.shape
+  return NewtonBatchResult(
+    x=x.reshape(shape),
+    y=y.reshape(shape) if y is not None else None,
+    converged=converged.reshape(shape),
+    diverged=diverged.reshape(shape),
+    iterations=iterations.reshape(shape),
+  )
 
-  x, i = x0, 0
-  y = f(x) if f is not None else None
-  tau = 1.0
-  mu = 0
+@_profiled
+@_checkpointed
+def polygonal_chain(f: Callable[[Any], Any], a, b, eps, get_L=None, r=2.0, local=True, n_init: int=10,
+                    *, profile: Profile | None=None, checkpoint: Checkpoint | None=None)->Point:
+  """
+  :param get_L: Lipschitz constant of f on [a, b], if None it is estimated from the evaluated points:
+                globally L = r * max slope, locally (Sergeyev's local tuning) L_i = r * max(λ_i, γ_i, ξ)
+                with λ_i the max slope of the interval and its neighbours and γ_i = max slope * len_i / max len,
+                the run stops when the best value is within eps of the lowest estimated lower bound
+  :param r: safety factor (> 1) the estimated constants are multiplied by
+  :param local: estimate a constant per interval from the neighbouring slopes instead of one for [a, b]
+  :param n_init: number of evenly spaced points the estimation starts from
+  """
+  return steps.run(steps.polygonal_chain_steps(f=f, a=a, b=b, eps=eps, get_L=get_L, r=r, local=local, n_init=n_init,
+                                               profile=profile, checkpoint=checkpoint))
 
-  while i < kmax:
-    yd1 = fd1(x)
-    yd2 = fd2(x)
+@_profiled
+@_checkpointed
+def parallel_polygonal_chain(f: Callable[[Any], Any], a, b, eps, get_L, k: int | None=None, executor: Executor | None=None,
+                             *, profile: Profile | None=None, checkpoint: Checkpoint | None=None)->Point:
+  """
+  polygonal_chain with a given Lipschitz constant that evaluates the k candidates with the lowest lower bounds per round.
+  Candidates whose value is within eps of their bound are dropped, the rest are split as in polygonal_chain;
+  stops when the best value is within eps of the lowest lower bound left, so the certificate holds for any k
+  :param k: number of candidates per round, the number of CPUs by default
+  :param executor: if set, the candidates of a round are evaluated by it concurrently
+                   (f must be picklable for a process pool)
+  """
+  return steps.run(steps.parallel_polygonal_chain_steps(f=f, a=a, b=b, eps=eps, get_L=get_L, k=k, profile=profile,
+                                                        checkpoint=checkpoint), executor=executor)
 
-    try:
-      if use_tau:
-        x_tau = x - yd1 / yd2
-        yd1_tau = fd1(x_tau)
-        tau = (yd1**2) / (yd1**2 + yd1_tau**2)
+@_profiled
+def coordinate_descent(f: Callable[[np.ndarray], Any], x0, bounds, eps, line_search=golden_ratio, kmax: int=1000,
+                       vectorized=False, *, profile: Profile | None=None)->Point:
+  """
+  minimizes f of a vector by line searches along the coordinate axes in turn
+  :param x0: starting point
+  :param bounds: (a, b) for every coordinate
+  :param line_search: 1-D method with the (f, a, b, eps) signature, e.g. golden_ratio, dichotomy, brute_force
+                      or partial(parabola, get_init_points=get_init_points_gr)
+  :param eps: precision of the line searches and of the stopping rule max|x_k+1 - x_k| <= eps
+  :param vectorized: f accepts arrays of points with the last axis of size len(x0), as tables.Table does;
+                     the function of a coordinate then accepts arrays too, e.g. for partial(brute_force, vectorized=True)
+  :return: Point(x, y) with x an array
+  """
+  assert eps > 0
 
-      if f is not None and mu == 0:
-        mu = yd2 * 10
+  x = np.array(x0, dtype=float)
+  bounds = [(float(a), float(b)) for a, b in bounds]
+  assert len(bounds) == x.size
+  assert all(a <= x_i <= b for x_i, (a, b) in zip(x, bounds))
 
-      x_new = x - tau * yd1 / (yd2 + mu)
-    except ZeroDivisionError as e:
-      raise ValueError(f"The method doesn't converge after the iteration: №{i} with x0: {x0}, ε: {eps}, τ: {tau}, μ: {mu}") from e
+  values = {}
+  def get_f(x):
+    key = x.tobytes()
+    if key not in values:
+      values[key] = f(x)
 
-    if f is not None:
-      y_new = f(x_new)
-      if y_new < y:
-        mu /= 2
-      else:
-        mu *= 2
+    return values[key]
 
-      y = y_new
+  y = get_f(x)
 
-    x = x_new
-    i += 1
+  for _ in range(kmax):
+    x_old = x.copy()
 
-    if abs(yd1) <= eps: break
+    for i, (a, b) in enumerate(bounds):
+      def f_i(t, i=i):
+        if vectorized and np.ndim(t):
+          x_t = np.repeat(x[np.newaxis], np.size(t), axis=0)
+          x_t[:, i] = np.ravel(t)
+          return np.reshape(f(x_t), np.shape(t))
 
-  if i == kmax:
-    raise ValueError(f"The method didn't achieve the specified ε after the max iteration: №{i} with x0: {x0}, ε: {eps}, τ: {tau}, μ: {mu}")
+        x_t = x.copy()
+        x_t[i] = t
+        return get_f(x_t)
 
-  return Point(x=x, y=y)
+      line_point = line_search(f=f_i, a=a, b=b, eps=eps)
+      x_new = x.copy()
+      x_new[i] = line_point.x
+      y_new = line_point.y if line_point.y is not None else get_f(x_new)
 
-def polygonal_chain(f: Callable[[Any], Any], a, b, eps, get_L):
-  assert a <= b
-  assert eps > 0
+      if y_new <= y:
+        x, y = x_new, y_new
 
-  L = get_L(f=f, a=a, b=b, eps=eps)
-  pairs = [Point(x=1/(2*L) * (f(a) - f(b) + L * (a + b)), y=1/2 * (f(a) + f(b) + L * (a - b)))]
+    step = np.max(np.abs(x - x_old))
+    if profile is not None: profile.iteration(width=step)
 
-  while True:
-    star_pair = pairs.pop(np.argmin([pair.y for pair in pairs]))
-    f_star = f(star_pair.x)
-    delta = 1 / (2*L) * (f_star - star_pair.y)
-    if 2 * L * delta <= eps:
-      return Point(x=star_pair.x, y=f_star)
+    if step <= eps:
+      return Point(x=x, y=y)
 
-    p = 1 / 2 * (f_star + star_pair.y)
-    pairs.append(Point(x=star_pair.x - delta, y=p))
-    pairs.append(Point(x=star_pair.x + delta, y=p))
+  raise ValueError(f"The method didn't achieve the specified ε after the max iteration: №{kmax} with x0: {x0}, ε: {eps}")
@@ -0,0 +1,146 @@
+import asyncio
+import inspect
+from typing import Callable, Any
+import steps
+from algos import _profiled, _checkpointed
+from autodiff import AutoDiff
+from steps import get_fixed_init_points
+from utils import Point, Profile, Checkpoint
+
+# coroutine versions of the methods of algos: they run the same generators of steps, f (fd1, fd2) may be
+# a coroutine function or a plain one; the points of a step don't depend on each other and are awaited together
+
+ASYNC_BRUTE_FORCE_CONCURRENCY = 256
+
+async def _call(f: Callable[[Any], Any], x):
+  y = f(x)
+  return await y if inspect.isawaitable(y) else y
+
+async def _gather(f: Callable[[Any], Any], x, concurrency: int | None=None)->list:
+  """
+  values of f at x, at most concurrency of them in flight
+  """
+  if concurrency is None:
+    return await asyncio.gather(*(_call(f, el) for el in x))
+
+  semaphore = asyncio.Semaphore(concurrency)
+
+  async def call(el):
+    async with semaphore:
+      return await _call(f, el)
+
+  return await asyncio.gather(*(call(el) for el in x))
+
+async def run_async(solver: steps.Solver, concurrency: int | None=None)->Any:
+  """
+  steps.run with the points of every step awaited together
+  :param concurrency: max number of evaluations in flight, unlimited by default
+  """
+  assert concurrency is None or concurrency > 0
+
+  values = None
+  while True:
+    try:
+      step = solver.send(values)
+    except StopIteration as e:
+      return e.value
+
+    values = await _gather(f=step.func, x=step.x, concurrency=concurrency)
+
+@_profiled
+@_checkpointed
+async def brute_force_async(f: Callable[[Any], Any], a, b, eps, block_size=None, concurrency: int=ASYNC_BRUTE_FORCE_CONCURRENCY,
+                            *, profile: Profile | None=None, checkpoint: Checkpoint | None=None)->Point:
+  """
+  :param concurrency: max number of evaluations in flight
+  """
+  return await run_async(steps.brute_force_steps(f=f, a=a, b=b, eps=eps, block_size=block_size, profile=profile,
+                                                 checkpoint=checkpoint), concurrency=concurrency)
+
+@_profiled
+@_checkpointed
+async def bitwise_search_async(f: Callable[[Any], Any], a, b, eps, get_init_delta=lambda: 0.25,
+                               *, profile: Profile | None=None, checkpoint: Checkpoint | None=None)->Point:
+  return await run_async(steps.bitwise_search_steps(f=f, a=a, b=b, eps=eps, get_init_delta=get_init_delta, profile=profile,
+                                                    checkpoint=checkpoint))
+
+@_profiled
+@_checkpointed
+async def dichotomy_async(f: Callable[[Any], Any], a, b, eps, *, profile: Profile | None=None, checkpoint: Checkpoint | None=None)->Point:
+  return await run_async(steps.dichotomy_steps(f=f, a=a, b=b, eps=eps, profile=profile, checkpoint=checkpoint))
+
+@_profiled
+@_checkpointed
+async def golden_ratio_async(f: Callable[[Any], Any], a, b, eps, *, profile: Profile | None=None, checkpoint: Checkpoint | None=None)->Point:
+  return await run_async(steps.golden_ratio_steps(f=f, a=a, b=b, eps=eps, profile=profile, checkpoint=checkpoint))
+
+@_profiled
+@_checkpointed
+async def k_section_async(f: Callable[[Any], Any], a, b, eps, k: int | None=None,
+                          *, profile: Profile | None=None, checkpoint: Checkpoint | None=None)->Point:
+  """
+  the k probes of an iteration are awaited together
+  """
+  return await run_async(steps.k_section_steps(f=f, a=a, b=b, eps=eps, k=k, profile=profile, checkpoint=checkpoint))
+
+async def get_init_points_gr_async(f: Callable[[Any], Any], a, b)->list[Point]:
+  return await run_async(steps.get_init_points_gr_steps(f=f, a=a, b=b))
+
+@_profiled
+@_checkpointed
+async def parabola_async(f: Callable[[Any], Any], a, b, eps, get_init_points=get_fixed_init_points,
+                         *, profile: Profile | None=None, checkpoint: Checkpoint | None=None)->Point:
+  """
+  :param get_init_points: as in parabola, get_init_points_gr and get_init_points_gr_async ask for their points,
+                          any other one is called with f and must not await it
+  """
+  if get_init_points is get_init_points_gr_async:
+    get_init_points = steps.get_init_points_gr
+
+  return await run_async(steps.parabola_steps(f=f, a=a, b=b, eps=eps, get_init_points=get_init_points, profile=profile,
+                                              checkpoint=checkpoint))
+
+@_profiled
+@_checkpointed
+async def brent_async(f: Callable[[Any], Any], a, b, eps, *, profile: Profile | None=None, checkpoint: Checkpoint | None=None)->Point:
+  return await run_async(steps.brent_steps(f=f, a=a, b=b, eps=eps, profile=profile, checkpoint=checkpoint))
+
+@_profiled
+@_checkpointed
+async def midpoint_async(f: Callable[[Any], Any] | AutoDiff, a, b, eps,
+                         *, profile: Profile | None=None, checkpoint: Checkpoint | None=None)->Point:
+  return await run_async(steps.midpoint_steps(f=f, a=a, b=b, eps=eps, profile=profile, checkpoint=checkpoint))
+
+@_profiled
+@_checkpointed
+async def chord_async(f: Callable[[Any], Any] | AutoDiff, a, b, eps,
+                      *, profile: Profile | None=None, checkpoint: Checkpoint | None=None)->Point:
+  return await run_async(steps.chord_steps(f=f, a=a, b=b, eps=eps, profile=profile, checkpoint=checkpoint))
+
+@_profiled
+@_checkpointed
+async def newton_async(fd1: Callable[[Any], Any] | AutoDiff, fd2: Callable[[Any], Any] | None,
+                       x0: Any, eps, use_tau=False, f=None, kmax: int=1000,
+                       *, profile: Profile | None=None, checkpoint: Checkpoint | None=None) -> Point:
+  return await run_async(steps.newton_steps(fd1=fd1, fd2=fd2, x0=x0, eps=eps, use_tau=use_tau, f=f, kmax=kmax, profile=profile,
+                                            checkpoint=checkpoint))
+
+@_profiled
+@_checkpointed
+async def polygonal_chain_async(f: Callable[[Any], Any], a, b, eps, get_L=None, r=2.0, local=True, n_init: int=10,
+                                *, profile: Profile | None=None, checkpoint: Checkpoint | None=None)->Point:
+  """
+  as polygonal_chain, get_L is called with f and must not await it
+  """
+  return await run_async(steps.polygonal_chain_steps(f=f, a=a, b=b, eps=eps, get_L=get_L, r=r, local=local, n_init=n_init,
+                                                     profile=profile, checkpoint=checkpoint))
+
+@_profiled
+@_checkpointed
+async def parallel_polygonal_chain_async(f: Callable[[Any], Any], a, b, eps, get_L, k: int | None=None,
+                                         *, profile: Profile | None=None, checkpoint: Checkpoint | None=None)->Point:
+  """
+  the k candidates of a round are awaited together
+  """
+  return await run_async(steps.parallel_polygonal_chain_steps(f=f, a=a, b=b, eps=eps, get_L=get_L, k=k, profile=profile,
+                                                              checkpoint=checkpoint))
@@ -0,0 +1,230 @@
+import operator
+from typing import Callable, Any
+import numpy as np
+
+class Dual:
+  """
+  truncated Taylor jet: value v with the first and second derivatives d1, d2 w.r.t. one variable,
+  components may be floats or numpy arrays of the same shape.
+  Arithmetic and the numpy ufuncs of _BINARY and _UNARY (np.exp, np.sin, ...) propagate derivatives;
+  math functions and other ufuncs raise TypeError
+  """
+  __slots__ = ('v', 'd1', 'd2')
+
+  def __init__(self, v, d1=0.0, d2=0.0):
+    self.v = v
+    self.d1 = d1
+    self.d2 = d2
+
+  @staticmethod
+  def variable(x)->'Dual':
+    return Dual(v=x, d1=np.ones_like(x, dtype=float) if np.ndim(x) else 1.0, d2=0.0)
+
+  def __repr__(self):
+    return f'Dual(v={self.v!r}, d1={self.d1!r}, d2={self.d2!r})'
+
+  def __float__(self):
+    # math functions convert their argument to float, which would drop the derivatives
+    raise TypeError('a Dual can\'t be converted to float: AutoDiff needs f written with numpy functions '
+                    '(np.exp, not math.exp)')
+
+  def chain(self, g0, g1, g2)->'Dual':
+    """
+    g(self) given g(v), g'(v), g''(v)
+    """
+    return Dual(v=g0, d1=g1 * self.d1, d2=g2 * self.d1**2 + g1 * self.d2)
+
+  def __add__(self, other):
+    other = _lift(other)
+    return Dual(v=self.v + other.v, d1=self.d1 + other.d1, d2=self.d2 + other.d2)
+
+  def __sub__(self, other):
+    other = _lift(other)
+    return Dual(v=self.v - other.v, d1=self.d1 - other.d1, d2=self.d2 - other.d2)
+
+  def __mul__(self, other):
+    other = _lift(other)
+    return Dual(
+      v=self.v * other.v,
+      d1=self.d1 * other.v + self.v * other.d1,
+      d2=self.d2 * other.v + 2 * self.d1 * other.d1 + self.v * other.d2,
+    )
+
+  def __truediv__(self, other):
+    return self * _reciprocal(_lift(other))
+
+  def __pow__(self, other):
+    if isinstance(other, Dual):
+      return _exp(other * _log(self))
+
+    n = other
+    if np.ndim(n) == 0 and n == 0:
+      return Dual(v=self.v**0, d1=0.0, d2=0.0)
+    if np.ndim(n) == 0 and n == 1:
+      return Dual(v=self.v, d1=self.d1, d2=self.d2)
+
+    return self.chain(self.v**n, n * self.v**(n - 1), n * (n - 1) * self.v**(n - 2))
+
+  def __radd__(self, other):
+    return _lift(other) + self
+
+  def __rsub__(self, other):
+    return _lift(other) - self
+
+  def __rmul__(self, other):
+    return _lift(other) * self
+
+  def __rtruediv__(self, other):
+    return _lift(other) / self
+
+  def __rpow__(self, other):
+    return _exp(self * np.log(other))
+
+  def __neg__(self):
+    return Dual(v=-self.v, d1=-self.d1, d2=-self.d2)
+
+  def __pos__(self):
+    return self
+
+  def __abs__(self):
+    sign = np.sign(self.v)
+    return Dual(v=abs(self.v), d1=sign * self.d1, d2=sign * self.d2)
+
+  def __lt__(self, other):
+    return self.v < _value(other)
+
+  def __le__(self, other):
+    return self.v <= _value(other)
+
+  def __gt__(self, other):
+    return self.v > _value(other)
+
+  def __ge__(self, other):
+    return self.v >= _value(other)
+
+  def __array_ufunc__(self, ufunc, method, *inputs, **kwargs):
+    if method != '__call__' or kwargs:
+      return NotImplemented
+
+    if ufunc in _BINARY:
+      return _BINARY[ufunc](*inputs)
+    if ufunc in _UNARY:
+      return _UNARY[ufunc](_lift(inputs[0]))
+    if ufunc in _COMPARISONS:
+      return ufunc(*map(_value, inputs))
+
+    raise TypeError(f'np.{ufunc.__name__} has no derivative rule for a Dual, supported: '
+                    + ', '.join(f'np.{ufunc.__name__}' for ufunc in (*_BINARY, *_UNARY)))
+
+def _lift(x)->Dual:
+  return x if isinstance(x, Dual) else Dual(v=x)
+
+def _value(x):
+  return x.v if isinstance(x, Dual) else x
+
+def _reciprocal(u: Dual)->Dual:
+  r = 1 / u.v
+  return u.chain(r, -r**2, 2 * r**3)
+
+def _exp(u: Dual)->Dual:
+  e = np.exp(u.v)
+  return u.chain(e, e, e)
+
+def _log(u: Dual)->Dual:
+  r = 1 / u.v
+  return u.chain(np.log(u.v), r, -r**2)
+
+def _sin(u: Dual)->Dual:
+  s, c = np.sin(u.v), np.cos(u.v)
+  return u.chain(s, c, -s)
+
+def _cos(u: Dual)->Dual:
+  s, c = np.sin(u.v), np.cos(u.v)
+  return u.chain(c, -s, -c)
+
+def _tan(u: Dual)->Dual:
+  t = np.tan(u.v)
+  return u.chain(t, 1 + t**2, 2 * t * (1 + t**2))
+
+def _arctan(u: Dual)->Dual:
+  r = 1 / (1 + u.v**2)
+  return u.chain(np.arctan(u.v), r, -2 * u.v * r**2)
+
+def _sqrt(u: Dual)->Dual:
+  s = np.sqrt(u.v)
+  return u.chain(s, 1 / (2 * s), -1 / (4 * s**3))
+
+def _sinh(u: Dual)->Dual:
+  s, c = np.sinh(u.v), np.cosh(u.v)
+  return u.chain(s, c, s)
+
+def _cosh(u: Dual)->Dual:
+  s, c = np.sinh(u.v), np.cosh(u.v)
+  return u.chain(c, s, c)
+
+def _tanh(u: Dual)->Dual:
+  t = np.tanh(u.v)
+  return u.chain(t, 1 - t**2, -2 * t * (1 - t**2))
+
+# the left operand is lifted so numpy scalars don't dispatch back to the ufunc
+_BINARY = {
+  np.add: lambda u, w: _lift(u) + w,
+  np.subtract: lambda u, w: _lift(u) - w,
+  np.multiply: lambda u, w: _lift(u) * w,
+  np.true_divide: lambda u, w: _lift(u) / w,
+  np.power: lambda u, w: _lift(u) ** w,
+}
+
+_UNARY = {
+  np.negative: operator.neg,
+  np.positive: operator.pos,
+  np.absolute: abs,
+  np.square: lambda u: u * u,
+  np.reciprocal: _reciprocal,
+  np.exp: _exp,
+  np.log: _log,
+  np.sin: _sin,
+  np.cos: _cos,
+  np.tan: _tan,
+  np.arctan: _arctan,
+  np.sqrt: _sqrt,
+  np.sinh: _sinh,
+  np.cosh: _cosh,
+  np.tanh: _tanh,
+}
+
+_COMPARISONS = (np.less, np.less_equal, np.greater, np.greater_equal, np.equal, np.not_equal)
+
+class AutoDiff:
+  """
+  f, f' and f'' of f from one evaluation of f on a Dual.
+  The jet of the last x is kept, so fd1(x) and fd2(x) (and f(x)) at the same x cost one evaluation.
+  f may use arithmetic, abs, comparisons and the numpy functions of _UNARY (np.exp, not math.exp);
+  math functions and other numpy functions raise TypeError.
+  newton, newton_batch, midpoint and chord accept it in place of the derivatives they need.
+  """
+  def __init__(self, func: Callable[[Any], Any]):
+    self.func = func
+    self._x = None
+    self._jet = None
+
+  def jet(self, x)->Dual:
+    if self._jet is not None and (x == self._x if np.ndim(x) == 0 and np.ndim(self._x) == 0 else np.array_equal(x, self._x)):
+      return self._jet
+
+    jet = _lift(self.func(Dual.variable(x)))
+    if np.ndim(x):
+      jet = Dual(*(np.broadcast_to(component, np.shape(x)) for component in (jet.v, jet.d1, jet.d2)))
+    self._x = np.copy(x) if np.ndim(x) else x
+    self._jet = jet
+
+    return jet
+
+  def f(self, x):
+    return self.jet(x).v
+
+  def fd1(self, x):
+    return self.jet(x).d1
+
+  def fd2(self, x):
+    return self.jet(x).d2
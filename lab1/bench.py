@@ -0,0 +1,241 @@
+import argparse
+import json
+import math
+import sys
+import time
+from dataclasses import dataclass
+from typing import Callable, Any
+import numpy as np
+from algos import *
+from utils import Point, Profile
+
+@dataclass
+class Problem:
+  name: str
+  f: Callable[[Any], Any]
+  fd1: Callable[[Any], Any]
+  fd2: Callable[[Any], Any]
+  a: Any
+  b: Any
+  star_point: Point
+  L: Any
+  multimodal: bool = False
+
+PROBLEMS = [
+  Problem(
+    name='lecture',
+    f=lambda x: x**4 + math.exp(-x),
+    fd1=lambda x: 4 * x**3 - math.exp(-x),
+    fd2=lambda x: 12 * x**2 + math.exp(-x),
+    a=0, b=1,
+    star_point=Point(x=0.52825185, y=0.6675037513807424),
+    L=3.64,
+  ),
+  Problem(
+    name='quadratic',
+    f=lambda x: 6 * x**2 + 3*x + 5,
+    fd1=lambda x: 12 * x + 3,
+    fd2=lambda x: 12,
+    a=-3, b=1,
+    star_point=Point(x=-1/4, y=37/8),
+    L=33,
+  ),
+  Problem(
+    name='newton_lecture',
+    f=lambda x: x * math.atan(x) - 1 / 2 * math.log(1 + x**2),
+    fd1=lambda x: math.atan(x),
+    fd2=lambda x: 1 / (1 + x * x),
+    a=-1, b=2,
+    star_point=Point(x=0, y=0),
+    L=1.11,
+  ),
+  Problem(
+    name='multi_f1',
+    f=lambda x: math.cos(x) / x**2,
+    fd1=lambda x: -math.sin(x) / x**2 - 2 * math.cos(x) / x**3,
+    fd2=lambda x: -math.cos(x) / x**2 + 4 * math.sin(x) / x**3 + 6 * math.cos(x) / x**4,
+    a=1, b=12,
+    star_point=Point(x=2.4587144, y=-0.12832492848508967),
+    L=2,
+    multimodal=True,
+  ),
+  Problem(
+    name='multi_f2',
+    f=lambda x: 1 / 10 * x + 2 * math.sin(4*x),
+    fd1=lambda x: 1 / 10 + 8 * math.cos(4*x),
+    fd2=lambda x: -32 * math.sin(4*x),
+    a=0, b=4,
+    star_point=Point(x=1.1749722, y=-1.8823465275249622),
+    L=8.1,
+    multimodal=True,
+  ),
+]
+
+METHODS = {
+  'brute_force': lambda problem, eps, profile: brute_force(f=problem.f, a=problem.a, b=problem.b, eps=eps, profile=profile),
+  'multires_brute_force': lambda problem, eps, profile: multires_brute_force(f=problem.f, a=problem.a, b=problem.b, eps=eps,
+                                                                             profile=profile),
+  'bitwise_search': lambda problem, eps, profile: bitwise_search(f=problem.f, a=problem.a, b=problem.b, eps=eps, profile=profile),
+  'dichotomy': lambda problem, eps, profile: dichotomy(f=problem.f, a=problem.a, b=problem.b, eps=eps, profile=profile),
+  'golden_ratio': lambda problem, eps, profile: golden_ratio(f=problem.f, a=problem.a, b=problem.b, eps=eps, profile=profile),
+  'k_section': lambda problem, eps, profile: k_section(f=problem.f, a=problem.a, b=problem.b, eps=eps, k=4, profile=profile),
+  'parabola': lambda problem, eps, profile: parabola(f=problem.f, a=problem.a, b=problem.b, eps=eps,
+                                                     get_init_points=get_init_points_gr, profile=profile),
+  'brent': lambda problem, eps, profile: brent(f=problem.f, a=problem.a, b=problem.b, eps=eps, profile=profile),
+  'midpoint': lambda problem, eps, profile: midpoint(f=problem.fd1, a=problem.a, b=problem.b, eps=eps, profile=profile),
+  'chord': lambda problem, eps, profile: chord(f=problem.fd1, a=problem.a, b=problem.b, eps=eps, profile=profile),
+  'newton': lambda problem, eps, profile: newton(fd1=problem.fd1, fd2=problem.fd2, x0=(problem.a + problem.b) / 2,
+                                                 eps=eps, profile=profile),
+  'polygonal_chain': lambda problem, eps, profile: polygonal_chain(f=problem.f, a=problem.a, b=problem.b, eps=eps,
+                                                                   get_L=lambda *args, **kwargs: problem.L, profile=profile),
+  'polygonal_chain_adaptive': lambda problem, eps, profile: polygonal_chain(f=problem.f, a=problem.a, b=problem.b, eps=eps,
+                                                                            profile=profile),
+  'parallel_polygonal_chain': lambda problem, eps, profile: parallel_polygonal_chain(f=problem.f, a=problem.a, b=problem.b, eps=eps,
+                                                                                     get_L=lambda *args, **kwargs: problem.L,
+                                                                                     k=4, profile=profile),
+}
+
+EPSILONS = (1e-1, 1e-2, 1e-3, 1e-4)
+
+def run_case(method: str, problem: Problem, eps, repeat: int=1)->dict:
+  """
+  runs one (method, problem, eps) case repeat times
+  :return: record with evaluation counts, the best wall time and the achieved error,
+           'error' holds the message if the method failed
+  """
+  assert repeat > 0
+
+  record = {'method': method, 'problem': problem.name, 'eps': eps}
+  profile = Profile()
+  wall_time = math.inf
+
+  for _ in range(repeat):
+    try:
+      eps_point = METHODS[method](problem=problem, eps=eps, profile=profile)
+    except (AssertionError, ValueError, ZeroDivisionError, OverflowError) as e:
+      record['error'] = f'{type(e).__name__}: {e}'
+      return record
+
+    wall_time = min(wall_time, profile.wall_time)
+
+  x = float(eps_point.x)
+  y = problem.f(x)
+
+  record.update(
+    x=x,
+    y=y,
+    x_error=abs(x - problem.star_point.x),
+    y_error=abs(y - problem.star_point.y),
+    f_evals=profile.f_evals,
+    fd1_evals=profile.fd1_evals,
+    fd2_evals=profile.fd2_evals,
+    evals=profile.f_evals + profile.fd1_evals + profile.fd2_evals,
+    iterations=profile.iterations,
+    wall_time=wall_time,
+  )
+
+  return record
+
+def get_scaling(records: list[dict])->list[dict]:
+  """
+  fits evals ~ C * (1/eps)^slope for every (method, problem) over its successful records
+  """
+  curves = {}
+  for record in records:
+    if 'error' not in record:
+      curves.setdefault((record['method'], record['problem']), []).append(record)
+
+  scaling = []
+  for (method, problem), curve in curves.items():
+    if len(curve) < 2: continue
+
+    log_inv_eps = [math.log(1 / record['eps']) for record in curve]
+    log_evals = [math.log(record['evals']) for record in curve]
+    slope = np.polyfit(log_inv_eps, log_evals, 1)[0] if len(set(log_inv_eps)) > 1 else math.nan
+
+    scaling.append({'method': method, 'problem': problem, 'slope': float(slope)})
+
+  return scaling
+
+def run(methods=None, problems=None, epsilons=EPSILONS, repeat: int=1)->dict:
+  """
+  sweeps methods over problems and epsilons
+  :param methods: names from METHODS, all by default
+  :param problems: names from PROBLEMS, all by default
+  """
+  methods = list(METHODS) if methods is None else methods
+  problems = PROBLEMS if problems is None else [problem for problem in PROBLEMS if problem.name in problems]
+
+  records = [run_case(method=method, problem=problem, eps=eps, repeat=repeat)
+             for method in methods for problem in problems for eps in epsilons]
+
+  return {
+    'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+    'python': sys.version.split()[0],
+    'numpy': np.__version__,
+    'records': records,
+    'scaling': get_scaling(records),
+  }
+
+def compare(old: dict, new: dict, time_tolerance=0.5)->list[str]:
+  """
+  :return: descriptions of cases that need more evaluations, got slower by more than time_tolerance
+           (relative) or started to fail in new compared to old
+  """
+  key = lambda record: (record['method'], record['problem'], record['eps'])
+  old_records = {key(record): record for record in old['records']}
+
+  regressions = []
+  for record in new['records']:
+    old_record = old_records.get(key(record))
+    if old_record is None or 'error' in old_record: continue
+
+    name = '{}/{}/eps={}'.format(*key(record))
+    if 'error' in record:
+      regressions.append(f"{name}: fails with {record['error']}")
+      continue
+
+    if record['evals'] > old_record['evals']:
+      regressions.append(f"{name}: evals {old_record['evals']} -> {record['evals']}")
+    if record['wall_time'] > old_record['wall_time'] * (1 + time_tolerance):
+      regressions.append(f"{name}: wall time {old_record['wall_time']:.3g}s -> {record['wall_time']:.3g}s")
+
+  return regressions
+
+def main(argv=None)->int:
+  parser = argparse.ArgumentParser(description='benchmarks the 1-D methods')
+  parser.add_argument('-o', '--output', help='json file to save the results to')
+  parser.add_argument('--methods', nargs='+', choices=list(METHODS))
+  parser.add_argument('--problems', nargs='+', choices=[problem.name for problem in PROBLEMS])
+  parser.add_argument('--eps', nargs='+', type=float, default=EPSILONS)
+  parser.add_argument('--repeat', type=int, default=3)
+  parser.add_argument('--compare', help='json file of a previous run to check for regressions against')
+  parser.add_argument('--time-tolerance', type=float, default=0.5)
+  args = parser.parse_args(argv)
+
+  results = run(methods=args.methods, problems=args.problems, epsilons=args.eps, repeat=args.repeat)
+
+  for record in results['records']:
+    name = f"{record['method']:16} {record['problem']:15} {record['eps']:<8g}"
+    if 'error' in record:
+      print(f"{name} {record['error']}")
+    else:
+      print(f"{name} evals: {record['evals']:<8} time: {record['wall_time']:<10.3g} x_error: {record['x_error']:.3g}")
+
+  if args.output is not None:
+    with open(args.output, 'w') as file:
+      json.dump(results, file, indent=2)
+
+  if args.compare is not None:
+    with open(args.compare) as file:
+      regressions = compare(old=json.load(file), new=results, time_tolerance=args.time_tolerance)
+
+    for regression in regressions:
+      print(f'regression: {regression}')
+
+    if regressions: return 1
+
+  return 0
+
+if __name__ == '__main__':
+  sys.exit(main())
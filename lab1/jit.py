@@ -0,0 +1,272 @@
+import functools
+import inspect
+import math
+from typing import Callable, Any
+import algos
+from algos import get_fixed_init_points
+from autodiff import AutoDiff
+from utils import Point, Profile, Checkpoint
+
+try:
+  import numba
+except ImportError:
+  numba = None
+
+# compiled versions of dichotomy, golden_ratio, parabola, midpoint and chord: the loop and f are compiled together.
+# The methods of algos run instead when numba is missing, f can't be compiled, or profile/checkpoint is given
+
+ENABLED = numba is not None
+
+JIT_CACHE_SIZE = 128
+
+@functools.lru_cache(maxsize=JIT_CACHE_SIZE)
+def _jit(f: Callable[[Any], Any]):
+  """
+  f compiled for float -> float, None if it can't be
+  """
+  if not ENABLED:
+    return None
+
+  if numba.extending.is_jitted(f):
+    return f
+
+  if not inspect.isfunction(f):
+    return None
+
+  try:
+    return numba.njit('float64(float64)')(f)
+  except numba.core.errors.NumbaError:
+    return None
+
+@functools.lru_cache(maxsize=JIT_CACHE_SIZE)
+def _compile(make_kernel, jitted):
+  """
+  the kernel of make_kernel with jitted built in: numba calls it directly, while a jitted f passed as an argument
+  goes through the dispatcher on every call of the kernel
+  """
+  return numba.njit(make_kernel(jitted))
+
+def _dichotomy(f):
+  def kernel(a, b, eps):
+    delta = eps / 5
+
+    while True:
+      x1 = (b + a - delta) / 2
+      x2 = (b + a + delta) / 2
+
+      y1 = f(x1)
+      y2 = f(x2)
+
+      if y1 <= y2:
+        b = x2
+      else:
+        a = x1
+
+      eps_n = (b - a) / 2
+
+      if eps_n <= eps: break
+
+    x_min = (a + b) / 2
+
+    return x_min, f(x_min)
+
+  return kernel
+
+def _golden_ratio(f):
+  def kernel(a, b, eps):
+    tau = (math.sqrt(5) - 1) / 2
+
+    x1 = a + (3 - math.sqrt(5)) / 2 * (b - a)
+    x2 = a + (math.sqrt(5) - 1) / 2 * (b - a)
+
+    y1 = f(x1)
+    y2 = f(x2)
+
+    eps_n = (b - a) / 2
+
+    while eps_n > eps:
+      if y1 <= y2:
+        b = x2
+        x2 = x1
+        y2 = y1
+        x1 = a + b - x2
+
+        y1 = f(x1)
+      else:
+        a = x1
+        x1 = x2
+        y1 = y2
+        x2 = a + b - x1
+
+        y2 = f(x2)
+
+      eps_n = tau * eps_n
+
+    x_min = (a + b) / 2
+
+    return x_min, f(x_min)
+
+  return kernel
+
+def _parabola(f):
+  def kernel(x1, x2, x3, f1, f2, f3, eps):
+    # as steps._get_parabola_min, inlined for numba
+    old_x_min = 0.0
+    first = True
+
+    while True:
+      a1 = (f2 - f1) / (x2 - x1)
+      a2 = 1 / (x3 - x2) * ((f3 - f1) / (x3 - x1) - (f2 - f1) / (x2 - x1))
+      x_min = 1 / 2 * (x1 + x2 - a1 / a2)
+
+      if not first and abs(old_x_min - x_min) <= eps: return x_min
+
+      f_min = f(x_min)
+
+      if x_min < x2:
+        if f_min >= f2:
+          x1 = x_min
+          f1 = f_min
+        else:
+          x3 = x2
+          f3 = f2
+          x2 = x_min
+          f2 = f_min
+
+      else:
+        if f_min < f2:
+          x1 = x2
+          f1 = f2
+          x2 = x_min
+          f2 = f_min
+        else:
+          x3 = x_min
+          f3 = f_min
+
+      old_x_min = x_min
+      first = False
+
+  return kernel
+
+def _midpoint(f):
+  def kernel(a, b, eps):
+    while True:
+      x_mid = (a + b) / 2
+      f_mid = f(x_mid)
+
+      if abs(f_mid) <= eps:
+        return x_mid
+
+      if f_mid > 0:
+        b = x_mid
+      else:
+        a = x_mid
+
+  return kernel
+
+def _chord(f):
+  def kernel(a, b, eps):
+    fa = f(a)
+    fb = f(b)
+
+    while True:
+      x_tilda = a - fa / (fa - fb) * (a - b)
+
+      fx = f(x_tilda)
+
+      if abs(fx) <= eps:
+        return x_tilda
+
+      if fx > 0:
+        b = x_tilda
+        fb = fx
+      else:
+        a = x_tilda
+        fa = fx
+
+  return kernel
+
+def _get_jitted(f, profile: Profile | None, checkpoint: Checkpoint | None):
+  if profile is not None or checkpoint is not None or isinstance(f, AutoDiff):
+    return None
+
+  try:
+    return _jit(f)
+  except TypeError: # unhashable f
+    return None
+
+def dichotomy(f: Callable[[Any], Any], a, b, eps, *, profile: Profile | None=None, checkpoint: Checkpoint | None=None)->Point:
+  assert a <= b
+  assert eps > 0
+
+  jitted = _get_jitted(f, profile=profile, checkpoint=checkpoint)
+  if jitted is None:
+    return algos.dichotomy(f=f, a=a, b=b, eps=eps, profile=profile, checkpoint=checkpoint)
+
+  x, y = _compile(_dichotomy, jitted)(float(a), float(b), float(eps))
+
+  return Point(x=x, y=y)
+
+def golden_ratio(f: Callable[[Any], Any], a, b, eps, *, profile: Profile | None=None, checkpoint: Checkpoint | None=None)->Point:
+  assert a <= b
+  assert eps > 0
+
+  jitted = _get_jitted(f, profile=profile, checkpoint=checkpoint)
+  if jitted is None:
+    return algos.golden_ratio(f=f, a=a, b=b, eps=eps, profile=profile, checkpoint=checkpoint)
+
+  x, y = _compile(_golden_ratio, jitted)(float(a), float(b), float(eps))
+
+  return Point(x=x, y=y)
+
+def parabola(f: Callable[[Any], Any], a, b, eps, get_init_points=get_fixed_init_points,
+             *, profile: Profile | None=None, checkpoint: Checkpoint | None=None)->Point:
+  """
+  :param get_init_points: as in algos.parabola, runs uncompiled
+  """
+  assert a <= b
+  assert eps > 0
+
+  jitted = _get_jitted(f, profile=profile, checkpoint=checkpoint)
+  if jitted is None:
+    return algos.parabola(f=f, a=a, b=b, eps=eps, get_init_points=get_init_points, profile=profile, checkpoint=checkpoint)
+
+  init_points = get_init_points(f=f, a=a, b=b)
+  for i in range(len(init_points)):
+    if init_points[i].y is None:
+      init_points[i].y = f(init_points[i].x)
+
+  x1, x2, x3 = init_points[0].x, init_points[1].x, init_points[2].x
+  f1, f2, f3 = init_points[0].y, init_points[1].y, init_points[2].y
+  assert x1 < x2 < x3
+  assert f1 >= f2 <= f3
+
+  x_min = _compile(_parabola, jitted)(*map(float, (x1, x2, x3, f1, f2, f3, eps)))
+
+  return Point(x=x_min, y=None)
+
+def midpoint(f: Callable[[Any], Any] | AutoDiff, a, b, eps, *, profile: Profile | None=None, checkpoint: Checkpoint | None=None)->Point:
+  """
+  solves f(x) = 0 as algos.midpoint
+  """
+  assert a <= b
+  assert eps > 0
+
+  jitted = _get_jitted(f, profile=profile, checkpoint=checkpoint)
+  if jitted is None:
+    return algos.midpoint(f=f, a=a, b=b, eps=eps, profile=profile, checkpoint=checkpoint)
+
+  return Point(x=_compile(_midpoint, jitted)(float(a), float(b), float(eps)), y=None)
+
+def chord(f: Callable[[Any], Any] | AutoDiff, a, b, eps, *, profile: Profile | None=None, checkpoint: Checkpoint | None=None)->Point:
+  """
+  solves f(x) = 0 as algos.chord
+  """
+  assert a <= b
+  assert eps > 0
+
+  jitted = _get_jitted(f, profile=profile, checkpoint=checkpoint)
+  if jitted is None:
+    return algos.chord(f=f, a=a, b=b, eps=eps, profile=profile, checkpoint=checkpoint)
+
+  return Point(x=_compile(_chord, jitted)(float(a), float(b), float(eps)), y=None)
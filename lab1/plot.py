@@ -1,22 +1,53 @@
 import numpy as np
 from matplotlib.axes import Axes
 import matplotlib.pyplot as plt
-from utils import Point
+from utils import Point, Trace, eval_points, get_xy
+from concurrent.futures import Executor
+from collections import OrderedDict
 from typing import Callable, Any
-from copy import deepcopy
+
+SAMPLES_PER_PIXEL = 2
+CURVE_CACHE_SIZE = 32
+
+_curves = OrderedDict()
+
+def get_resolution(ax: Axes)->int:
+  """
+  number of samples for a curve spanning the axis, SAMPLES_PER_PIXEL per pixel of its width
+  """
+  return max(int(ax.bbox.width * SAMPLES_PER_PIXEL), 2)
+
+def sample_curve(f: Callable[[Any], Any], a, b, resolution: int, executor: Executor | None=None)->tuple[np.ndarray, np.ndarray]:
+  """
+  resolution points of f on [a, b], f is called once on the whole grid if it accepts arrays.
+  The last CURVE_CACHE_SIZE curves are memoized per (f, a, b, resolution), the returned arrays are read-only
+  """
+  key = (f, a, b, resolution)
+  if key in _curves:
+    _curves.move_to_end(key)
+    return _curves[key]
+
+  x = np.linspace(a, b, resolution)
+  y = eval_points(f=f, x=x, executor=executor, vectorized=True)
+  x.flags.writeable = False
+  y.flags.writeable = False
+
+  _curves[key] = (x, y)
+  if len(_curves) > CURVE_CACHE_SIZE:
+    _curves.popitem(last=False)
+
+  return x, y
 
 def plot_x_eps(ax: Axes, origin: Point, eps):
   ax.axvspan(origin.x - eps, origin.x + eps, color='lightcoral', alpha=0.3)  # lightcoral is a light red color
 
-def plot_brute_force(ax: Axes, f: Callable[[Any], Any], a, b, star_point: Point, eps_point: Point, k_points: list[Point], eps, title):
-  x = np.arange(a, b, 0.001)
-  y = [f(y) for y in x]
+def plot_brute_force(ax: Axes, f: Callable[[Any], Any], a, b, star_point: Point, eps_point: Point, k_points: Trace | list[Point], eps, title, executor: Executor | None=None):
+  x, y = sample_curve(f=f, a=a, b=b, resolution=get_resolution(ax), executor=executor)
 
   ax.plot(x, y)
 
   answer_point = eps_point
-  points_x = [point.x for point in k_points]
-  points_y = [point.y for point in k_points]
+  points_x, points_y = get_xy(k_points)
   ax.scatter(points_x, points_y, c='b', label='$x_k$')
   for i, (xi, yi) in enumerate(zip(points_x, points_y)):
     ax.text(xi, yi, f'{i+1}', fontsize=12, ha='left')
@@ -43,24 +74,21 @@ def plot_parabola(ax: Axes, points: list[Point]):
   f = lambda x: a0 + a1 * (x - points[0].x) + a2 * (x - points[0].x) * (x - points[1].x)
 
   wings = (points[2].x - points[0].x) / 10
-  x = np.arange(points[0].x-wings, points[2].x+wings, 0.001)
-  y = [f(y) for y in x]
+  x = np.linspace(points[0].x-wings, points[2].x+wings, get_resolution(ax))
+  y = f(x)
 
   ax.plot(x, y, color='orange')
 
-def plot_parabola_meth(ax: Axes, f: Callable[[Any], Any], a, b, star_point: Point, eps_point: Point, k_points: list[Point], eps):
+def plot_parabola_meth(ax: Axes, f: Callable[[Any], Any], a, b, star_point: Point, eps_point: Point, k_points: Trace | list[Point], eps):
   title = 'Парабола'
-  k_points_copy = deepcopy(k_points)
-  eps_point_copy = deepcopy(eps_point)
-  eps_point_copy.y = eps_point_copy.y if eps_point_copy.y is not None else f(eps_point_copy.x)
-  plot_brute_force(ax=ax, f=f, a=a, b=b, star_point=star_point, eps_point=eps_point_copy, k_points=k_points_copy, eps=eps, title=title)
+  answer_point = Point(x=eps_point.x, y=eps_point.y if eps_point.y is not None else f(eps_point.x))
+  plot_brute_force(ax=ax, f=f, a=a, b=b, star_point=star_point, eps_point=answer_point, k_points=k_points, eps=eps, title=title)
 
-  parabola_points = k_points_copy[:3]
+  points_x, points_y = get_xy(k_points)
+  parabola_points = [Point(x=x, y=y) for x, y in zip(points_x[:3], points_y[:3])]
   plot_parabola(ax=ax, points=parabola_points)
 
-  for point in k_points_copy[3:]:
-    x_min = point.x
-    f_min = point.y
+  for x_min, f_min in zip(points_x[3:], points_y[3:]):
     if x_min < parabola_points[1].x:
       if f_min >= parabola_points[1].y:
         parabola_points[0].x = x_min
@@ -108,28 +136,27 @@ def draw_double_plot(plotting_f_left: Callable, plotting_f_right: Callable):
 def plot_tangent(ax: Axes, point: Point, slope, a, b):
   tangent_line = lambda x: point.y + slope * (x - point.x)
 
-  x = np.arange(a, b, 0.001)
-  y = [tangent_line(xi) for xi in x]
+  # a line is fully drawn by its ends
+  x = np.array([a, b])
+  y = tangent_line(x)
 
   ax.plot(x, y)
 
 
-def plot_midpoint(ax: Axes, f: Callable[[Any], Any], a, b, star_point: Point, eps_point: Point, k_points: list[Point], title='Средняя точка'):
-  x = np.arange(a, b, 0.001)
-  y = [f(xi) for xi in x]
+def plot_midpoint(ax: Axes, f: Callable[[Any], Any], a, b, star_point: Point, eps_point: Point, k_points: Trace | list[Point], title='Средняя точка', executor: Executor | None=None):
+  x, y = sample_curve(f=f, a=a, b=b, resolution=get_resolution(ax), executor=executor)
 
   ax.plot(x, y)
 
-  answer_point = deepcopy(eps_point)
-  points_x = [point.x for point in k_points]
-  points_y = [f(point.x) for point in k_points]
+  points_x, slopes = get_xy(k_points)
+  points_y = [f(xi) for xi in points_x]
   ax.scatter(points_x, points_y, c='b', label='$x_k$')
   wings = (b - a) / 10
-  for i, (point, yi) in enumerate(zip(k_points, points_y)):
-    ax.text(point.x, yi, f'{i+1}', fontsize=12, ha='left')
-    plot_tangent(ax=ax, point=Point(x=point.x, y=yi), slope=point.y, a=point.x-wings, b=point.x+wings)
+  for i, (xi, yi, slope) in enumerate(zip(points_x, points_y, slopes)):
+    ax.text(xi, yi, f'{i+1}', fontsize=12, ha='left')
+    plot_tangent(ax=ax, point=Point(x=xi, y=yi), slope=slope, a=xi-wings, b=xi+wings)
 
-  answer_point.y = answer_point.y if answer_point.y is not None else f(answer_point.x)
+  answer_point = Point(x=eps_point.x, y=eps_point.y if eps_point.y is not None else f(eps_point.x))
 
   if star_point.x == answer_point.x:
     ax.scatter(answer_point.x, answer_point.y, c='r', label='$x^*, x_ε$')
@@ -140,29 +167,27 @@ def plot_midpoint(ax: Axes, f: Callable[[Any], Any], a, b, star_point: Point, ep
   ax.set(xlabel='x', ylabel='y',
         title=title)
 
-def plot_chord(ax: Axes, fd1: Callable[[Any], Any], a, b, star_point: Point, eps_point: Point, k_points: list[Point]):
-  x = np.arange(a, b, 0.001)
-  y = [fd1(xi) for xi in x]
+def plot_chord(ax: Axes, fd1: Callable[[Any], Any], a, b, star_point: Point, eps_point: Point, k_points: Trace | list[Point], executor: Executor | None=None):
+  x, y = sample_curve(f=fd1, a=a, b=b, resolution=get_resolution(ax), executor=executor)
 
   ax.plot(x, y)
 
-  answer_point = deepcopy(eps_point)
-  points_x = [point.x for point in k_points]
-  points_y = [fd1(point.x) for point in k_points]
+  answer_point = eps_point
+  points_x, points_y = get_xy(k_points)
   ax.scatter(points_x, points_y, c='b', label='$x_k$')
 
-  ax.text(k_points[0].x, k_points[0].y, f'1', fontsize=12, ha='left')
-  ax.text(k_points[1].x, k_points[1].y, f'2', fontsize=12, ha='left')
+  ax.text(points_x[0], points_y[0], f'1', fontsize=12, ha='left')
+  ax.text(points_x[1], points_y[1], f'2', fontsize=12, ha='left')
 
-  for i, point in enumerate(k_points[2:], start=2):
+  for i, (xi, yi) in enumerate(zip(points_x[2:], points_y[2:]), start=2):
     ax.plot([a, b], [fd1(a), fd1(b)])
-    ax.text(point.x, point.y, f'{i+1}', fontsize=12, ha='left')
-    ax.plot([point.x, point.x], [0, point.y], linestyle='dashed')
+    ax.text(xi, yi, f'{i+1}', fontsize=12, ha='left')
+    ax.plot([xi, xi], [0, yi], linestyle='dashed')
 
-    if point.y > 0:
-      b = point.x
+    if yi > 0:
+      b = xi
     else:
-      a = point.x
+      a = xi
 
   if star_point.x == answer_point.x:
     ax.scatter(star_point.x, fd1(star_point.x), c='r', label='$x^*, x_ε$')
@@ -179,30 +204,28 @@ def plot_newton(ax: Axes,
                 x0,
                 star_point: Point,
                 eps_point: Point,
-                k_points: list[Point]):
-  sorted_k_x_points = sorted(map(lambda point: point.x, k_points))
-  wings = (max(sorted_k_x_points) - min(sorted_k_x_points)) / 10
-  x = np.arange(min(sorted_k_x_points), max(sorted_k_x_points), 0.001)
-  y = [fd1(xi) for xi in x]
+                k_points: Trace | list[Point],
+                executor: Executor | None=None):
+  points_x, points_y = get_xy(k_points)
+  wings = (points_x.max() - points_x.min()) / 10
+  x, y = sample_curve(f=fd1, a=points_x.min(), b=points_x.max(), resolution=get_resolution(ax), executor=executor)
 
   ax.plot(x, y)
 
-  answer_point = deepcopy(eps_point)
-  points_x = [point.x for point in k_points]
-  points_y = [fd1(point.x) for point in k_points]
+  answer_point = eps_point
   ax.scatter(points_x, points_y, c='b', label='$x_k$')
 
-  for i, point in enumerate(k_points):
-    ax.text(point.x, point.y, f'{i+1}', fontsize=12, ha='left')
+  for i, (xi, yi) in enumerate(zip(points_x, points_y)):
+    ax.text(xi, yi, f'{i+1}', fontsize=12, ha='left')
 
-  for i, point in enumerate(k_points[:-1]):
-    ax.text(point.x, point.y, f'{i+1}', fontsize=12, ha='left')
-    a = point.x - wings if point.y < 0 else k_points[i+1].x - wings
-    b = point.x + wings if point.y > 0 else k_points[i+1].x + wings
-    plot_tangent(ax=ax, point=Point(x=point.x, y=point.y), slope=fd2(point.x), a=a, b=b)
+  for i, (xi, yi) in enumerate(zip(points_x[:-1], points_y[:-1])):
+    ax.text(xi, yi, f'{i+1}', fontsize=12, ha='left')
+    a = xi - wings if yi < 0 else points_x[i+1] - wings
+    b = xi + wings if yi > 0 else points_x[i+1] + wings
+    plot_tangent(ax=ax, point=Point(x=xi, y=yi), slope=fd2(xi), a=a, b=b)
 
-  for point in k_points[1:]:
-    ax.plot([point.x, point.x], [0, point.y], linestyle='dashed')
+  for xi, yi in zip(points_x[1:], points_y[1:]):
+    ax.plot([xi, xi], [0, yi], linestyle='dashed')
 
   if answer_point.x == star_point.x:
     ax.scatter(star_point.x, fd1(star_point.x), c='r', label='$x^*, x_ε$')
@@ -0,0 +1,193 @@
+import time
+from concurrent.futures import Executor
+from dataclasses import dataclass, field
+from typing import Callable, Any
+import steps
+from utils import Point, CachedWrap
+
+PORTFOLIO_BLOCK_SIZE = 64
+
+# name -> solver of (f, fd1, fd2, a, b, eps, L)
+SOLVERS = {
+  'brute_force': lambda f, a, b, eps, **_: steps.brute_force_steps(f=f, a=a, b=b, eps=eps, block_size=PORTFOLIO_BLOCK_SIZE),
+  'bitwise_search': lambda f, a, b, eps, **_: steps.bitwise_search_steps(f=f, a=a, b=b, eps=eps),
+  'dichotomy': lambda f, a, b, eps, **_: steps.dichotomy_steps(f=f, a=a, b=b, eps=eps),
+  'golden_ratio': lambda f, a, b, eps, **_: steps.golden_ratio_steps(f=f, a=a, b=b, eps=eps),
+  'parabola': lambda f, a, b, eps, **_: steps.parabola_steps(f=f, a=a, b=b, eps=eps, get_init_points=steps.get_init_points_gr),
+  'brent': lambda f, a, b, eps, **_: steps.brent_steps(f=f, a=a, b=b, eps=eps),
+  'polygonal_chain': lambda f, a, b, eps, L, **_: steps.polygonal_chain_steps(f=f, a=a, b=b, eps=eps, get_L=lambda **_: L),
+  'midpoint': lambda fd1, a, b, eps, **_: steps.midpoint_steps(f=fd1, a=a, b=b, eps=eps),
+  'chord': lambda fd1, a, b, eps, **_: steps.chord_steps(f=fd1, a=a, b=b, eps=eps),
+  'newton': lambda fd1, fd2, a, b, eps, **_: steps.newton_steps(fd1=fd1, fd2=fd2, x0=(a + b) / 2, eps=eps),
+}
+
+# what each method needs besides f
+NEEDS = {
+  'polygonal_chain': ('f', 'L'),
+  'midpoint': ('fd1',),
+  'chord': ('fd1',),
+  'newton': ('fd1', 'fd2'),
+}
+
+@dataclass
+class PortfolioResult:
+  """
+  :param point: Point(x, f(x)) of the result
+  :param method: name of the method that evaluated the point (the winner)
+  :param evals: distinct evaluations per function, shared by all the methods
+  :param rounds: number of rounds the race took, each evaluates the points all the running methods ask for
+  :param failed: methods that failed before the race ended, with their errors
+  :param lower_bound: lower bound of f on [a, b] the point is certified by, None for a unimodal f
+  """
+  point: Point
+  method: str
+  evals: dict[str, int]
+  rounds: int
+  failed: dict[str, str] = field(default_factory=dict)
+  lower_bound: Any = None
+
+def get_methods(f=None, fd1=None, fd2=None, L=None)->list[str]:
+  """
+  names of the methods of SOLVERS that can run with the given functions
+  """
+  given = {'f': f, 'fd1': fd1, 'fd2': fd2, 'L': L}
+  return [name for name in SOLVERS if all(given[need] is not None for need in NEEDS.get(name, ('f',)))]
+
+def race(f: Callable[[Any], Any], a, b, eps, methods=None, fd1: Callable[[Any], Any] | None=None,
+         fd2: Callable[[Any], Any] | None=None, L=None, unimodal=False, executor: Executor | None=None,
+         time_budget=None)->PortfolioResult:
+  """
+  runs the methods side by side on the same problem until a result is certified, then the rest are stopped.
+  A method finishing first proves nothing when f is multimodal: the local methods stop at any local min.
+  So a result is accepted only when
+  - L is given: polygonal_chain keeps a lower bound of f on [a, b], and the race ends once the least value of f
+    evaluated by any method is within eps of it. That point is the global min up to eps, whichever method found it,
+    and the race takes no more rounds than polygonal_chain alone;
+  - unimodal=True: the guarantee of every method holds, so the first one to finish with a point in [a, b] wins.
+  All the methods read the values from one CachedWrap per function, so no point is evaluated twice
+  :param methods: names from SOLVERS, all that get_methods allows by default; polygonal_chain must be one of them if L is given
+  :param fd1, fd2: f' and f'' for midpoint, chord and newton (started from the middle of [a, b])
+  :param L: Lipschitz constant of f on [a, b]
+  :param unimodal: f has a single local min on [a, b]
+  :param executor: evaluates the new points of a round concurrently (f must be picklable for a process pool)
+  :param time_budget: seconds, TimeoutError is raised when they run out
+  :raises ValueError: if no result can be certified because the methods failed
+  """
+  assert a <= b
+  assert eps > 0
+  assert L is not None or unimodal, 'a result is certified only by L or for a unimodal f'
+
+  if methods is None:
+    methods = get_methods(f=f, fd1=fd1, fd2=fd2, L=L)
+  assert methods, 'no method can run with the given functions'
+  assert L is None or 'polygonal_chain' in methods, 'the lower bound for L comes from polygonal_chain'
+
+  funcs = {'f': f, 'fd1': fd1, 'fd2': fd2}
+  caches = {id(func): CachedWrap(func) for func in funcs.values() if func is not None}
+  deadline = None if time_budget is None else time.monotonic() + time_budget
+
+  solvers = {name: SOLVERS[name](f=f, fd1=fd1, fd2=fd2, a=a, b=b, eps=eps, L=L) for name in methods}
+  running = {}
+  failed = {}
+  results = {}
+
+  # the least value of f evaluated in [a, b] and the method that asked for it first
+  best, owner = None, None
+  lower_bound = None
+
+  def update_best(name, x, y):
+    nonlocal best, owner
+    if a <= x <= b and (best is None or y < best.y):
+      best, owner = Point(x=x, y=y), name
+
+  def get_f(name, x):
+    cached_f = caches[id(f)]
+    new = x not in cached_f
+    y = cached_f(x)
+    if new:
+      update_best(name=name, x=x, y=y)
+
+    return y
+
+  def advance(name, values):
+    try:
+      running[name] = solvers[name].send(values)
+      return
+    except StopIteration as e:
+      point = e.value
+    except (AssertionError, ValueError, ZeroDivisionError, OverflowError) as e:
+      failed[name] = f'{type(e).__name__}: {e}'
+      running.pop(name, None)
+      return
+
+    running.pop(name, None)
+    if not a <= point.x <= b:
+      failed[name] = f'the result {point.x} is outside [{a}, {b}]'
+      return
+
+    if point.y is None or name in ('midpoint', 'chord', 'newton'):
+      # root finders return f'(x) or nothing
+      point = Point(x=point.x, y=get_f(name=name, x=float(point.x)))
+    results[name] = point
+
+  def close_all():
+    for solver in solvers.values():
+      solver.close()
+
+  for name in methods:
+    advance(name, None)
+
+  rounds = 0
+  while running:
+    if deadline is not None and time.monotonic() >= deadline:
+      close_all()
+      raise TimeoutError(f'no result was certified in {time_budget} s')
+
+    for func in funcs.values():
+      if func is None: continue
+
+      cached_func = caches[id(func)]
+      askers = {}
+      for name, step in running.items():
+        if step.func is func:
+          for x in step.x:
+            if x not in cached_func: askers.setdefault(float(x), name)
+      if not askers: continue
+
+      new_y = cached_func.map(list(askers), executor=executor)
+      if func is f:
+        for (x, name), y in zip(askers.items(), new_y):
+          update_best(name=name, x=x, y=y)
+
+    rounds += 1
+    for name, step in list(running.items()):
+      advance(name, caches[id(step.func)].map(step.x))
+
+    if unimodal and results:
+      method = next(name for name in methods if name in results)
+      close_all()
+      return PortfolioResult(point=results[method], method=method, evals=_get_evals(funcs=funcs, caches=caches),
+                             rounds=rounds, failed=failed)
+
+    if L is None: continue
+
+    if 'polygonal_chain' in failed:
+      break
+
+    if 'polygonal_chain' in results:
+      # it stops with its best value within eps of the bound, or with no interval left that can hold a lower value
+      lower_bound = best.y if lower_bound is None else min(lower_bound, best.y)
+    elif running['polygonal_chain'].bracket is not None:
+      lower_bound = running['polygonal_chain'].bracket[0]
+
+    if lower_bound is not None and best.y - lower_bound <= eps:
+      close_all()
+      return PortfolioResult(point=best, method=owner, evals=_get_evals(funcs=funcs, caches=caches), rounds=rounds,
+                             failed=failed, lower_bound=lower_bound)
+
+  close_all()
+
+  raise ValueError('no result could be certified: ' + '; '.join(f'{name}: {error}' for name, error in failed.items()))
+
+def _get_evals(funcs: dict, caches: dict[int, CachedWrap])->dict[str, int]:
+  return {name: caches[id(func)].misses for name, func in funcs.items() if func is not None and caches[id(func)].misses}
@@ -0,0 +1,255 @@
+import argparse
+import hashlib
+import inspect
+import json
+import os
+import sys
+from concurrent.futures import Executor, ProcessPoolExecutor
+from dataclasses import dataclass, asdict
+from typing import Any
+from matplotlib.figure import Figure
+from algos import *
+from plot import plot_brute_force, plot_parabola_meth, plot_midpoint, plot_chord, plot_newton
+from utils import Point, LogPointsWrap
+import bench
+
+LAB_DIR = os.path.dirname(os.path.abspath(__file__))
+IMG_DIR = os.path.join(LAB_DIR, 'img')
+MANIFEST = 'report.json'
+
+def _get_sources(module)->tuple[str, ...]:
+  """
+  files of the modules of the lab that module runs code from: the ones in its globals and those of the imported
+  functions and classes, followed through the globals of each
+  """
+  names = set()
+  modules = [module]
+  while modules:
+    module = modules.pop()
+    path = getattr(module, '__file__', None)
+    if path is None or os.path.dirname(os.path.abspath(path)) != LAB_DIR or os.path.basename(path) in names:
+      continue
+
+    names.add(os.path.basename(path))
+    for value in vars(module).values():
+      if inspect.ismodule(value):
+        modules.append(value)
+      elif isinstance(getattr(value, '__module__', None), str) and value.__module__ in sys.modules:
+        modules.append(sys.modules[value.__module__])
+
+  return tuple(sorted(names))
+
+# a change in any of them invalidates all the figures
+SOURCES = _get_sources(sys.modules[__name__])
+
+DPI = 100
+
+@dataclass
+class Job:
+  """
+  one figure: the method run on a problem of bench.PROBLEMS, saved as <name>.png
+  :param x0: starting point of newton, the middle of [a, b] by default
+  """
+  name: str
+  method: str
+  problem: str
+  eps: Any
+  title: str | None = None
+  x0: Any = None
+  use_tau: bool = False
+
+JOBS = [
+  Job(name='brute', method='brute_force', problem='lecture', eps=0.1, title='Перебор'),
+  Job(name='brute_multi1', method='brute_force', problem='multi_f1', eps=0.1, title='Перебор'),
+  Job(name='brute_multi2', method='brute_force', problem='multi_f2', eps=0.1, title='Перебор'),
+  Job(name='bitwise', method='bitwise_search', problem='lecture', eps=0.1, title='Поразрядный поиск'),
+  Job(name='dich', method='dichotomy', problem='lecture', eps=0.1, title='Дихотомия'),
+  Job(name='golden', method='golden_ratio', problem='quadratic', eps=0.1, title='Золотое сечение'),
+  Job(name='parabola', method='parabola', problem='lecture', eps=0.025),
+  Job(name='midpoint', method='midpoint', problem='lecture', eps=0.02),
+  Job(name='chord', method='chord', problem='lecture', eps=0.05),
+  Job(name='newton', method='newton', problem='newton_lecture', eps=1e-7, x0=1),
+  Job(name='newton_converge', method='newton', problem='newton_lecture', eps=1e-7, x0=3, use_tau=True),
+]
+
+SEARCH_METHODS = {
+  'brute_force': brute_force,
+  'multires_brute_force': multires_brute_force,
+  'bitwise_search': bitwise_search,
+  'dichotomy': dichotomy,
+  'golden_ratio': golden_ratio,
+  'k_section': k_section,
+  'brent': brent,
+}
+
+def _get_problem(name: str)->bench.Problem:
+  for problem in bench.PROBLEMS:
+    if problem.name == name:
+      return problem
+
+  raise ValueError(f'unknown problem: {name}')
+
+def _finish(fig: Figure):
+  for ax in fig.axes:
+    ax.legend()
+    ax.grid()
+
+def render(job: Job)->Figure:
+  """
+  runs the method of the job and draws its points as draw_single_plot/draw_double_plot would
+  """
+  problem = _get_problem(job.problem)
+  a, b = problem.a, problem.b
+
+  if job.method in SEARCH_METHODS or job.method == 'parabola':
+    log_points = LogPointsWrap(problem.f)
+    fig = Figure(dpi=DPI)
+    ax = fig.add_subplot()
+
+    if job.method == 'parabola':
+      eps_point = parabola(f=log_points, a=a, b=b, eps=job.eps)
+      plot_parabola_meth(ax=ax, f=problem.f, a=a, b=b, star_point=problem.star_point, eps_point=eps_point,
+                         k_points=log_points.points, eps=job.eps)
+    else:
+      eps_point = SEARCH_METHODS[job.method](f=log_points, a=a, b=b, eps=job.eps)
+      plot_brute_force(ax=ax, f=problem.f, a=a, b=b, star_point=problem.star_point, eps_point=eps_point,
+                       k_points=log_points.points, eps=job.eps, title=job.method if job.title is None else job.title)
+
+  elif job.method == 'midpoint':
+    log_points = LogPointsWrap(problem.fd1)
+    eps_point = midpoint(f=log_points, a=a, b=b, eps=job.eps)
+
+    fig = Figure(dpi=DPI)
+    plot_midpoint(ax=fig.add_subplot(), f=problem.f, a=a, b=b, star_point=problem.star_point, eps_point=eps_point,
+                  k_points=log_points.points)
+
+  elif job.method == 'chord':
+    log_points = LogPointsWrap(problem.fd1)
+    eps_point = chord(f=log_points, a=a, b=b, eps=job.eps)
+
+    fig = Figure(figsize=(12.8, 4.8), dpi=DPI)
+    ax1, ax2 = fig.subplots(1, 2)
+    plot_midpoint(ax=ax1, f=problem.f, a=a, b=b, star_point=problem.star_point, eps_point=eps_point,
+                  k_points=log_points.points, title='f, Хорды')
+    plot_chord(ax=ax2, fd1=problem.fd1, a=a, b=b, star_point=problem.star_point, eps_point=eps_point,
+               k_points=log_points.points)
+
+  elif job.method == 'newton':
+    x0 = (a + b) / 2 if job.x0 is None else job.x0
+    log_points = LogPointsWrap(problem.fd1)
+    eps_point = newton(fd1=log_points, fd2=problem.fd2, x0=x0, eps=job.eps, use_tau=job.use_tau)
+
+    points_x = log_points.points.x
+    wings = (points_x.max() - points_x.min()) / 10
+    eps_point = Point(x=eps_point.x, y=problem.f(eps_point.x))
+
+    fig = Figure(figsize=(12.8, 4.8), dpi=DPI)
+    ax1, ax2 = fig.subplots(1, 2)
+    plot_midpoint(ax=ax1, f=problem.f, a=points_x.min() - wings, b=points_x.max() + wings, star_point=problem.star_point,
+                  eps_point=eps_point, k_points=log_points.points, title='f, Ньютон')
+    plot_newton(ax=ax2, fd1=problem.fd1, fd2=problem.fd2, x0=x0, star_point=problem.star_point, eps_point=eps_point,
+                k_points=log_points.points)
+
+  else:
+    raise ValueError(f'no figure for the method: {job.method}')
+
+  _finish(fig)
+
+  return fig
+
+def render_to_file(job: Job, path)->str:
+  render(job).savefig(path)
+  return path
+
+def get_sources_hash(sources=SOURCES)->str:
+  sha = hashlib.sha256()
+  for name in sources:
+    with open(os.path.join(LAB_DIR, name), 'rb') as file:
+      sha.update(file.read())
+
+  return sha.hexdigest()
+
+def get_job_hash(job: Job, sources_hash: str)->str:
+  return hashlib.sha256((sources_hash + json.dumps(asdict(job), sort_keys=True)).encode()).hexdigest()
+
+def run(jobs=JOBS, out_dir=IMG_DIR, force=False, executor: Executor | None=None, max_workers=None, cache_dir=None)->dict:
+  """
+  renders the figures of jobs into out_dir, skipping those whose job and sources are unchanged since the last run
+  :param executor: renders the figures, a process pool of max_workers by default
+  :param cache_dir: where the hashes of the rendered jobs are kept, '.cache' in out_dir by default
+  :return: names of 'rendered', 'skipped' and 'failed' jobs, failures with their messages
+  """
+  names = [job.name for job in jobs]
+  assert len(set(names)) == len(names), 'job names must be unique'
+
+  if cache_dir is None:
+    cache_dir = os.path.join(out_dir, '.cache')
+
+  os.makedirs(out_dir, exist_ok=True)
+  manifest_path = os.path.join(cache_dir, MANIFEST)
+  try:
+    with open(manifest_path) as file:
+      manifest = json.load(file)
+  except (OSError, ValueError):
+    manifest = {}
+
+  sources_hash = get_sources_hash()
+  result = {'rendered': [], 'skipped': [], 'failed': {}}
+
+  pending = []
+  for job in jobs:
+    path = os.path.join(out_dir, job.name + '.png')
+    job_hash = get_job_hash(job=job, sources_hash=sources_hash)
+
+    if not force and manifest.get(job.name) == job_hash and os.path.exists(path):
+      result['skipped'].append(job.name)
+    else:
+      pending.append((job, path, job_hash))
+
+  if pending:
+    own_executor = executor is None
+    if own_executor:
+      executor = ProcessPoolExecutor(max_workers=max_workers)
+
+    try:
+      futures = [(job, job_hash, executor.submit(render_to_file, job, path)) for job, path, job_hash in pending]
+
+      for job, job_hash, future in futures:
+        try:
+          future.result()
+        except (AssertionError, ValueError, ZeroDivisionError, OverflowError) as e:
+          result['failed'][job.name] = f'{type(e).__name__}: {e}'
+          manifest.pop(job.name, None)
+          continue
+
+        manifest[job.name] = job_hash
+        result['rendered'].append(job.name)
+    finally:
+      if own_executor:
+        executor.shutdown()
+
+    os.makedirs(cache_dir, exist_ok=True)
+    with open(manifest_path, 'w') as file:
+      json.dump(manifest, file, indent=2, sort_keys=True)
+
+  return result
+
+def main(argv=None)->int:
+  parser = argparse.ArgumentParser(description='renders the figures of the methods without a display')
+  parser.add_argument('-o', '--output', default=IMG_DIR, help='directory to write the figures to')
+  parser.add_argument('--jobs', nargs='+', choices=[job.name for job in JOBS], help='names of the figures, all by default')
+  parser.add_argument('--force', action='store_true', help='render unchanged figures too')
+  parser.add_argument('-j', '--workers', type=int, help='number of processes, the number of CPUs by default')
+  args = parser.parse_args(argv)
+
+  jobs = JOBS if args.jobs is None else [job for job in JOBS if job.name in args.jobs]
+  result = run(jobs=jobs, out_dir=args.output, force=args.force, max_workers=args.workers)
+
+  print(f"rendered: {len(result['rendered'])}, skipped: {len(result['skipped'])}, failed: {len(result['failed'])}")
+  for name, error in result['failed'].items():
+    print(f'{name}: {error}')
+
+  return 1 if result['failed'] else 0
+
+if __name__ == '__main__':
+  sys.exit(main())
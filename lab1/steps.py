@@ -0,0 +1,1012 @@
+import bisect
+import heapq
+import itertools
+import math
+import os
+import time
+from concurrent.futures import Executor
+from typing import Callable, Any, Generator, Sequence
+import numpy as np
+from autodiff import AutoDiff
+from utils import Point, Profile, Checkpoint, eval_chunks
+
+# the methods as generators that don't call the functions themselves: they yield a Step with the points
+# they need and the function to evaluate them with, and get the values back by send():
+#
+#   solver = golden_ratio_steps(f=f, a=0, b=1, eps=1e-3)
+#   step = next(solver)
+#   while True:
+#     step = solver.send([step.func(x) for x in step.x])  # StopIteration.value is the result
+#
+# They take the arguments of the methods of algos and report profile iterations and checkpoint snapshots as they do;
+# counting the evaluations is up to the caller (the methods of algos and async_algos wrap f as _profiled does).
+# run and run_all do the evaluations, so a solver can be stopped between any two steps (or closed by the caller)
+# and the points of many solvers can be evaluated together
+
+BRUTE_FORCE_BLOCK_SIZE = 1 << 16
+
+class Step:
+  """
+  state of a solver and the points it needs next. A solver updates the same Step on every step instead of
+  allocating one, so read it before sending the values
+  :param x: points to evaluate, the values are sent back in the same order
+  :param func: the function to evaluate them with, one of the functions the solver was given
+  :param bracket: (a, b) holding the min (the root for midpoint and chord), None if the method has none;
+                  for polygonal_chain (lower bound of f on [a, b], best value) instead
+  :param best: best evaluated point so far (least |value| for the root finders), None before the first values
+  :param evals: number of values sent so far
+  """
+  __slots__ = ('x', 'func', 'bracket', '_tracker')
+
+  def __init__(self, tracker: '_Tracker'):
+    self.x = ()
+    self.func = tracker.func
+    self.bracket = None
+    self._tracker = tracker
+
+  @property
+  def best(self)->Point | None:
+    return self._tracker.best
+
+  @property
+  def evals(self)->int:
+    return self._tracker.evals
+
+  def __repr__(self):
+    return f'Step(x={self.x!r}, func={self.func!r}, bracket={self.bracket!r}, best={self.best!r}, evals={self.evals!r})'
+
+Solver = Generator[Step, Sequence, Any]
+
+_SMALL_STEP = 16
+
+class _Tracker:
+  """
+  counts the values and keeps the best point of func, the Point is built only when it's read
+  """
+  __slots__ = ('func', 'key', 'evals', '_best', '_best_x', '_best_y', '_best_score', '_step')
+
+  def __init__(self, func: Callable[[Any], Any], key: Callable[[Any], Any] | None=None):
+    self.func = func
+    self.key = key
+    self.evals = 0
+    self._best = None
+    self._best_x = None
+    self._best_y = None
+    self._best_score = None
+    self._step = Step(self)
+
+  @property
+  def best(self)->Point | None:
+    if self._best is None and self._best_score is not None:
+      self._best = Point(x=self._best_x, y=self._best_y)
+
+    return self._best
+
+  def ask(self, x: Sequence, bracket: tuple | None=None, func: Callable[[Any], Any] | None=None)->Step:
+    step = self._step
+    step.x = x
+    step.func = self.func if func is None else func
+    step.bracket = bracket
+    return step
+
+  def tell(self, values: Sequence)->Sequence:
+    step = self._step
+    n = len(values)
+    assert n == len(step.x), f'expected {len(step.x)} values, got {n}'
+
+    self.evals += n
+    if step.func is not self.func or not n:
+      return values
+
+    # the first least value, as the strict comparisons of algos; numpy only pays off for the blocks of brute_force
+    if n == 1:
+      i = 0
+      score = values[0] if self.key is None else self.key(values[0])
+    elif n <= _SMALL_STEP:
+      scores = values if self.key is None else [self.key(value) for value in values]
+      i = 0
+      for j in range(1, n):
+        if scores[j] < scores[i]: i = j
+      score = scores[i]
+    else:
+      scores = np.asarray(values, dtype=float)
+      if self.key is not None:
+        scores = self.key(scores)
+      i = int(np.argmin(scores))
+      score = scores[i]
+
+    if self._best_score is None or score < self._best_score:
+      self._best = None
+      self._best_x, self._best_y, self._best_score = step.x[i], values[i], score
+
+    return values
+
+  def delegate(self, solver: Solver)->Solver:
+    """
+    runs another solver as a part of this one
+    """
+    values = None
+    while True:
+      try:
+        step = solver.send(values)
+      except StopIteration as e:
+        return e.value
+
+      values = self.tell((yield self.ask(x=step.x, bracket=step.bracket, func=step.func)))
+
+def _linspace_block(a, b, n, start, stop)->np.ndarray:
+  """
+  elements [start, stop) of np.linspace(a, b, n + 1) without building the whole grid
+  """
+  if n == 0:
+    return np.array([a], dtype=float)
+
+  x = np.arange(start, stop) * ((b - a) / n) + a
+  if stop == n + 1:
+    x[-1] = b
+
+  return x
+
+def brute_force_steps(f: Callable[[Any], Any], a, b, eps, block_size=None,
+                      *, profile: Profile | None=None, checkpoint: Checkpoint | None=None)->Solver:
+  """
+  asks for the grid block by block
+  :param block_size: number of grid points asked for at once, BRUTE_FORCE_BLOCK_SIZE by default
+  :param checkpoint: a snapshot holds the minimum of the done blocks
+  """
+  assert a <= b
+  assert eps > 0
+
+  n = int(math.ceil((b - a) / eps))
+
+  if block_size is None:
+    block_size = BRUTE_FORCE_BLOCK_SIZE
+  assert block_size > 0
+
+  starts = range(0, n + 1, block_size)
+
+  state = checkpoint.resume(a, b, eps, block_size) if checkpoint is not None else None
+  first_block, min_point = (0, None) if state is None else (state['block'], state['min_point'])
+  tracker = _Tracker(func=f)
+
+  for i in range(first_block, len(starts)):
+    start, stop = starts[i], min(starts[i] + block_size, n + 1)
+    x = _linspace_block(a=a, b=b, n=n, start=start, stop=stop)
+    y = tracker.tell((yield tracker.ask(x=x, bracket=(a, b))))
+
+    # strict comparison keeps the first minimum, as np.argmin does
+    ind_min = np.argmin(y)
+    if min_point is None or y[ind_min] < min_point.y:
+      min_point = Point(x=x[ind_min], y=y[ind_min])
+
+    if profile is not None: profile.iteration(width=(stop - start) * (b - a) / (n + 1))
+    if checkpoint is not None: checkpoint.iteration(get_state=lambda: {'block': i + 1, 'min_point': min_point})
+
+  return min_point
+
+def _get_bitwise_grid(a, b, delta, eps)->tuple[Any, int, Any]:
+  """
+  :return: the last step q of bitwise_search (the first one <= eps) that all the points a + k * q lie on,
+           the initial step in units of q and the index of the last grid point in [a, b] (inf for b=inf)
+  """
+  step = 1
+  while delta / step > eps:
+    step *= 4
+  q = delta / step
+
+  k_b = math.inf if b == math.inf else math.floor((b - a) / q + 1e-9)
+
+  return q, step, k_b
+
+def _get_bitwise_bracket(keys: list[int], k, k_b)->tuple[Any, Any]:
+  """
+  the stored neighbours of k, the unimodal minimum is between them
+  """
+  i = bisect.bisect_left(keys, k)
+  lo = keys[i - 1] if i > 0 else 0
+  hi = keys[i + 1] if i + 1 < len(keys) else k_b
+
+  return lo, hi
+
+def bitwise_search_steps(f: Callable[[Any], Any], a, b, eps, get_init_delta=lambda: 0.25,
+                         *, profile: Profile | None=None, checkpoint: Checkpoint | None=None)->Solver:
+  assert a <= b
+  assert eps > 0
+
+  delta1 = get_init_delta()
+  assert delta1 > eps
+  q, step, k_b = _get_bitwise_grid(a=a, b=b, delta=delta1, eps=eps)
+
+  state = checkpoint.resume(a, b, eps, delta1) if checkpoint is not None else None
+  if state is None:
+    values = {}
+    lo, hi = 0, k_b
+    k, direction = 0, 1
+  else:
+    values = state['values']
+    lo, hi, k, direction, step = state['lo'], state['hi'], state['k'], state['direction'], state['step']
+  keys = sorted(values)
+  tracker = _Tracker(func=f)
+
+  def get_f(k):
+    if k not in values:
+      values[k], = tracker.tell((yield tracker.ask(x=(a + k * q,), bracket=(a + lo * q, min(a + hi * q, b)))))
+      bisect.insort(keys, k)
+
+    return values[k]
+
+  while True:
+    f_curr = yield from get_f(k)
+
+    k_next = k + direction * step
+
+    while lo <= k_next <= hi:
+      f_next = yield from get_f(k_next)
+      if f_curr <= f_next: break
+      f_curr = f_next
+      k = k_next
+      k_next += direction * step
+      if profile is not None: profile.iteration(width=step * q)
+      if checkpoint is not None:
+        checkpoint.iteration(get_state=lambda: {'values': values, 'lo': lo, 'hi': hi, 'k': k, 'direction': direction, 'step': step})
+
+    if k_next > k_b:
+      x = a + k * q
+      if x != b:
+        f_curr, = tracker.tell((yield tracker.ask(x=(b,), bracket=(x, b))))
+      return Point(x=b, y=f_curr)
+
+    if step == 1:
+      return Point(x=a + k * q, y=f_curr)
+
+    lo, hi = _get_bitwise_bracket(keys=keys, k=k, k_b=k_b)
+    if lo <= k_next <= hi:
+      k = k_next
+    direction = -direction
+    step //= 4
+
+def dichotomy_steps(f: Callable[[Any], Any], a, b, eps, *, profile: Profile | None=None, checkpoint: Checkpoint | None=None)->Solver:
+  assert a <= b
+  assert eps > 0
+
+  delta = eps / 5
+
+  state = checkpoint.resume(a, b, eps) if checkpoint is not None else None
+  if state is not None:
+    a, b = state['a'], state['b']
+  tracker = _Tracker(func=f)
+
+  while True:
+    x1 = (b + a - delta) / 2
+    x2 = (b + a + delta) / 2
+
+    y1, y2 = tracker.tell((yield tracker.ask(x=(x1, x2), bracket=(a, b))))
+
+    if y1 <= y2:
+      b = x2
+    else:
+      a = x1
+
+    if profile is not None: profile.iteration(width=b - a)
+    if checkpoint is not None: checkpoint.iteration(get_state=lambda: {'a': a, 'b': b})
+
+    eps_n = (b - a) / 2
+
+    if eps_n <= eps: break
+
+  x_min = (a + b) / 2
+  y_min, = tracker.tell((yield tracker.ask(x=(x_min,), bracket=(a, b))))
+
+  return Point(x=x_min, y=y_min)
+
+def golden_ratio_steps(f: Callable[[Any], Any], a, b, eps, *, profile: Profile | None=None, checkpoint: Checkpoint | None=None)->Solver:
+  assert a <= b
+  assert eps > 0
+
+  tau = (math.sqrt(5) - 1) / 2
+  tracker = _Tracker(func=f)
+
+  state = checkpoint.resume(a, b, eps) if checkpoint is not None else None
+  if state is None:
+    x1 = a + (3 - math.sqrt(5)) / 2 * (b - a)
+    x2 = a + (math.sqrt(5) - 1) / 2 * (b - a)
+
+    y1, y2 = tracker.tell((yield tracker.ask(x=(x1, x2), bracket=(a, b))))
+
+    eps_n = (b - a) / 2
+  else:
+    a, b, x1, x2, y1, y2, eps_n = (state[name] for name in ('a', 'b', 'x1', 'x2', 'y1', 'y2', 'eps_n'))
+
+  while eps_n > eps:
+    if y1 <= y2:
+      b = x2
+      x2 = x1
+      y2 = y1
+      x1 = a + b - x2
+
+      y1, = tracker.tell((yield tracker.ask(x=(x1,), bracket=(a, b))))
+    else:
+      a = x1
+      x1 = x2
+      y1 = y2
+      x2 = a + b - x1
+
+      y2, = tracker.tell((yield tracker.ask(x=(x2,), bracket=(a, b))))
+
+    if profile is not None: profile.iteration(width=b - a)
+
+    eps_n = tau * eps_n
+
+    if checkpoint is not None:
+      checkpoint.iteration(get_state=lambda: {'a': a, 'b': b, 'x1': x1, 'x2': x2, 'y1': y1, 'y2': y2, 'eps_n': eps_n})
+
+  x_min = (a + b) / 2
+  y_min, = tracker.tell((yield tracker.ask(x=(x_min,), bracket=(a, b))))
+
+  return Point(x=x_min, y=y_min)
+
+def k_section_steps(f: Callable[[Any], Any], a, b, eps, k: int | None=None,
+                    *, profile: Profile | None=None, checkpoint: Checkpoint | None=None)->Solver:
+  """
+  asks for the k probes of an iteration at once
+  """
+  assert a <= b
+  assert eps > 0
+
+  if k is None:
+    k = max(os.cpu_count() or 1, 2)
+  assert k >= 2
+
+  state = checkpoint.resume(a, b, eps, k) if checkpoint is not None else None
+  if state is not None:
+    a, b = state['a'], state['b']
+  tracker = _Tracker(func=f)
+
+  while True:
+    x = [a + i * (b - a) / (k + 1) for i in range(1, k + 1)]
+    y = tracker.tell((yield tracker.ask(x=x, bracket=(a, b))))
+
+    # strict comparison keeps the first minimum
+    j = 0
+    for i in range(1, k):
+      if y[i] < y[j]:
+        j = i
+
+    a, b = (x[j - 1] if j > 0 else a), (x[j + 1] if j < k - 1 else b)
+
+    if profile is not None: profile.iteration(width=b - a)
+    if checkpoint is not None: checkpoint.iteration(get_state=lambda: {'a': a, 'b': b})
+
+    eps_n = (b - a) / 2
+
+    if eps_n <= eps: break
+
+  x_min = (a + b) / 2
+  y_min, = tracker.tell((yield tracker.ask(x=(x_min,), bracket=(a, b))))
+
+  return Point(x=x_min, y=y_min)
+
+def get_init_points_gr_steps(f: Callable[[Any], Any], a, b)->Solver:
+  assert a <= b
+
+  tracker = _Tracker(func=f)
+
+  x1 = a + (3 - math.sqrt(5)) / 2 * (b - a)
+  x2 = a + (math.sqrt(5) - 1) / 2 * (b - a)
+
+  y1, y2 = tracker.tell((yield tracker.ask(x=(x1, x2), bracket=(a, b))))
+
+  ret_points = None
+
+  if y1 <= y2:
+    ret_points = [Point(x=a, y=None), Point(x=x1, y=y1), Point(x=x2, y=y2)]
+  else:
+    ret_points = [Point(x=x1, y=y1), Point(x=x2, y=y2), Point(x=b, y=None)]
+
+  assert ret_points[0].x < ret_points[1].x < ret_points[2].x
+
+  return ret_points
+
+def get_init_points_gr(f: Callable[[Any], Any], a, b)->list[Point]:
+  return run(get_init_points_gr_steps(f=f, a=a, b=b))
+
+def get_fixed_init_points(*args, **kwargs):
+  return (Point(x=0.25, y=None), Point(x=0.5, y=None), Point(x=0.75, y=None))
+
+# get_init_points of parabola -> its step-wise form, parabola_steps asks for the points of these instead of calling them
+INIT_POINTS_STEPS = {
+  get_init_points_gr: get_init_points_gr_steps,
+}
+
+def _get_parabola_min(x1, x2, x3, f1, f2, f3):
+  """
+  vertex of the parabola a0 + a1 (x - x1) + a2 (x - x1) (x - x2) through the three points
+  :return: x of the vertex and a2, the vertex is a minimum only if a2 > 0
+  """
+  a1 = (f2 - f1) / (x2 - x1)
+  a2 = 1 / (x3 - x2) * ((f3 - f1) / (x3 - x1) - (f2 - f1) / (x2 - x1))
+
+  return 1 / 2 * (x1 + x2 - a1 / a2), a2
+
+def parabola_steps(f: Callable[[Any], Any], a, b, eps, get_init_points=get_fixed_init_points,
+                   *, profile: Profile | None=None, checkpoint: Checkpoint | None=None)->Solver:
+  """
+  :param get_init_points: as in parabola, the ones in INIT_POINTS_STEPS ask for their points, the others call f
+  """
+  assert a <= b
+  assert eps > 0
+
+  tracker = _Tracker(func=f)
+
+  state = checkpoint.resume(a, b, eps) if checkpoint is not None else None
+  if state is None:
+    if get_init_points in INIT_POINTS_STEPS:
+      init_points = yield from tracker.delegate(INIT_POINTS_STEPS[get_init_points](f=f, a=a, b=b))
+    else:
+      init_points = get_init_points(f=f, a=a, b=b)
+
+    missing = [point for point in init_points if point.y is None]
+    if missing:
+      y = tracker.tell((yield tracker.ask(x=tuple(point.x for point in missing), bracket=(a, b))))
+      for point, y_i in zip(missing, y):
+        point.y = y_i
+
+    x1, x2, x3 = init_points[0].x, init_points[1].x, init_points[2].x
+    f1, f2, f3 = init_points[0].y, init_points[1].y, init_points[2].y
+    assert x1 < x2 < x3
+    assert f1 >= f2 <= f3
+
+    old_x_min = None
+  else:
+    x1, x2, x3, f1, f2, f3, old_x_min = (state[name] for name in ('x1', 'x2', 'x3', 'f1', 'f2', 'f3', 'old_x_min'))
+
+  while True:
+    x_min, _ = _get_parabola_min(x1=x1, x2=x2, x3=x3, f1=f1, f2=f2, f3=f3)
+
+    if (old_x_min is not None) and (abs(old_x_min - x_min) <= eps): return Point(x=x_min, y=None)
+
+    f_min, = tracker.tell((yield tracker.ask(x=(x_min,), bracket=(x1, x3))))
+
+    if x_min < x2:
+      if f_min >= f2:
+        x1 = x_min
+        f1 = f_min
+      else:
+        x3 = x2
+        f3 = f2
+        x2 = x_min
+        f2 = f_min
+
+    else:
+      if f_min < f2:
+        x1 = x2
+        f1 = f2
+        x2 = x_min
+        f2 = f_min
+      else:
+        x3 = x_min
+        f3 = f_min
+
+    if profile is not None: profile.iteration(width=x3 - x1)
+
+    old_x_min = x_min
+
+    if checkpoint is not None:
+      checkpoint.iteration(get_state=lambda: {'x1': x1, 'x2': x2, 'x3': x3, 'f1': f1, 'f2': f2, 'f3': f3, 'old_x_min': old_x_min})
+
+def brent_steps(f: Callable[[Any], Any], a, b, eps, *, profile: Profile | None=None, checkpoint: Checkpoint | None=None)->Solver:
+  assert a <= b
+  assert eps > 0
+
+  c = (3 - math.sqrt(5)) / 2
+  tracker = _Tracker(func=f)
+
+  names = ('a', 'b', 'x', 'w', 'v', 'fx', 'fw', 'fv', 'd', 'e')
+  state = checkpoint.resume(a, b, eps) if checkpoint is not None else None
+  if state is None:
+    # x is the best point, w the second best, v the previous w
+    x = w = v = a + c * (b - a)
+    fx, = tracker.tell((yield tracker.ask(x=(x,), bracket=(a, b))))
+    fw = fv = fx
+    d = e = 0.0 # the last step and the one before it
+  else:
+    a, b, x, w, v, fx, fw, fv, d, e = (state[name] for name in names)
+
+  while True:
+    m = (a + b) / 2
+    tol = eps / 2 + 1e-16 * abs(x)
+
+    if abs(x - m) <= 2 * tol - (b - a) / 2: break
+
+    golden_step = True
+
+    if abs(e) > tol and x != w != v != x:
+      try:
+        u, a2 = _get_parabola_min(x1=v, x2=w, x3=x, f1=fv, f2=fw, f3=fx)
+      except ZeroDivisionError: # the points are on a line
+        u, a2 = x, 0
+
+      if a2 > 0 and a < u < b and abs(u - x) < abs(e) / 2:
+        golden_step = False
+        e, d = d, u - x
+
+        if u - a < 2 * tol or b - u < 2 * tol:
+          d = tol if x < m else -tol
+
+    if golden_step:
+      e = (b - x) if x < m else (a - x)
+      d = c * e
+
+    u = x + d if abs(d) >= tol else x + (tol if d > 0 else -tol)
+    fu, = tracker.tell((yield tracker.ask(x=(u,), bracket=(a, b))))
+
+    if fu <= fx:
+      if u < x:
+        b = x
+      else:
+        a = x
+
+      v, fv = w, fw
+      w, fw = x, fx
+      x, fx = u, fu
+    else:
+      if u < x:
+        a = u
+      else:
+        b = u
+
+      if fu <= fw or w == x:
+        v, fv = w, fw
+        w, fw = u, fu
+      elif fu <= fv or v == x or v == w:
+        v, fv = u, fu
+
+    if profile is not None: profile.iteration(width=b - a)
+    if checkpoint is not None: checkpoint.iteration(get_state=lambda: dict(zip(names, (a, b, x, w, v, fx, fw, fv, d, e))))
+
+  return Point(x=x, y=fx)
+
+def midpoint_steps(f: Callable[[Any], Any] | AutoDiff, a, b, eps,
+                   *, profile: Profile | None=None, checkpoint: Checkpoint | None=None)->Solver:
+  """
+  solves f(x) = 0 as midpoint
+  """
+  assert a <= b
+  assert eps > 0
+
+  if isinstance(f, AutoDiff):
+    f = f.fd1
+
+  state = checkpoint.resume(a, b, eps) if checkpoint is not None else None
+  if state is not None:
+    a, b = state['a'], state['b']
+  tracker = _Tracker(func=f, key=abs)
+
+  while True:
+    x_mid = (a + b) / 2
+    f_mid, = tracker.tell((yield tracker.ask(x=(x_mid,), bracket=(a, b))))
+
+    if abs(f_mid) <= eps:
+      return Point(x=x_mid, y=None)
+
+    if f_mid > 0:
+      b = x_mid
+    else:
+      a = x_mid
+
+    if profile is not None: profile.iteration(width=b - a)
+    if checkpoint is not None: checkpoint.iteration(get_state=lambda: {'a': a, 'b': b})
+
+def chord_steps(f: Callable[[Any], Any] | AutoDiff, a, b, eps,
+                *, profile: Profile | None=None, checkpoint: Checkpoint | None=None)->Solver:
+  """
+  solves f(x) = 0 as chord
+  """
+  assert a <= b
+  assert eps > 0
+
+  if isinstance(f, AutoDiff):
+    f = f.fd1
+  tracker = _Tracker(func=f, key=abs)
+
+  state = checkpoint.resume(a, b, eps) if checkpoint is not None else None
+  if state is None:
+    fa, fb = tracker.tell((yield tracker.ask(x=(a, b), bracket=(a, b))))
+  else:
+    a, b, fa, fb = state['a'], state['b'], state['fa'], state['fb']
+
+  while True:
+    x_tilda = a - fa / (fa - fb) * (a - b)
+
+    fx, = tracker.tell((yield tracker.ask(x=(x_tilda,), bracket=(a, b))))
+
+    if abs(fx) <= eps:
+      return Point(x=x_tilda, y=None)
+
+    if fx > 0:
+      b = x_tilda
+      fb = fx
+    else:
+      a = x_tilda
+      fa = fx
+
+    if profile is not None: profile.iteration(width=b - a)
+    if checkpoint is not None: checkpoint.iteration(get_state=lambda: {'a': a, 'b': b, 'fa': fa, 'fb': fb})
+
+def newton_steps(fd1: Callable[[Any], Any] | AutoDiff, fd2: Callable[[Any], Any] | None,
+                 x0: Any, eps, use_tau=False, f=None, kmax: int=1000,
+                 *, profile: Profile | None=None, checkpoint: Checkpoint | None=None)->Solver:
+  """
+  as newton, the best point is the one of the least |f'|
+  """
+  assert eps > 0
+
+  if isinstance(fd1, AutoDiff):
+    fd1, fd2 = fd1.fd1, fd1.fd2
+  if isinstance(f, AutoDiff):
+    f = f.f
+  tracker = _Tracker(func=fd1, key=abs)
+
+  state = checkpoint.resume(x0, eps, use_tau, f is not None, kmax) if checkpoint is not None else None
+  if state is None:
+    x, i = x0, 0
+    y = tracker.tell((yield tracker.ask(x=(x,), func=f)))[0] if f is not None else None
+    tau = 1.0
+    mu = 0
+  else:
+    x, y, i, tau, mu = state['x'], state['y'], state['i'], state['tau'], state['mu']
+
+  while i < kmax:
+    yd1, = tracker.tell((yield tracker.ask(x=(x,), func=fd1)))
+    yd2, = tracker.tell((yield tracker.ask(x=(x,), func=fd2)))
+
+    try:
+      if use_tau:
+        x_tau = x - yd1 / yd2
+        yd1_tau, = tracker.tell((yield tracker.ask(x=(x_tau,), func=fd1)))
+        tau = (yd1**2) / (yd1**2 + yd1_tau**2)
+
+      if f is not None and mu == 0:
+        mu = yd2 * 10
+
+      x_new = x - tau * yd1 / (yd2 + mu)
+    except ZeroDivisionError as e:
+      raise ValueError(f"The method doesn't converge after the iteration: №{i} with x0: {x0}, ε: {eps}, τ: {tau}, μ: {mu}") from e
+
+    if f is not None:
+      y_new, = tracker.tell((yield tracker.ask(x=(x_new,), func=f)))
+      if y_new < y:
+        mu /= 2
+      else:
+        mu *= 2
+
+      y = y_new
+
+    if profile is not None: profile.iteration(width=abs(x_new - x))
+
+    x = x_new
+    i += 1
+
+    if abs(yd1) <= eps: break
+
+    if checkpoint is not None: checkpoint.iteration(get_state=lambda: {'x': x, 'y': y, 'i': i, 'tau': tau, 'mu': mu})
+
+  if i == kmax:
+    raise ValueError(f"The method didn't achieve the specified ε after the max iteration: №{i} with x0: {x0}, ε: {eps}, τ: {tau}, μ: {mu}")
+
+  return Point(x=x, y=y)
+
+def polygonal_chain_steps(f: Callable[[Any], Any], a, b, eps, get_L=None, r=2.0, local=True, n_init: int=10,
+                          *, profile: Profile | None=None, checkpoint: Checkpoint | None=None)->Solver:
+  """
+  as polygonal_chain, the bracket of a step is (the least lower bound of f on [a, b], the best value)
+  """
+  assert a <= b
+  assert eps > 0
+
+  if get_L is None:
+    return (yield from _adaptive_polygonal_chain_steps(f=f, a=a, b=b, eps=eps, r=r, local=local, n_init=n_init,
+                                                       profile=profile, checkpoint=checkpoint))
+
+  L = get_L(f=f, a=a, b=b, eps=eps)
+  tracker = _Tracker(func=f)
+
+  state = checkpoint.resume(a, b, eps, L) if checkpoint is not None else None
+  if state is None:
+    fa, fb = tracker.tell((yield tracker.ask(x=(a, b))))
+
+    best_point = Point(x=a, y=fa) if fa <= fb else Point(x=b, y=fb)
+
+    # heap of (lower bound, insertion order, x); the order keeps ties in FIFO order
+    order = itertools.count()
+    pairs = [(1/2 * (fa + fb + L * (a - b)), next(order), 1/(2*L) * (fa - fb + L * (a + b)))]
+  else:
+    best_point, pairs, order = state['best_point'], state['pairs'], itertools.count(state['order'])
+
+  while pairs:
+    star_y, _, star_x = heapq.heappop(pairs)
+    if star_y > best_point.y: continue # the interval can't hold a value below the best one
+
+    f_star, = tracker.tell((yield tracker.ask(x=(star_x,), bracket=(star_y, best_point.y))))
+    if f_star < best_point.y:
+      best_point = Point(x=star_x, y=f_star)
+
+    delta = 1 / (2*L) * (f_star - star_y)
+    if profile is not None: profile.iteration(width=2 * delta)
+
+    if 2 * L * delta <= eps:
+      return Point(x=star_x, y=f_star)
+
+    p = 1 / 2 * (f_star + star_y)
+    if p > best_point.y: continue
+
+    heapq.heappush(pairs, (p, next(order), star_x - delta))
+    heapq.heappush(pairs, (p, next(order), star_x + delta))
+
+    if checkpoint is not None:
+      checkpoint.iteration(get_state=lambda: {'best_point': best_point, 'pairs': pairs, 'order': next(order)})
+
+  # reachable only when L underestimates the Lipschitz constant
+  return best_point
+
+def _adaptive_polygonal_chain_steps(f: Callable[[Any], Any], a, b, eps, r, local, n_init, profile: Profile | None,
+                                    checkpoint: Checkpoint | None)->Solver:
+  """
+  polygonal chain with the Lipschitz constant estimated from the slopes between evaluated points:
+  globally L = r * max slope, locally (Sergeyev's local tuning) L_i = r * max(λ_i, γ_i, ξ)
+  with λ_i the max slope of the interval and its neighbours and γ_i = max slope * len_i / max len.
+  Stops when the best value is within eps of the lowest estimated lower bound
+  """
+  assert r > 1
+  assert n_init >= 2
+
+  xi = 1e-8 # keeps flat parts of f from getting L = 0
+  tracker = _Tracker(func=f)
+
+  if a == b:
+    y, = tracker.tell((yield tracker.ask(x=(a,), bracket=(a, b))))
+    return Point(x=a, y=y)
+
+  # the evaluated points determine the rest of the state
+  state = checkpoint.resume(a, b, eps, r, local, n_init) if checkpoint is not None else None
+  if state is None:
+    nodes = [a] + list(np.linspace(a, b, n_init)[1:-1]) + [b]
+    z = dict(zip(nodes, tracker.tell((yield tracker.ask(x=nodes)))))
+    best_point = min((Point(x=x, y=z[x]) for x in nodes), key=lambda point: point.y)
+  else:
+    z, best_point = state['z'], state['best_point']
+    nodes = sorted(z)
+
+  # intervals are keyed by their left end
+  right = dict(zip(nodes[:-1], nodes[1:]))
+  left = dict(zip(nodes[1:], nodes[:-1]))
+  slopes = {xl: abs(z[xr] - z[xl]) / (xr - xl) for xl, xr in right.items()}
+  max_slope = max(slopes.values())
+  lengths = [(-(xr - xl), xl, xr) for xl, xr in right.items()] # max-heap of interval lengths with lazy deletion
+  heapq.heapify(lengths)
+  max_length = -lengths[0][0]
+
+  order = itertools.count()
+  current = {} # left end -> order of its valid heap entry
+
+  def get_entry(xl):
+    xr = right[xl]
+    length = xr - xl
+
+    if local:
+      neighbours = [slopes[xl]]
+      if xl in left: neighbours.append(slopes[left[xl]])
+      if xr in right: neighbours.append(slopes[xr])
+      L = r * max(max(neighbours), max_slope * length / max_length, xi)
+    else:
+      L = r * max(max_slope, xi)
+
+    current[xl] = next(order)
+    lower_bound = (z[xl] + z[xr]) / 2 - L * length / 2
+    x_new = (xl + xr) / 2 - (z[xr] - z[xl]) / (2 * L)
+
+    return lower_bound, current[xl], xl, x_new
+
+  heap = [get_entry(xl) for xl in right]
+  heapq.heapify(heap)
+
+  while True:
+    lower_bound, entry_order, xl, x_new = heapq.heappop(heap)
+    if current.get(xl) != entry_order: continue
+
+    if best_point.y - lower_bound <= eps:
+      return best_point
+
+    xr = right[xl]
+    z[x_new], = tracker.tell((yield tracker.ask(x=(x_new,), bracket=(lower_bound, best_point.y))))
+    if z[x_new] < best_point.y:
+      best_point = Point(x=x_new, y=z[x_new])
+
+    if profile is not None: profile.iteration(width=xr - xl)
+
+    right[xl], right[x_new] = x_new, xr
+    left[x_new], left[xr] = xl, x_new
+    slopes[xl] = abs(z[x_new] - z[xl]) / (x_new - xl)
+    slopes[x_new] = abs(z[xr] - z[x_new]) / (xr - x_new)
+    heapq.heappush(lengths, (-(x_new - xl), xl, x_new))
+    heapq.heappush(lengths, (-(xr - x_new), x_new, xr))
+
+    while right.get(lengths[0][1]) != lengths[0][2]:
+      heapq.heappop(lengths)
+
+    old_max_slope, old_max_length = max_slope, max_length
+    max_slope = max(max_slope, slopes[xl], slopes[x_new])
+    max_length = -lengths[0][0]
+
+    if max_slope != old_max_slope or (local and max_length != old_max_length):
+      # every estimate depends on them
+      heap = [get_entry(xl) for xl in right]
+      heapq.heapify(heap)
+    else:
+      changed = [xl, x_new]
+      if local:
+        if xl in left: changed.append(left[xl])
+        if xr in right: changed.append(xr)
+
+      for xl in changed:
+        heapq.heappush(heap, get_entry(xl))
+
+    if checkpoint is not None: checkpoint.iteration(get_state=lambda: {'z': z, 'best_point': best_point})
+
+def parallel_polygonal_chain_steps(f: Callable[[Any], Any], a, b, eps, get_L, k: int | None=None,
+                                   *, profile: Profile | None=None, checkpoint: Checkpoint | None=None)->Solver:
+  """
+  asks for the k candidates of a round at once, the bracket is as in polygonal_chain_steps
+  """
+  assert a <= b
+  assert eps > 0
+
+  if k is None:
+    k = os.cpu_count() or 1
+  assert k >= 1
+
+  L = get_L(f=f, a=a, b=b, eps=eps)
+  tracker = _Tracker(func=f)
+
+  state = checkpoint.resume(a, b, eps, L, k) if checkpoint is not None else None
+  if state is None:
+    fa, fb = tracker.tell((yield tracker.ask(x=(a, b))))
+
+    best_point = Point(x=a, y=fa) if fa <= fb else Point(x=b, y=fb)
+
+    # heap of (lower bound, insertion order, x) as in polygonal_chain
+    order = itertools.count()
+    pairs = [(1/2 * (fa + fb + L * (a - b)), next(order), 1/(2*L) * (fa - fb + L * (a + b)))]
+  else:
+    best_point, pairs, order = state['best_point'], state['pairs'], itertools.count(state['order'])
+
+  while pairs and best_point.y - pairs[0][0] > eps:
+    # the rest of the heap can't hold a value below the best one once the top can't
+    batch = []
+    while pairs and len(batch) < k and pairs[0][0] <= best_point.y:
+      batch.append(heapq.heappop(pairs))
+
+    x = [star_x for _, _, star_x in batch]
+    y = tracker.tell((yield tracker.ask(x=x, bracket=(batch[0][0], best_point.y))))
+
+    for (star_y, _, star_x), f_star in zip(batch, y):
+      if f_star < best_point.y:
+        best_point = Point(x=star_x, y=f_star)
+
+    for (star_y, _, star_x), f_star in zip(batch, y):
+      delta = 1 / (2*L) * (f_star - star_y)
+      if 2 * L * delta <= eps: continue # the interval can't hold a value eps below f_star
+
+      p = 1 / 2 * (f_star + star_y)
+      if p > best_point.y: continue
+
+      heapq.heappush(pairs, (p, next(order), star_x - delta))
+      heapq.heappush(pairs, (p, next(order), star_x + delta))
+
+    if profile is not None: profile.iteration(width=best_point.y - (pairs[0][0] if pairs else best_point.y))
+    if checkpoint is not None:
+      checkpoint.iteration(get_state=lambda: {'best_point': best_point, 'pairs': pairs, 'order': next(order)})
+
+  return best_point
+
+def run_all(solvers: Sequence[Solver], vectorized=False, executor: Executor | None=None, chunk_size=None,
+            stop: Callable[[int, Step], bool] | None=None, time_budget=None)->list[Any]:
+  """
+  advances the solvers together, each round the points all of them ask for are evaluated in one batch per function
+  :param vectorized: call a function once per round on the array of all its points instead of on each point,
+                     a function that rejects arrays is called per point from then on
+  :param executor: if set, the points of a round are evaluated by it in chunks (the functions must be picklable
+                   for a process pool)
+  :param chunk_size: number of points per task of executor, about 4 tasks per cpu by default
+  :param stop: stop(i, step) is called on every step of solver i, the solver is closed once it returns True
+  :param time_budget: seconds after which the unfinished solvers are closed
+  :return: per solver its result, or the last Step if it was stopped
+  """
+  results = [None] * len(solvers)
+  steps = {}
+  scalar = set() # ids of the functions that rejected arrays
+  deadline = None if time_budget is None else time.monotonic() + time_budget
+
+  def advance(i, values):
+    try:
+      steps[i] = solvers[i].send(values)
+    except StopIteration as e:
+      results[i] = e.value
+      steps.pop(i, None)
+      return
+
+    if stop is not None and stop(i, steps[i]):
+      solvers[i].close()
+      results[i] = steps.pop(i)
+
+  for i in range(len(solvers)):
+    advance(i, None)
+
+  while steps:
+    if deadline is not None and time.monotonic() >= deadline:
+      for i in list(steps):
+        solvers[i].close()
+        results[i] = steps.pop(i)
+      break
+
+    batches = {}
+    for i, step in steps.items():
+      batches.setdefault(id(step.func), (step.func, []))[1].append(i)
+
+    for func, batch in batches.values():
+      x = [x for i in batch for x in steps[i].x]
+      func_vectorized = vectorized and id(func) not in scalar
+      y, accepted = eval_chunks(f=func, x=x, executor=executor, chunk_size=chunk_size, vectorized=func_vectorized)
+      if func_vectorized and not accepted:
+        scalar.add(id(func))
+
+      start = 0
+      for i in batch:
+        end = start + len(steps[i].x)
+        advance(i, y[start:end])
+        start = end
+
+  return results
+
+def _run_plain(solver: Solver)->Any:
+  """
+  run with nothing to check between the steps, the methods of algos spend most of their time here
+  """
+  send = solver.send
+  values = None
+
+  while True:
+    try:
+      step = send(values)
+    except StopIteration as e:
+      return e.value
+
+    x = step.x
+    values = [step.func(x[0])] if len(x) == 1 else [step.func(el) for el in x]
+
+def run(solver: Solver, vectorized=False, executor: Executor | None=None, chunk_size=None,
+        stop: Callable[[Step], bool] | None=None, time_budget=None)->Any:
+  """
+  run_all for one solver
+  """
+  if not vectorized and executor is None and stop is None and time_budget is None:
+    return _run_plain(solver)
+
+  deadline = None if time_budget is None else time.monotonic() + time_budget
+  scalar = set()
+  values = None
+
+  while True:
+    try:
+      step = solver.send(values)
+    except StopIteration as e:
+      return e.value
+
+    if (stop is not None and stop(step)) or (deadline is not None and time.monotonic() >= deadline):
+      solver.close()
+      return step
+
+    func_vectorized = vectorized and id(step.func) not in scalar
+    values, accepted = eval_chunks(f=step.func, x=step.x, executor=executor, chunk_size=chunk_size, vectorized=func_vectorized)
+    if func_vectorized and not accepted:
+      scalar.add(id(step.func))
@@ -0,0 +1,142 @@
+import json
+import os
+from typing import Callable, Any
+import numpy as np
+
+DOC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'doc')
+
+class Table:
+  """
+  function of two variables tabulated on a regular grid,
+  values[iy, ix] is the value at (origin[0] + ix * step[0], origin[1] + iy * step[1])
+  """
+  def __init__(self, values: np.ndarray, origin, step):
+    assert values.ndim == 2 and min(values.shape) >= 2
+    assert step[0] > 0 and step[1] > 0
+
+    self.values = values
+    self.origin = (float(origin[0]), float(origin[1]))
+    self.step = (float(step[0]), float(step[1]))
+
+  @property
+  def shape(self)->tuple[int, int]:
+    return self.values.shape
+
+  @property
+  def bounds(self)->tuple[tuple[float, float], tuple[float, float]]:
+    """
+    ((x_min, x_max), (y_min, y_max))
+    """
+    ny, nx = self.shape
+    return ((self.origin[0], self.origin[0] + (nx - 1) * self.step[0]),
+            (self.origin[1], self.origin[1] + (ny - 1) * self.step[1]))
+
+  def at(self, ix: int, iy: int):
+    return self.values[iy, ix]
+
+  def __call__(self, p):
+    """
+    bilinear interpolation, points outside the grid are clamped to its border
+    :param p: point [x, y] or array of points with the last axis of size 2
+    """
+    p = np.asarray(p, dtype=float)
+    ny, nx = self.shape
+
+    fx = np.clip((p[..., 0] - self.origin[0]) / self.step[0], 0, nx - 1)
+    fy = np.clip((p[..., 1] - self.origin[1]) / self.step[1], 0, ny - 1)
+    ix = np.minimum(fx.astype(int), nx - 2)
+    iy = np.minimum(fy.astype(int), ny - 2)
+    tx = fx - ix
+    ty = fy - iy
+
+    values = self.values
+    z = ((1 - tx) * (1 - ty) * values[iy, ix] + tx * (1 - ty) * values[iy, ix + 1] +
+         (1 - tx) * ty * values[iy + 1, ix] + tx * ty * values[iy + 1, ix + 1])
+
+    return float(z) if z.ndim == 0 else z
+
+  def line(self, origin, direction)->Callable[[Any], Any]:
+    """
+    restriction t -> self(origin + t * direction), for the 1-D methods
+    """
+    origin = np.asarray(origin, dtype=float)
+    direction = np.asarray(direction, dtype=float)
+
+    def f(t):
+      return self(origin + np.multiply.outer(t, direction))
+
+    return f
+
+def parse_table(path)->Table:
+  """
+  parses "x y value" lines of a regular grid, the order of lines doesn't matter,
+  missing nodes are nan
+  """
+  data = np.fromfile(path, sep=' ')
+  assert data.size % 3 == 0, f'{path}: expected "x y value" triples'
+  data = data.reshape(-1, 3)
+
+  origin, step, shape = [], [], []
+  for axis in (0, 1):
+    nodes = np.unique(data[:, axis])
+    assert nodes.size >= 2, f'{path}: less than 2 nodes along axis {axis}'
+
+    steps = np.diff(nodes)
+    assert np.allclose(steps, steps[0]), f'{path}: the grid is not regular along axis {axis}'
+
+    origin.append(nodes[0])
+    step.append(steps[0])
+    shape.append(nodes.size)
+
+  ix = np.rint((data[:, 0] - origin[0]) / step[0]).astype(int)
+  iy = np.rint((data[:, 1] - origin[1]) / step[1]).astype(int)
+
+  values = np.full((shape[1], shape[0]), np.nan)
+  values[iy, ix] = data[:, 2]
+
+  return Table(values=values, origin=origin, step=step)
+
+def _get_cache_paths(path, cache_dir)->tuple[str, str]:
+  name = os.path.basename(path)
+  return os.path.join(cache_dir, name + '.npy'), os.path.join(cache_dir, name + '.json')
+
+def load_table(path, cache_dir=None, use_cache=True)->Table:
+  """
+  parses a table once and keeps the grid as .npy (memory mapped on later loads) with a .json of its geometry,
+  the cache is rebuilt when the source file changes
+  :param cache_dir: '.cache' next to the source by default
+  """
+  if not use_cache:
+    return parse_table(path)
+
+  if cache_dir is None:
+    cache_dir = os.path.join(os.path.dirname(os.path.abspath(path)), '.cache')
+
+  values_path, meta_path = _get_cache_paths(path=path, cache_dir=cache_dir)
+  stat = os.stat(path)
+  source = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+
+  try:
+    with open(meta_path) as file:
+      meta = json.load(file)
+
+    if meta['source'] == source:
+      return Table(values=np.load(values_path, mmap_mode='r'), origin=meta['origin'], step=meta['step'])
+  except (OSError, ValueError, KeyError):
+    pass
+
+  table = parse_table(path)
+
+  os.makedirs(cache_dir, exist_ok=True)
+  np.save(values_path, table.values)
+  with open(meta_path, 'w') as file:
+    json.dump({'source': source, 'origin': table.origin, 'step': table.step}, file)
+
+  return table
+
+def load_doc_tables(cache_dir=None)->dict[str, Table]:
+  """
+  all the tables from doc/, by file name without extension
+  """
+  return {os.path.splitext(name)[0]: load_table(path=os.path.join(DOC_DIR, name), cache_dir=cache_dir)
+          for name in sorted(os.listdir(DOC_DIR)) if name.endswith('.txt')}
@@ -6,6 +6,24 @@ from utils import *
 from typing import Callable
 from utils import Point, LogPointsWrap
 from plot import *
+import matplotlib.figure
+import numpy as np
+import tempfile
+import shutil
+import unittest.mock
+import os
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+import json
+import bench
+import tables
+import report
+import steps
+import portfolio
+import jit
+from autodiff import AutoDiff
+import asyncio
+import time
+from async_algos import *
 
 def should_draw(test_case: unittest.TestCase)->bool:
   return False
@@ -25,6 +43,46 @@ def f_lecture_deriv(x):
 
 LECTURE_MIN = Point(x=0.52825, y=0.66750)
 
+class DeferredExecutor(Executor):
+  """
+  runs the submitted calls only once a result is waited for, all the pending ones together;
+  batches holds the number of calls of the counted functions per such run
+  """
+  class _Future(Future):
+    def __init__(self, executor: 'DeferredExecutor'):
+      super().__init__()
+      self._executor = executor
+
+    def result(self, timeout=None):
+      if not self.done():
+        self._executor.run_pending()
+      return super().result(timeout)
+
+  def __init__(self):
+    self.batches = []
+    self._pending = []
+    self._calls = 0
+
+  def count(self, f: Callable)->Callable:
+    def counted(x):
+      self._calls += 1
+      return f(x)
+
+    return counted
+
+  def submit(self, fn, /, *args, **kwargs):
+    future = self._Future(self)
+    self._pending.append((future, fn, args, kwargs))
+    return future
+
+  def run_pending(self):
+    calls = self._calls
+    pending, self._pending = self._pending, []
+    for future, fn, args, kwargs in pending:
+      future.set_result(fn(*args, **kwargs))
+
+    self.batches.append(self._calls - calls)
+
 def test_lecture_min(test_obj, method: Callable, eps):
   f = f_lecture
   eps = 0.1
@@ -105,6 +163,96 @@ class TestBruteFroce(unittest.TestCase):
       self.assertTrue(math.isclose(a=actual_xy.x, b=min_point.x, abs_tol=eps))
       self.assertTrue(math.isclose(a=actual_xy.y, b=min_point.y, abs_tol=atol))
 
+  def test_vectorized(self):
+    f = lambda x: x**4 + np.exp(-x)
+    eps = 1e-5
+
+    expected_xy = brute_force(f=f, a=0, b=1, eps=eps)
+
+    for block_size in (7, 1000, BRUTE_FORCE_BLOCK_SIZE):
+      with self.subTest(block_size=block_size):
+        log_points = LogPointsWrap(f)
+        actual_xy = brute_force(f=log_points, a=0, b=1, eps=eps, vectorized=True, block_size=block_size)
+
+        self.assertEqual(actual_xy.x, expected_xy.x)
+        self.assertEqual(actual_xy.y, expected_xy.y)
+        self.assertEqual(len(log_points.points), math.ceil((int(math.ceil(1 / eps)) + 1) / block_size))
+
+  def test_vectorized_fallback(self):
+    f = self.multi_f1
+    eps = 0.01
+    a, b = 1, 12
+
+    expected_xy = brute_force(f=f, a=a, b=b, eps=eps)
+    actual_xy = brute_force(f=f, a=a, b=b, eps=eps, vectorized=True, block_size=64)
+
+    self.assertEqual(actual_xy.x, expected_xy.x)
+    self.assertEqual(actual_xy.y, expected_xy.y)
+
+  def test_executor(self):
+    eps = 1e-3
+    a, b = 0, 4
+
+    expected_xy = brute_force(f=f_lecture, a=a, b=b, eps=eps)
+
+    with ProcessPoolExecutor(max_workers=2) as executor:
+      for block_size in (None, 97):
+        with self.subTest(block_size=block_size):
+          actual_xy = brute_force(f=f_lecture, a=a, b=b, eps=eps, block_size=block_size, executor=executor)
+
+          self.assertEqual(actual_xy.x, expected_xy.x)
+          self.assertEqual(actual_xy.y, expected_xy.y)
+
+      x = np.arange(a, b, 0.01)
+      self.assertTrue(np.array_equal(eval_points(f=f_lecture, x=x, executor=executor, chunk_size=33), [f_lecture(xi) for xi in x]))
+
+    chunks = []
+    class ChunkExecutor(DeferredExecutor):
+      def submit(self, fn, /, *args, **kwargs):
+        chunks.append(len(args[1]))
+        return super().submit(fn, *args, **kwargs)
+
+    # the 4001 points in blocks of 1000, each split into tasks of 300
+    actual_xy = brute_force(f=f_lecture, a=a, b=b, eps=eps, block_size=1000, executor=ChunkExecutor(), chunk_size=300)
+    self.assertEqual(actual_xy, expected_xy)
+    self.assertEqual(chunks, ([300] * 3 + [100]) * 4 + [1])
+
+  def test_multires(self):
+    eps = 1e-6
+    problems = [
+      (f_lecture, 0, 1, LECTURE_MIN),
+      (self.multi_f1, 1, 12, self.MULTI_F1_MIN_POINT),
+      (self.multi_f2, 0, 4, self.MULTI_F2_MIN_POINT),
+      (lambda x: -x, 0, 1, Point(x=1, y=-1)),
+    ]
+
+    for f, a, b, min_point in problems:
+      with self.subTest(f=f):
+        log_points = LogPointsWrap(f)
+        actual_xy = multires_brute_force(f=log_points, a=a, b=b, eps=eps)
+
+        self.assertTrue(math.isclose(a=actual_xy.x, b=min_point.x, abs_tol=1e-4))
+        self.assertTrue(math.isclose(a=actual_xy.y, b=min_point.y, abs_tol=1e-4))
+        self.assertLess(len(log_points.points), 300)
+
+  def test_multires_coarse(self):
+    f = lambda x: x**4 + np.exp(-x)
+
+    expected_xy = brute_force(f=f, a=0, b=1, eps=0.01)
+    actual_xy = multires_brute_force(f=f, a=0, b=1, eps=0.01, coarse_eps=0.001, vectorized=True)
+
+    self.assertEqual(actual_xy, expected_xy)
+
+    # the nested brute_force reports into the profile of the run, f is counted once
+    expected, actual = Profile(), Profile()
+    brute_force(f=f, a=0, b=1, eps=0.01, vectorized=True, profile=expected)
+    multires_brute_force(f=f, a=0, b=1, eps=0.01, coarse_eps=0.001, vectorized=True, profile=actual)
+
+    self.assertEqual(actual.method, 'multires_brute_force')
+    self.assertEqual(actual.f_evals, expected.f_evals)
+    self.assertEqual(actual.iterations, expected.iterations)
+    np.testing.assert_array_equal(actual.widths, expected.widths)
+
 class TestBitwiseSearch(unittest.TestCase):
   def test_lecture_min(self):
     test_lecture_min(test_obj=self, method=bitwise_search, eps=0.1)
@@ -176,6 +324,37 @@ class TestBitwiseSearch(unittest.TestCase):
     self.assertTrue(math.isclose(a=actual_xy.x, b=LECTURE_MIN.x, abs_tol=eps))
     self.assertTrue(math.isclose(a=actual_xy.y, b=LECTURE_MIN.y, abs_tol=atol))
 
+  def test_inf_far(self):
+    f = lambda x: (x - 50.3)**2
+    eps = 1e-3
+
+    log_points = LogPointsWrap(f)
+    actual_xy = bitwise_search(f=log_points, a=0, b=math.inf, eps=eps, get_init_delta=lambda: 1)
+
+    self.assertTrue(math.isclose(a=actual_xy.x, b=50.3, abs_tol=eps))
+    # the first pass walks to the minimum, then every pass scans a bracket of 2 steps
+    self.assertLessEqual(len(log_points.points), 52 + 8 * 5)
+
+  def test_no_reevaluation(self):
+    f = lambda x: math.cos(3 * x) + x / 10
+    eps = 1e-4
+
+    log_points = LogPointsWrap(f)
+    actual_xy = bitwise_search(f=log_points, a=0.2, b=2, eps=eps, get_init_delta=lambda: 0.3)
+    x = np.sort(log_points.points.x)
+
+    self.assertTrue(np.all(np.diff(x) > eps / 4))
+    self.assertTrue(np.all((x >= 0.2) & (x <= 2)))
+    self.assertTrue(math.isclose(a=actual_xy.x, b=1.03608, abs_tol=eps))
+    self.assertEqual(actual_xy.y, f(actual_xy.x))
+
+  def test_endpoint_off_grid(self):
+    f = lambda x: -x
+
+    actual_xy = bitwise_search(f=f, a=0, b=0.9, eps=0.1)
+
+    self.assertEqual(actual_xy, Point(x=0.9, y=-0.9))
+
 
 class TestDichotomy(unittest.TestCase):
   def test_lecture_min(self):
@@ -209,6 +388,20 @@ class TestDichotomy(unittest.TestCase):
         self.assertTrue(math.isclose(a=expected_points[i].x, b=actual_points[i].x, abs_tol=1e-3))
         self.assertTrue(math.isclose(a=expected_points[i].y, b=actual_points[i].y, abs_tol=1e-3))
 
+  def test_batch(self):
+    f = lambda x: x**4 + np.exp(-x)
+    a = np.array([0.0, -1.0, 0.25, 0.5, 0.0])
+    b = np.array([1.0, 2.0, 0.75, 0.5, 3.0])
+    eps = np.array([0.1, 1e-3, 1e-6, 0.1, 0.5])
+
+    actual_xy = dichotomy_batch(f=f, a=a, b=b, eps=eps)
+
+    for i in range(a.size):
+      with self.subTest(i=i):
+        expected_xy = dichotomy(f=f, a=a[i], b=b[i], eps=eps[i])
+        self.assertEqual(actual_xy.x[i], expected_xy.x)
+        self.assertEqual(actual_xy.y[i], expected_xy.y)
+
 class TestGoldenRatio(unittest.TestCase):
   def f(self, x):
     return 6 * x**2 + 3*x + 5
@@ -234,6 +427,57 @@ class TestGoldenRatio(unittest.TestCase):
       plotting_f = partial(plot_brute_force, f=f, a=a, b=b, star_point=self.MIN_POINT, eps_point=eps_point, k_points=actual_points, eps=eps, title='Золотое сечение')
       draw_single_plot(plotting_f=plotting_f)
 
+  def test_batch(self):
+    f = lambda x: 6 * x**2 + 3*x + 5
+    a = np.array([-3.0, -1.0, 0.0, 2.0, -0.5])
+    b = np.array([1.0, 2.0, 0.0, 5.0, 0.5])
+    eps = np.array([0.1, 1e-3, 0.1, 1e-6, 1.0])
+
+    actual_xy = golden_ratio_batch(f=f, a=a, b=b, eps=eps)
+
+    for i in range(a.size):
+      with self.subTest(i=i):
+        expected_xy = golden_ratio(f=f, a=a[i], b=b[i], eps=eps[i])
+        self.assertEqual(actual_xy.x[i], expected_xy.x)
+        self.assertEqual(actual_xy.y[i], expected_xy.y)
+
+  def test_batch_broadcast(self):
+    f = lambda x: 6 * x**2 + 3*x + 5
+    a = np.linspace(-3, -1, 6).reshape(2, 3)
+
+    actual_xy = golden_ratio_batch(f=f, a=a, b=1, eps=0.01)
+
+    self.assertEqual(actual_xy.x.shape, (2, 3))
+    self.assertTrue(np.allclose(actual_xy.x, self.MIN_POINT.x, atol=0.01))
+
+class TestKSection(unittest.TestCase):
+  def test_lecture(self):
+    for k in (2, 3, 8):
+      for eps in (0.1, 1e-3, 1e-6):
+        with self.subTest(k=k, eps=eps):
+          profile = Profile()
+          eps_point = k_section(f=f_lecture, a=0, b=1, eps=eps, k=k, profile=profile)
+
+          self.assertTrue(math.isclose(a=eps_point.x, b=LECTURE_MIN.x, abs_tol=max(eps, 1e-5)))
+          # (b - a) / 2 shrinks (k+1)/2 times per iteration until it reaches eps
+          self.assertEqual(profile.iterations, max(math.ceil(math.log(1 / 2 / eps, (k + 1) / 2) - 1e-9), 1))
+          self.assertEqual(profile.f_evals, k * profile.iterations + 1)
+
+  def test_executor(self):
+    eps = 1e-3
+    expected_xy = k_section(f=f_lecture, a=0, b=1, eps=eps, k=4)
+
+    executor = DeferredExecutor()
+    profile = Profile()
+    actual_xy = k_section(f=executor.count(f_lecture), a=0, b=1, eps=eps, k=4, executor=executor, profile=profile)
+
+    self.assertEqual(actual_xy, expected_xy)
+    # the 4 probes of every iteration are submitted before any of them is waited for
+    self.assertEqual(executor.batches[:profile.iterations], [4] * profile.iterations)
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+      self.assertEqual(k_section(f=f_lecture, a=0, b=1, eps=eps, k=4, executor=executor), expected_xy)
+
 class TestParabola(unittest.TestCase):
   def test_lecture_min(self):
     f = f_lecture
@@ -287,6 +531,42 @@ class TestParabola(unittest.TestCase):
     self.assertTrue(math.isclose(a=actual_xy.x, b=LECTURE_MIN.x, abs_tol=eps))
     self.assertIsNone(actual_xy.y)
 
+class TestBrent(unittest.TestCase):
+  def test_lecture_min(self):
+    test_lecture_min(test_obj=self, method=brent, eps=0.1)
+
+  def test_evals(self):
+    f = lambda x: 6 * x**2 + 3*x + 5
+
+    for eps in (1e-2, 1e-4, 1e-6):
+      with self.subTest(eps=eps):
+        log_points = LogPointsWrap(f)
+        actual_xy = brent(f=log_points, a=-3, b=1, eps=eps)
+
+        self.assertTrue(math.isclose(a=actual_xy.x, b=TestGoldenRatio.MIN_POINT.x, abs_tol=eps))
+        self.assertEqual(actual_xy.y, f(actual_xy.x))
+
+        golden_points = LogPointsWrap(f)
+        golden_ratio(f=golden_points, a=-3, b=1, eps=eps)
+        self.assertLess(len(log_points.points), len(golden_points.points))
+
+  def test_not_smooth(self):
+    eps = 1e-4
+    problems = [
+      (lambda x: -x, 1),
+      (lambda x: abs(x - 0.3), 0.3),
+      (lambda x: x if x < 0.5 else 0.5, 0.0),
+      (lambda x: 1.0, None),
+    ]
+
+    for f, min_x in problems:
+      with self.subTest(min_x=min_x):
+        actual_xy = brent(f=f, a=0, b=1, eps=eps)
+
+        if min_x is not None:
+          self.assertTrue(math.isclose(a=actual_xy.x, b=min_x, abs_tol=eps))
+        self.assertEqual(actual_xy.y, f(actual_xy.x))
+
 class TestMidpoint(unittest.TestCase):
   def test_lecture_min(self):
     eps = 0.02
@@ -505,6 +785,53 @@ class TestNewtonRaphson(unittest.TestCase):
     self.assertAlmostEqual(expected_points[3].x, actual_points[3].x, places=4)
     self.assertAlmostEqual(expected_points[4].x, actual_points[4].x, places=4)
 
+  def test_batch(self):
+    eps = self.EPS
+    x0 = np.array([1, -0.5, 0.2, 3, -3, 1.3])
+    fd1 = np.arctan
+    fd2 = lambda x: 1 / (1 + x * x)
+    f = lambda x: x * np.arctan(x) - 1 / 2 * np.log(1 + x**2)
+
+    for use_tau, marq_f in ((False, None), (True, None), (False, f)):
+      with self.subTest(use_tau=use_tau, marquardt=marq_f is not None):
+        actual = newton_batch(fd1=fd1, fd2=fd2, x0=x0, eps=eps, use_tau=use_tau, f=marq_f)
+
+        for i in range(x0.size):
+          log_points = LogPointsWrap(self.newton_f_d2_lecture)
+          try:
+            expected_xy = newton(fd1=self.newton_f_d1_lecture, fd2=log_points, x0=float(x0[i]), eps=eps, use_tau=use_tau,
+                                 f=self.newton_f_lecture if marq_f is not None else None)
+          except ValueError as e:
+            self.assertFalse(actual.converged[i])
+            # newton raises "doesn't converge" on a division by zero, "didn't achieve" at kmax
+            self.assertEqual(actual.diverged[i], "doesn't converge" in str(e))
+            continue
+
+          self.assertTrue(actual.converged[i])
+          self.assertFalse(actual.diverged[i])
+          self.assertEqual(actual.iterations[i], len(log_points.points))
+          self.assertAlmostEqual(actual.x[i], expected_xy.x)
+          if marq_f is not None:
+            self.assertAlmostEqual(actual.y[i], expected_xy.y)
+
+  def test_batch_kmax(self):
+    actual = newton_batch(fd1=self.fd1_lecture2, fd2=self.fd2_lecture2, x0=np.array([1.0, 100.0]), eps=self.EPS, kmax=10)
+
+    self.assertTrue(actual.converged[0])
+    self.assertFalse(actual.converged[1])
+    self.assertFalse(actual.diverged[1])
+    self.assertEqual(actual.iterations[1], 10)
+
+  def test_batch_diverged(self):
+    # from 3 the steps of newton on f' = arctan grow until x overflows
+    with np.errstate(over='ignore'):
+      actual = newton_batch(fd1=np.arctan, fd2=lambda x: 1 / (1 + x * x), x0=np.array([1.0, 3.0, np.inf]), eps=self.EPS)
+
+    np.testing.assert_array_equal(actual.converged, [True, False, False])
+    np.testing.assert_array_equal(actual.diverged, [False, True, True])
+    self.assertLess(actual.iterations[1], 1000)
+
+
 class TestPolygonal(unittest.TestCase):
   def test_lecture_min(self):
     f = f_lecture
@@ -549,6 +876,980 @@ class TestPolygonal(unittest.TestCase):
       self.assertTrue(math.isclose(a=actual_xy.x, b=min_point.x, abs_tol=eps))
       self.assertTrue(math.isclose(a=actual_xy.y, b=min_point.y, abs_tol=atol))
 
+  def test_multimodal2_small_eps(self):
+      f = self.multi_f2
+      eps = 1e-5
+      a, b = 0, 4
+
+      log_points = LogPointsWrap(f)
+      actual_xy = polygonal_chain(f=log_points, a=a, b=b, eps=eps, get_L=lambda *args, **kwargs: 82/10)
+      min_point = self.MULTI_F2_MIN_POINT
+
+      self.assertTrue(math.isclose(a=actual_xy.x, b=min_point.x, abs_tol=1e-3))
+      self.assertTrue(math.isclose(a=actual_xy.y, b=min_point.y, abs_tol=1e-4))
+      self.assertLessEqual(actual_xy.y, min(point.y for point in log_points.points) + eps)
+
+  def test_adaptive_L(self):
+    problems = [
+      (f_lecture, 0, 1, LECTURE_MIN),
+      (self.multi_f1, 1, 12, self.MULTI_F1_MIN_POINT),
+      (self.multi_f2, 0, 4, self.MULTI_F2_MIN_POINT),
+    ]
+
+    for f, a, b, min_point in problems:
+      for local in (True, False):
+        for eps in (0.1, 1e-4):
+          with self.subTest(f=f, local=local, eps=eps):
+            actual_xy = polygonal_chain(f=f, a=a, b=b, eps=eps, local=local)
+
+            self.assertTrue(math.isclose(a=actual_xy.x, b=min_point.x, abs_tol=0.1))
+            self.assertTrue(math.isclose(a=actual_xy.y, b=min_point.y, abs_tol=max(eps, 1e-3)))
+            self.assertEqual(actual_xy.y, f(actual_xy.x))
+
+  def test_adaptive_L_evals(self):
+    eps = 1e-4
+    profile = Profile()
+
+    polygonal_chain(f=self.multi_f2, a=0, b=4, eps=eps, get_L=lambda *args, **kwargs: 82/10, profile=profile)
+    fixed_evals = profile.f_evals
+
+    polygonal_chain(f=self.multi_f2, a=0, b=4, eps=eps, profile=profile)
+
+    self.assertLess(profile.f_evals, fixed_evals)
+
+
+  def test_parallel(self):
+    eps = 1e-6
+    get_L = lambda *args, **kwargs: 82/10
+    f_min = golden_ratio(f=self.multi_f2, a=0.9, b=1.5, eps=1e-9).y
+
+    iterations = []
+    for k in (1, 4, 16):
+      with self.subTest(k=k):
+        profile = Profile()
+        actual_xy = parallel_polygonal_chain(f=self.multi_f2, a=0, b=4, eps=eps, get_L=get_L, k=k,
+                                             profile=profile)
+
+        # the certificate: within eps of the global min for any k
+        self.assertLessEqual(f_min, actual_xy.y)
+        self.assertLessEqual(actual_xy.y - f_min, eps)
+        self.assertTrue(math.isclose(a=actual_xy.x, b=self.MULTI_F2_MIN_POINT.x, abs_tol=1e-2))
+        iterations.append(profile.iterations)
+
+    self.assertLess(iterations[1], iterations[0] / 3)
+    self.assertLess(iterations[2], iterations[1] / 3)
+
+  def test_parallel_executor(self):
+    get_L = lambda *args, **kwargs: 3.64
+    expected_xy = parallel_polygonal_chain(f=f_lecture, a=0, b=1, eps=1e-6, get_L=get_L, k=4)
+
+    with ProcessPoolExecutor(max_workers=2) as executor:
+      self.assertEqual(parallel_polygonal_chain(f=f_lecture, a=0, b=1, eps=1e-6, get_L=get_L, k=4, executor=executor),
+                       expected_xy)
+
+class TestCheckpoint(unittest.TestCase):
+  class Interrupt(Exception):
+    pass
+
+  @staticmethod
+  def get_runs():
+    fd1, fd2 = TestNewtonRaphson.newton_f_d1_lecture, TestNewtonRaphson.newton_f_d2_lecture
+    get_L = lambda *args, **kwargs: 3.64
+
+    # name -> (run(f, checkpoint), objective, evaluations of one iteration)
+    return {
+      'brute_force': (lambda f, checkpoint: brute_force(f=f, a=0, b=1, eps=1e-3, block_size=100, checkpoint=checkpoint), f_lecture, 100),
+      'bitwise_search': (lambda f, checkpoint: bitwise_search(f=f, a=0, b=1, eps=1e-4, checkpoint=checkpoint), f_lecture, 1),
+      'dichotomy': (lambda f, checkpoint: dichotomy(f=f, a=0, b=1, eps=1e-6, checkpoint=checkpoint), f_lecture, 2),
+      'golden_ratio': (lambda f, checkpoint: golden_ratio(f=f, a=0, b=1, eps=1e-6, checkpoint=checkpoint), f_lecture, 1),
+      'k_section': (lambda f, checkpoint: k_section(f=f, a=0, b=1, eps=1e-6, k=3, checkpoint=checkpoint), f_lecture, 3),
+      'parabola': (lambda f, checkpoint: parabola(f=f, a=0, b=1, eps=1e-9, get_init_points=get_init_points_gr,
+                                                  checkpoint=checkpoint), f_lecture, 1),
+      'brent': (lambda f, checkpoint: brent(f=f, a=0, b=1, eps=1e-9, checkpoint=checkpoint), f_lecture, 1),
+      'midpoint': (lambda f, checkpoint: midpoint(f=f, a=0, b=1, eps=1e-9, checkpoint=checkpoint), f_lecture_deriv, 1),
+      'chord': (lambda f, checkpoint: chord(f=f, a=0, b=1, eps=1e-12, checkpoint=checkpoint), f_lecture_deriv, 1),
+      'newton': (lambda f, checkpoint: newton(fd1=f, fd2=fd2, x0=1.3, eps=1e-12, use_tau=True, checkpoint=checkpoint), fd1, 2),
+      'polygonal_chain': (lambda f, checkpoint: polygonal_chain(f=f, a=0, b=1, eps=1e-4, get_L=get_L, checkpoint=checkpoint),
+                          f_lecture, 1),
+      'polygonal_chain_adaptive': (lambda f, checkpoint: polygonal_chain(f=f, a=1, b=12, eps=1e-4, checkpoint=checkpoint),
+                                   lambda x: math.cos(x) / x**2, 1),
+    }
+
+  def test_resume(self):
+    for name, (run, f, iteration_evals) in self.get_runs().items():
+      with self.subTest(method=name), tempfile.TemporaryDirectory() as dir:
+        log_points = LogPointsWrap(f)
+        expected_xy = run(f=log_points, checkpoint=None)
+        evals = len(log_points.points)
+
+        calls = 0
+        def interrupted_f(x):
+          nonlocal calls
+          calls += 1
+          if calls > evals // 2:
+            raise self.Interrupt()
+          return f(x)
+
+        checkpoint = Checkpoint(path=os.path.join(dir, 'run.pickle'), every=1)
+        with self.assertRaises(self.Interrupt):
+          run(f=interrupted_f, checkpoint=checkpoint)
+        self.assertTrue(os.path.exists(checkpoint.path))
+
+        log_points = LogPointsWrap(f)
+        actual_xy = run(f=log_points, checkpoint=Checkpoint(path=checkpoint.path, every=1))
+
+        self.assertEqual(actual_xy, expected_xy)
+        self.assertLessEqual(evals // 2 + len(log_points.points), evals + iteration_evals)
+        self.assertFalse(os.path.exists(checkpoint.path))
+
+  def test_every(self):
+    with tempfile.TemporaryDirectory() as dir:
+      checkpoint = Checkpoint(path=os.path.join(dir, 'run.pickle'), every=5)
+      profile = Profile()
+      golden_ratio(f=f_lecture, a=0, b=1, eps=1e-6, profile=profile, checkpoint=checkpoint)
+
+      self.assertEqual(checkpoint.saves, profile.iterations // 5)
+
+      checkpoint = Checkpoint(path=os.path.join(dir, 'run.pickle'), interval=3600)
+      golden_ratio(f=f_lecture, a=0, b=1, eps=1e-6, checkpoint=checkpoint)
+
+      self.assertEqual(checkpoint.saves, 0)
+
+  def test_other_args(self):
+    with tempfile.TemporaryDirectory() as dir:
+      path = os.path.join(dir, 'run.pickle')
+      points = []
+      def f(x):
+        points.append(x)
+        if len(points) > 6:
+          raise self.Interrupt()
+        return f_lecture(x)
+
+      with self.assertRaises(self.Interrupt):
+        dichotomy(f=f, a=0, b=1, eps=1e-3, checkpoint=Checkpoint(path=path, every=1))
+
+      with self.assertRaises(ValueError):
+        dichotomy(f=f_lecture, a=0, b=2, eps=1e-3, checkpoint=Checkpoint(path=path, every=1))
+      with self.assertRaises(ValueError):
+        golden_ratio(f=f_lecture, a=0, b=1, eps=1e-3, checkpoint=Checkpoint(path=path, every=1))
+
+class TestSteps(unittest.TestCase):
+  def test_same_as_methods(self):
+    fd1, fd2 = TestNewtonRaphson.newton_f_d1_lecture, TestNewtonRaphson.newton_f_d2_lecture
+    f_newton = TestNewtonRaphson.newton_f_lecture
+    get_L = lambda *args, **kwargs: 3.64
+    multi_f1 = lambda x: math.cos(x) / x**2
+
+    cases = {
+      'brute_force': (steps.brute_force_steps(f=f_lecture, a=0, b=1, eps=1e-3, block_size=100),
+                      brute_force(f=f_lecture, a=0, b=1, eps=1e-3)),
+      'bitwise_search': (steps.bitwise_search_steps(f=f_lecture, a=0, b=1, eps=1e-4), bitwise_search(f=f_lecture, a=0, b=1, eps=1e-4)),
+      'dichotomy': (steps.dichotomy_steps(f=f_lecture, a=0, b=1, eps=1e-6), dichotomy(f=f_lecture, a=0, b=1, eps=1e-6)),
+      'golden_ratio': (steps.golden_ratio_steps(f=f_lecture, a=0, b=1, eps=1e-6), golden_ratio(f=f_lecture, a=0, b=1, eps=1e-6)),
+      'k_section': (steps.k_section_steps(f=f_lecture, a=0, b=1, eps=1e-6, k=3), k_section(f=f_lecture, a=0, b=1, eps=1e-6, k=3)),
+      'parabola': (steps.parabola_steps(f=f_lecture, a=0, b=1, eps=1e-9), parabola(f=f_lecture, a=0, b=1, eps=1e-9)),
+      'parabola_gr': (steps.parabola_steps(f=f_lecture, a=0, b=1, eps=1e-9, get_init_points=get_init_points_gr),
+                      parabola(f=f_lecture, a=0, b=1, eps=1e-9, get_init_points=get_init_points_gr)),
+      'brent': (steps.brent_steps(f=f_lecture, a=0, b=1, eps=1e-9), brent(f=f_lecture, a=0, b=1, eps=1e-9)),
+      'midpoint': (steps.midpoint_steps(f=f_lecture_deriv, a=0, b=1, eps=1e-9), midpoint(f=f_lecture_deriv, a=0, b=1, eps=1e-9)),
+      'chord': (steps.chord_steps(f=f_lecture_deriv, a=0, b=1, eps=1e-12), chord(f=f_lecture_deriv, a=0, b=1, eps=1e-12)),
+      'newton': (steps.newton_steps(fd1=fd1, fd2=fd2, x0=1.3, eps=1e-12, use_tau=True),
+                 newton(fd1=fd1, fd2=fd2, x0=1.3, eps=1e-12, use_tau=True)),
+      'marquardt': (steps.newton_steps(fd1=fd1, fd2=fd2, x0=3, eps=1e-7, f=f_newton), newton(fd1=fd1, fd2=fd2, x0=3, eps=1e-7, f=f_newton)),
+      'polygonal_chain': (steps.polygonal_chain_steps(f=f_lecture, a=0, b=1, eps=1e-4, get_L=get_L),
+                          polygonal_chain(f=f_lecture, a=0, b=1, eps=1e-4, get_L=get_L)),
+      'polygonal_chain_adaptive': (steps.polygonal_chain_steps(f=multi_f1, a=1, b=12, eps=1e-4),
+                                   polygonal_chain(f=multi_f1, a=1, b=12, eps=1e-4)),
+      'parallel_polygonal_chain': (steps.parallel_polygonal_chain_steps(f=f_lecture, a=0, b=1, eps=1e-4, get_L=get_L, k=3),
+                                   parallel_polygonal_chain(f=f_lecture, a=0, b=1, eps=1e-4, get_L=get_L, k=3)),
+    }
+
+    for name, (solver, expected_xy) in cases.items():
+      with self.subTest(method=name):
+        self.assertEqual(steps.run(solver), expected_xy)
+
+  def test_manual(self):
+    solver = steps.golden_ratio_steps(f=f_lecture, a=0, b=1, eps=1e-3)
+    step = next(solver)
+    first_step = step
+    widths = []
+    evals = []
+
+    with self.assertRaises(StopIteration) as stop:
+      while True:
+        self.assertIs(step.func, f_lecture)
+        widths.append(step.bracket[1] - step.bracket[0])
+        evals.append(step.evals)
+        step = solver.send([step.func(x) for x in step.x])
+
+    self.assertEqual(stop.exception.value, golden_ratio(f=f_lecture, a=0, b=1, eps=1e-3))
+    self.assertTrue(all(w1 >= w2 for w1, w2 in zip(widths, widths[1:])))
+    self.assertEqual(evals, [0] + list(range(2, len(widths) + 1)))
+
+    # the solver updates one Step, which counts the values of the last step too once they are sent
+    self.assertIs(step, first_step)
+    self.assertEqual(step.evals, len(widths) + 1)
+
+  def test_hooks(self):
+    # the generators report as the methods do
+    expected = Profile()
+    golden_ratio(f=f_lecture, a=0, b=1, eps=1e-6, profile=expected)
+
+    actual = Profile()
+    steps.run(steps.golden_ratio_steps(f=f_lecture, a=0, b=1, eps=1e-6, profile=actual))
+    self.assertEqual(actual.iterations, expected.iterations)
+    np.testing.assert_array_equal(actual.widths, expected.widths)
+
+    with tempfile.TemporaryDirectory() as dir:
+      checkpoint = Checkpoint(path=os.path.join(dir, 'run.pickle'), every=1)
+      checkpoint.start(method='dichotomy')
+      step = steps.run(steps.dichotomy_steps(f=f_lecture, a=0, b=1, eps=1e-6, checkpoint=checkpoint),
+                       stop=lambda step: step.evals >= 10)
+      self.assertEqual(step.evals, 10)
+
+      # the run goes on from the snapshot of the 5th iteration
+      log_points, resumed_points = LogPointsWrap(f_lecture), LogPointsWrap(f_lecture)
+      self.assertEqual(dichotomy(f=resumed_points, a=0, b=1, eps=1e-6, checkpoint=Checkpoint(path=checkpoint.path, every=1)),
+                       dichotomy(f=log_points, a=0, b=1, eps=1e-6))
+      self.assertEqual(len(resumed_points.points), len(log_points.points) - 10)
+
+  def test_run_all_batched(self):
+    a = np.linspace(-3, -1, 50)
+    quadratic = lambda x: 6 * x**2 + 3*x + 5
+    calls = []
+    def f(x):
+      calls.append(np.size(x))
+      return quadratic(x)
+
+    results = steps.run_all([steps.golden_ratio_steps(f=f, a=a_i, b=1, eps=1e-6) for a_i in a], vectorized=True)
+
+    evals, rounds = 0, 0
+    profile = Profile()
+    for a_i, actual_xy in zip(a, results):
+      self.assertEqual(actual_xy, golden_ratio(f=quadratic, a=a_i, b=1, eps=1e-6, profile=profile))
+      evals += profile.f_evals
+      rounds = max(rounds, profile.iterations + 2)
+
+    # one call per round for all the solvers
+    self.assertEqual(calls[0], 2 * a.size)
+    self.assertEqual(sum(calls), evals)
+    self.assertEqual(len(calls), rounds)
+
+  def test_run_all_funcs(self):
+    # every function gets its own batch, one that rejects arrays is called per point
+    fd1, fd2 = TestNewtonRaphson.newton_f_d1_lecture, TestNewtonRaphson.newton_f_d2_lecture
+    solvers = [steps.newton_steps(fd1=fd1, fd2=fd2, x0=x0, eps=1e-9) for x0 in (1.0, 1.3)] + \
+              [steps.golden_ratio_steps(f=f_lecture, a=0, b=1, eps=1e-6)]
+
+    results = steps.run_all(solvers, vectorized=True)
+
+    self.assertEqual(results, [newton(fd1=fd1, fd2=fd2, x0=x0, eps=1e-9) for x0 in (1.0, 1.3)] +
+                              [golden_ratio(f=f_lecture, a=0, b=1, eps=1e-6)])
+
+  def test_stop(self):
+    stop = lambda step: step.bracket[1] - step.bracket[0] < 1e-2
+    step = steps.run(steps.dichotomy_steps(f=f_lecture, a=0, b=1, eps=1e-9), stop=stop)
+
+    self.assertIsInstance(step, steps.Step)
+    self.assertTrue(step.bracket[0] <= LECTURE_MIN.x <= step.bracket[1])
+    self.assertLess(step.bracket[1] - step.bracket[0], 1e-2)
+    self.assertEqual(step.evals, 2 * 7)
+
+    solvers = [steps.bitwise_search_steps(f=f_lecture, a=0, b=1, eps=1e-4), steps.chord_steps(f=f_lecture_deriv, a=0, b=1, eps=1e-9)]
+    results = steps.run_all(solvers, time_budget=0)
+    self.assertTrue(all(isinstance(result, steps.Step) for result in results))
+    self.assertEqual(results[0].evals, 0)
+
+class TestPortfolio(unittest.TestCase):
+  def test_winner(self):
+    fd1, fd2 = f_lecture_deriv, lambda x: 12 * x**2 + math.exp(-x)
+    result = portfolio.race(f=f_lecture, a=0, b=1, eps=1e-6, fd1=fd1, fd2=fd2, L=3.64)
+
+    self.assertEqual(result.point.y, f_lecture(result.point.x))
+    self.assertLessEqual(result.point.y - result.lower_bound, 1e-6)
+    self.assertLessEqual(result.lower_bound, golden_ratio(f=f_lecture, a=0, b=1, eps=1e-9).y)
+    self.assertTrue(math.isclose(result.point.x, LECTURE_MIN.x, abs_tol=1e-3))
+    self.assertEqual(result.failed, {})
+
+    # the race takes no more rounds than polygonal_chain alone
+    profile = Profile()
+    polygonal_chain(f=f_lecture, a=0, b=1, eps=1e-6, get_L=lambda **kwargs: 3.64, profile=profile)
+    self.assertLessEqual(result.rounds, profile.f_evals)
+
+    result = portfolio.race(f=f_lecture, a=0, b=1, eps=1e-6, fd1=fd1, fd2=fd2, unimodal=True)
+    solver = portfolio.SOLVERS[result.method](f=f_lecture, fd1=fd1, fd2=fd2, a=0, b=1, eps=1e-6, L=None)
+    self.assertEqual(result.point.x, steps.run(solver).x)
+    self.assertEqual(result.point.y, f_lecture(result.point.x))
+    self.assertIsNone(result.lower_bound)
+
+  def test_multimodal(self):
+    # parabola and the other local methods finish first in a local min
+    problems = [
+      (TestBruteFroce.multi_f2, 0, 4, 8.1, (0.9, 1.5)),
+      (TestBruteFroce.multi_f1, 1, 12, 2, (2, 3)),
+    ]
+
+    for f, a, b, L, basin in problems:
+      with self.subTest(f=f.__name__):
+        f = partial(f, None)
+        f_min = golden_ratio(f=f, a=basin[0], b=basin[1], eps=1e-9).y
+
+        result = portfolio.race(f=f, a=a, b=b, eps=1e-4, L=L)
+
+        self.assertLessEqual(result.point.y - f_min, 1e-4)
+        self.assertLessEqual(result.lower_bound, f_min)
+        self.assertEqual(result.point.y, f(result.point.x))
+
+  def test_shared_cache(self):
+    xs = []
+    def f(x):
+      xs.append(x)
+      return f_lecture(x)
+
+    # golden_ratio and parabola start from the same pair of points
+    result = portfolio.race(f=f, a=0, b=1, eps=1e-6, methods=['golden_ratio', 'parabola', 'bitwise_search'], unimodal=True)
+
+    self.assertEqual(len(xs), len(set(xs)))
+    self.assertEqual(len(xs), result.evals['f'])
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+      self.assertEqual(portfolio.race(f=f_lecture, a=0, b=1, eps=1e-6, methods=['golden_ratio', 'parabola', 'bitwise_search'],
+                                      unimodal=True, executor=executor), result)
+
+    # parabola ends with a point it hasn't evaluated, the race looks it up once
+    with unittest.mock.patch.object(CachedWrap, '__call__', autospec=True, side_effect=CachedWrap.__call__) as call:
+      result = portfolio.race(f=f_lecture, a=0, b=1, eps=1e-6, methods=['parabola'], unimodal=True)
+    self.assertEqual(call.call_count, 1)
+    self.assertEqual(result.point.y, f_lecture(result.point.x))
+
+  def test_failures(self):
+    f = lambda x: x
+
+    result = portfolio.race(f=f, a=0, b=1, eps=1e-3, methods=['parabola', 'golden_ratio'], unimodal=True)
+    self.assertEqual(result.method, 'golden_ratio')
+    self.assertIn('parabola', result.failed)
+    self.assertTrue(math.isclose(result.point.x, 0, abs_tol=1e-3))
+
+    # newton jumps from 1.8 to the min of cos at 2π
+    result = portfolio.race(f=math.cos, a=1, b=2.6, eps=1e-6, methods=['newton', 'golden_ratio'], unimodal=True,
+                            fd1=lambda x: -math.sin(x), fd2=lambda x: -math.cos(x))
+    self.assertEqual(result.method, 'golden_ratio')
+    self.assertIn('outside', result.failed['newton'])
+
+    with self.assertRaises(ValueError):
+      portfolio.race(f=f, a=0, b=1, eps=1e-3, methods=['parabola'], unimodal=True)
+
+    with self.assertRaises(TimeoutError):
+      portfolio.race(f=f_lecture, a=0, b=1, eps=1e-6, unimodal=True, time_budget=0)
+
+    # nothing certifies the result of a local method
+    with self.assertRaises(AssertionError):
+      portfolio.race(f=f_lecture, a=0, b=1, eps=1e-6)
+    with self.assertRaises(AssertionError):
+      portfolio.race(f=f_lecture, a=0, b=1, eps=1e-6, L=3.64, methods=['golden_ratio'])
+
+  def test_get_methods(self):
+    self.assertNotIn('polygonal_chain', portfolio.get_methods(f=f_lecture))
+    self.assertNotIn('newton', portfolio.get_methods(f=f_lecture, fd1=f_lecture_deriv))
+    self.assertEqual(portfolio.get_methods(f=f_lecture, fd1=f_lecture_deriv, fd2=f_lecture, L=1), list(portfolio.SOLVERS))
+
+class TestCoordinateDescent(unittest.TestCase):
+  @staticmethod
+  def f(x):
+    return (x[0] - 1)**2 + 2 * (x[1] + 0.5)**2 + 0.5 * x[0] * x[1]
+
+  MIN_X = np.linalg.solve([[2, 0.5], [0.5, 4]], [2, -2])
+
+  def test_line_searches(self):
+    bounds = [(-3, 3), (-3, 3)]
+    line_searches = [
+      (golden_ratio, 1e-4),
+      (dichotomy, 1e-4),
+      (partial(parabola, get_init_points=get_init_points_gr), 1e-4),
+      (brute_force, 1e-3),
+    ]
+
+    for line_search, eps in line_searches:
+      with self.subTest(line_search=line_search):
+        profile = Profile()
+        actual_xy = coordinate_descent(f=self.f, x0=[2, 2], bounds=bounds, eps=eps, line_search=line_search, profile=profile)
+
+        self.assertTrue(np.allclose(actual_xy.x, self.MIN_X, atol=10 * eps))
+        self.assertEqual(actual_xy.y, self.f(actual_xy.x))
+        self.assertGreater(profile.f_evals, 0)
+        self.assertLessEqual(profile.widths[-1], eps)
+
+  def test_table(self):
+    table = tables.parse_table(TestTables.PATH)
+    (x_min, x_max), (y_min, y_max) = table.bounds
+    x0 = [(x_min + x_max) / 2, (y_min + y_max) / 2]
+
+    batches = []
+    def f(p):
+      if np.ndim(p) == 2:
+        batches.append(len(p))
+      return table(p)
+
+    actual_xy = coordinate_descent(f=f, x0=x0, bounds=table.bounds, eps=1, line_search=partial(brute_force, vectorized=True),
+                                   vectorized=True)
+
+    self.assertLessEqual(actual_xy.y, table(x0))
+    self.assertEqual(actual_xy.y, table(actual_xy.x))
+    # every line search evaluated its grid by one call
+    self.assertGreater(len(batches), 0)
+    self.assertTrue(all(size > 1 for size in batches))
+
+    expected_xy = coordinate_descent(f=table, x0=x0, bounds=table.bounds, eps=1, line_search=brute_force)
+    np.testing.assert_array_equal(actual_xy.x, expected_xy.x)
+    self.assertEqual(actual_xy.y, expected_xy.y)
+
+
+class TestAutoDiff(unittest.TestCase):
+  @staticmethod
+  def f_lecture(x):
+    return x**4 + np.exp(-x)
+
+  @staticmethod
+  def newton_f_lecture(x):
+    return x * np.arctan(x) - 1 / 2 * np.log(1 + x**2)
+
+  def test_derivatives(self):
+    f = AutoDiff(self.f_lecture)
+    newton_f = AutoDiff(self.newton_f_lecture)
+
+    for x in (-0.5, 0.0, 0.3, 1.7):
+      with self.subTest(x=x):
+        self.assertAlmostEqual(f.f(x), f_lecture(x))
+        self.assertAlmostEqual(f.fd1(x), f_lecture_deriv(x))
+        self.assertAlmostEqual(f.fd2(x), 12 * x**2 + math.exp(-x))
+        self.assertAlmostEqual(newton_f.fd1(x), TestNewtonRaphson.newton_f_d1_lecture(x))
+        self.assertAlmostEqual(newton_f.fd2(x), TestNewtonRaphson.newton_f_d2_lecture(x))
+
+    x = np.linspace(-1, 1, 5)
+    self.assertTrue(np.allclose(newton_f.fd1(x), np.arctan(x)))
+    self.assertTrue(np.allclose(AutoDiff(lambda x: 2**x / np.sqrt(1 + x**2)).fd1(x),
+                                2**x * (np.log(2) * (1 + x**2) - x) / (1 + x**2)**1.5))
+
+  def test_unsupported(self):
+    # f_lecture uses math.exp
+    with self.assertRaisesRegex(TypeError, r'np\.exp, not math\.exp'):
+      AutoDiff(f_lecture).fd1(0.5)
+
+    with self.assertRaisesRegex(TypeError, r'np\.arcsin has no derivative rule'):
+      AutoDiff(np.arcsin).fd1(0.5)
+
+  def test_newton(self):
+    eps = TestNewtonRaphson.EPS
+    fd1 = TestNewtonRaphson.newton_f_d1_lecture
+    fd2 = TestNewtonRaphson.newton_f_d2_lecture
+
+    for use_tau, x0 in ((False, 1), (True, 3)):
+      with self.subTest(use_tau=use_tau):
+        profile = Profile()
+        expected_xy = newton(fd1=fd1, fd2=fd2, x0=x0, eps=eps, use_tau=use_tau, profile=profile)
+        hand_evals = profile.fd1_evals + profile.fd2_evals
+
+        actual_xy = newton(fd1=AutoDiff(self.newton_f_lecture), fd2=None, x0=x0, eps=eps, use_tau=use_tau, profile=profile)
+
+        self.assertAlmostEqual(actual_xy.x, expected_xy.x)
+        # x_tau needs a jet of its own, so newton-raphson makes 2 evaluations per iteration instead of 3
+        self.assertEqual(profile.f_evals, hand_evals * 2 // 3 if use_tau else hand_evals // 2)
+
+    f = AutoDiff(self.newton_f_lecture)
+    actual_xy = newton(fd1=f, fd2=None, x0=3, eps=eps, f=f, profile=profile)
+
+    self.assertAlmostEqual(actual_xy.x, 0)
+    self.assertAlmostEqual(actual_xy.y, 0)
+    self.assertEqual(profile.f_evals, profile.iterations + 1)
+
+  def test_newton_batch(self):
+    actual = newton_batch(fd1=AutoDiff(self.newton_f_lecture), fd2=None, x0=np.array([1, -0.5, 3]), eps=TestNewtonRaphson.EPS)
+
+    self.assertTrue(np.array_equal(actual.converged, [True, True, False]))
+    self.assertTrue(np.allclose(actual.x[:2], 0))
+
+  def test_midpoint_chord(self):
+    for method, eps in ((midpoint, 0.02), (chord, 0.05)):
+      with self.subTest(method=method):
+        expected_xy = method(f=f_lecture_deriv, a=0, b=1, eps=eps)
+        actual_xy = method(f=AutoDiff(self.f_lecture), a=0, b=1, eps=eps)
+
+        self.assertAlmostEqual(actual_xy.x, expected_xy.x)
+
+
+class TestCachedWrap(unittest.TestCase):
+  def test_hits(self):
+    log_points = LogPointsWrap(f_lecture)
+    cached_f = CachedWrap(log_points)
+
+    first_xy = brute_force(f=cached_f, a=0, b=1, eps=0.1)
+    second_xy = brute_force(f=cached_f, a=0, b=1, eps=0.1)
+
+    self.assertEqual(first_xy, second_xy)
+    self.assertEqual(len(log_points.points), 11)
+    self.assertEqual(cached_f.misses, 11)
+    self.assertEqual(cached_f.hits, 11)
+
+  def test_lru(self):
+    log_points = LogPointsWrap(f_lecture)
+    cached_f = CachedWrap(log_points, maxsize=2)
+
+    for x in (0, 1, 0, 2, 1):
+      cached_f(x)
+
+    self.assertEqual(len(cached_f), 2)
+    self.assertEqual([point.x for point in log_points.points], [0, 1, 2, 1])
+    self.assertEqual(cached_f.hits, 1)
+
+  def test_grid(self):
+    log_points = LogPointsWrap(f_lecture)
+    cached_f = CachedWrap(log_points, grid=1e-3)
+
+    self.assertEqual(cached_f(0.5), cached_f(0.5 + 1e-4))
+    self.assertNotEqual(cached_f(0.5), cached_f(0.501))
+    self.assertEqual(len(log_points.points), 2)
+
+  def test_map(self):
+    log_points = LogPointsWrap(f_lecture)
+    cached_f = CachedWrap(log_points, maxsize=2)
+    x = [0.1, 0.2, 0.1, 0.3, 0.2]
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+      self.assertEqual(cached_f.map(x, executor=executor), [f_lecture(el) for el in x])
+
+    # every new point is evaluated once even if it's evicted before the batch ends
+    self.assertEqual(sorted(point.x for point in log_points.points), [0.1, 0.2, 0.3])
+    self.assertEqual((cached_f.misses, cached_f.hits), (3, 2))
+    self.assertNotIn(0.1, cached_f)
+    self.assertIn(0.3, cached_f)
+
+  def test_store(self):
+    with tempfile.TemporaryDirectory() as dir:
+      path = os.path.join(dir, 'f_lecture')
+
+      with CachedWrap(f_lecture, path=path) as cached_f:
+        expected_xy = golden_ratio(f=cached_f, a=0, b=1, eps=1e-3)
+
+      log_points = LogPointsWrap(f_lecture)
+      with CachedWrap(log_points, path=path, maxsize=4) as cached_f:
+        actual_xy = golden_ratio(f=cached_f, a=0, b=1, eps=1e-3)
+
+      self.assertEqual(expected_xy, actual_xy)
+      self.assertEqual(len(log_points.points), 0)
+      self.assertEqual(cached_f.misses, 0)
+
+  def test_store_grid(self):
+    f = lambda x: x**2
+
+    with tempfile.TemporaryDirectory() as dir:
+      path = os.path.join(dir, 'f')
+
+      with CachedWrap(f, grid=0.1, path=path) as cached_f:
+        self.assertEqual(cached_f(0.5), 0.25)
+        self.assertEqual(cached_f(0.53), 0.25)
+
+      # 0.05 is index 5 on the finer grid, as 0.5 was on the coarser one
+      with CachedWrap(f, grid=0.01, path=path) as cached_f:
+        self.assertEqual(cached_f(0.05), f(0.05))
+        self.assertEqual(cached_f(0.5), 0.25)
+        self.assertEqual((cached_f.misses, cached_f.hits), (1, 1))
+
+      with CachedWrap(f, path=path) as cached_f:
+        self.assertEqual(cached_f(5), 25)
+        self.assertEqual(cached_f(0.5), 0.25)
+        self.assertEqual((cached_f.misses, cached_f.hits), (1, 1))
+
+
+class TestTrace(unittest.TestCase):
+  def test_columns(self):
+    trace = Trace(capacity=1)
+
+    for x in range(10):
+      trace.append(x=x, y=x**2)
+
+    self.assertEqual(len(trace), 10)
+    self.assertTrue(np.array_equal(trace.x, np.arange(10)))
+    self.assertTrue(np.array_equal(trace.y, np.arange(10)**2))
+    self.assertEqual(trace[-1], Point(x=9, y=81))
+    self.assertEqual(trace[2:4], [Point(x=2, y=4), Point(x=3, y=9)])
+    self.assertEqual(list(trace)[3], Point(x=3, y=9))
+    self.assertEqual(len(trace + [Point(x=10, y=None)]), 11)
+
+  def test_object_fallback(self):
+    log_points = LogPointsWrap(lambda x: x * 2)
+
+    log_points(1)
+    log_points(np.array([1.0, 2.0]))
+
+    self.assertEqual(log_points.points[0], Point(x=1, y=2))
+    self.assertTrue(np.array_equal(log_points.points[1].y, [2.0, 4.0]))
+
+  def test_point_slots(self):
+    self.assertFalse(hasattr(Point(x=0, y=0), '__dict__'))
+
+
+class TestProfile(unittest.TestCase):
+  def test_golden_ratio(self):
+    profile = Profile(capacity=2)
+    log_points = LogPointsWrap(f_lecture)
+
+    eps_point = golden_ratio(f=log_points, a=0, b=1, eps=1e-3, profile=profile)
+    record = profile.as_record()
+
+    self.assertEqual(eps_point, golden_ratio(f=f_lecture, a=0, b=1, eps=1e-3))
+    self.assertEqual(record['method'], 'golden_ratio')
+    self.assertEqual(record['f_evals'], len(log_points.points))
+    self.assertEqual(record['fd1_evals'], 0)
+    self.assertEqual(record['iterations'], len(log_points.points) - 3)
+    self.assertEqual(len(record['widths']), record['iterations'])
+    self.assertTrue(np.all(np.diff(record['widths']) < 0))
+    self.assertLessEqual(record['widths'][-1] / 2, 1e-3)
+    self.assertGreater(record['wall_time'], 0)
+
+  def test_newton(self):
+    profile = Profile()
+    fd1 = TestNewtonRaphson.newton_f_d1_lecture
+    fd2 = TestNewtonRaphson.newton_f_d2_lecture
+
+    newton(fd1=fd1, fd2=fd2, x0=3, eps=1e-7, use_tau=True, profile=profile)
+
+    self.assertEqual(profile.fd1_evals, 2 * profile.iterations)
+    self.assertEqual(profile.fd2_evals, profile.iterations)
+    self.assertEqual(profile.f_evals, 0)
+
+  def test_reset(self):
+    profile = Profile()
+
+    brute_force(f=f_lecture, a=0, b=1, eps=0.1, profile=profile)
+    self.assertEqual(profile.f_evals, 11)
+
+    brute_force(f=lambda x: x**4 + np.exp(-x), a=0, b=1, eps=1e-3, vectorized=True, block_size=300, profile=profile)
+    self.assertEqual(profile.f_evals, 1001)
+    self.assertEqual(profile.iterations, 4)
+
+  def test_counted_values(self):
+    # the array calls f_lecture rejects aren't counted, only the values used
+    for vectorized in (False, True):
+      with self.subTest(vectorized=vectorized):
+        profile = Profile()
+        brute_force(f=f_lecture, a=0, b=1, eps=0.1, vectorized=vectorized, profile=profile)
+        self.assertEqual(profile.f_evals, 11)
+
+        log_points = LogPointsWrap(f_lecture)
+        multires_brute_force(f=log_points, a=0, b=1, eps=1e-6, vectorized=vectorized, profile=profile)
+        self.assertEqual(profile.f_evals, len(log_points.points))
+
+    # counted in the caller, the workers get f without the profile
+    with ProcessPoolExecutor(max_workers=2) as executor:
+      brute_force(f=f_lecture, a=0, b=1, eps=1e-3, executor=executor, profile=profile)
+      self.assertEqual(profile.f_evals, 1001)
+
+      brute_force(f=np.cos, a=0, b=1, eps=1e-3, vectorized=True, executor=executor, profile=profile)
+      self.assertEqual(profile.f_evals, 1001)
+
+
+class TestBench(unittest.TestCase):
+  def test_run(self):
+    results = bench.run(methods=['golden_ratio', 'newton'], problems=['lecture', 'multi_f2'], epsilons=(1e-2, 1e-4))
+
+    self.assertEqual(len(results['records']), 8)
+    self.assertEqual(len(results['scaling']), 4)
+
+    for record in results['records']:
+      with self.subTest(method=record['method'], problem=record['problem'], eps=record['eps']):
+        self.assertNotIn('error', record)
+        self.assertGreater(record['evals'], 0)
+
+    golden = [record for record in results['records'] if record['method'] == 'golden_ratio' and record['problem'] == 'lecture']
+    self.assertTrue(all(record['x_error'] <= record['eps'] for record in golden))
+
+    results = json.loads(json.dumps(results))
+    self.assertEqual(bench.compare(old=results, new=results), [])
+
+    slower = json.loads(json.dumps(results))
+    slower['records'][0]['evals'] += 1
+    self.assertEqual(len(bench.compare(old=results, new=slower)), 1)
+
+
+class TestTables(unittest.TestCase):
+  PATH = os.path.join(tables.DOC_DIR, 'Функция_П2.txt')
+
+  def test_parse(self):
+    table = tables.parse_table(self.PATH)
+
+    self.assertEqual(table.shape, (40, 40))
+    self.assertEqual(table.bounds, ((50, 3950), (-3950, -50)))
+    self.assertFalse(np.any(np.isnan(table.values)))
+    self.assertEqual(table.at(ix=0, iy=39), 9.00666e-03)
+    self.assertEqual(table.at(ix=1, iy=39), 9.14632e-03)
+    self.assertEqual(table([50, -50]), 9.00666e-03)
+    self.assertAlmostEqual(table([100, -50]), (9.00666e-03 + 9.14632e-03) / 2)
+    self.assertEqual(table([0, 0]), 9.00666e-03)
+    self.assertEqual(table(np.zeros((3, 4, 2))).shape, (3, 4))
+
+  def test_cache(self):
+    with tempfile.TemporaryDirectory() as dir:
+      table = tables.load_table(self.PATH, cache_dir=dir)
+      cached_table = tables.load_table(self.PATH, cache_dir=dir)
+
+      self.assertIsInstance(cached_table.values, np.memmap)
+      self.assertTrue(np.array_equal(table.values, cached_table.values))
+      self.assertEqual(table.origin, cached_table.origin)
+      self.assertEqual(table.step, cached_table.step)
+
+  def test_line_search(self):
+    table = tables.parse_table(self.PATH)
+    f = table.line(origin=[50, -50], direction=[1, 0])
+
+    actual_xy = brute_force(f=f, a=0, b=3900, eps=1, vectorized=True)
+    expected_xy = brute_force(f=f, a=0, b=3900, eps=1)
+
+    self.assertEqual(actual_xy, expected_xy)
+    self.assertEqual(actual_xy.y, table.values[-1].min())
+
+class TestPlot(unittest.TestCase):
+  def test_sample_curve(self):
+    calls = []
+    def f(x):
+      calls.append(x)
+      return 6 * x**2 + 3*x + 5
+
+    x, y = sample_curve(f=f, a=-3, b=1, resolution=101)
+    self.assertEqual(len(calls), 1)
+    self.assertTrue(np.array_equal(x, np.linspace(-3, 1, 101)))
+    self.assertTrue(np.array_equal(y, [f(xi) for xi in x]))
+    self.assertFalse(y.flags.writeable)
+
+    calls.clear()
+    cached_x, cached_y = sample_curve(f=f, a=-3, b=1, resolution=101)
+    self.assertEqual(len(calls), 0)
+    self.assertIs(cached_y, y)
+
+  def test_sample_curve_scalar(self):
+    x, y = sample_curve(f=f_lecture, a=0, b=1, resolution=11)
+
+    self.assertTrue(np.array_equal(y, [f_lecture(xi) for xi in x]))
+
+  def test_resolution(self):
+    fig = matplotlib.figure.Figure(figsize=(4, 3), dpi=100)
+    ax = fig.add_subplot()
+    eps = 0.1
+    log_points = LogPointsWrap(f_lecture)
+    eps_point = parabola(f=log_points, a=0, b=1, eps=eps, get_init_points=get_init_points_gr)
+    k_points = log_points.points
+
+    plot_parabola_meth(ax=ax, f=f_lecture, a=0, b=1, star_point=LECTURE_MIN, eps_point=eps_point, k_points=k_points, eps=eps)
+
+    self.assertEqual(len(ax.lines[0].get_xdata()), get_resolution(ax))
+    self.assertEqual(get_resolution(ax), int(ax.bbox.width * SAMPLES_PER_PIXEL))
+
+class TestReport(unittest.TestCase):
+  def test_run(self):
+    jobs = [job for job in report.JOBS if job.name in ('dich', 'chord')]
+
+    with tempfile.TemporaryDirectory() as dir, ProcessPoolExecutor(max_workers=2) as executor:
+      result = report.run(jobs=jobs, out_dir=dir, executor=executor)
+      self.assertEqual(sorted(result['rendered']), ['chord', 'dich'])
+      self.assertTrue(os.path.exists(os.path.join(dir, 'dich.png')))
+      # only the figures are left in out_dir, the manifest is in the ignored .cache
+      self.assertEqual(sorted(os.listdir(dir)), ['.cache', 'chord.png', 'dich.png'])
+      self.assertTrue(os.path.exists(os.path.join(dir, '.cache', report.MANIFEST)))
+
+      result = report.run(jobs=jobs, out_dir=dir, executor=executor)
+      self.assertEqual(result['rendered'], [])
+      self.assertEqual(sorted(result['skipped']), ['chord', 'dich'])
+
+      jobs[0] = report.Job(name='dich', method='dichotomy', problem='lecture', eps=0.01)
+      result = report.run(jobs=jobs, out_dir=dir, executor=executor)
+      self.assertEqual(result['rendered'], ['dich'])
+      self.assertEqual(result['skipped'], ['chord'])
+
+  def test_sources(self):
+    # the methods run from steps.py through algos
+    self.assertIn('steps.py', report.SOURCES)
+    self.assertNotIn('jit.py', report.SOURCES)
+
+    jobs = [job for job in report.JOBS if job.name == 'dich']
+
+    with tempfile.TemporaryDirectory() as lab_dir, tempfile.TemporaryDirectory() as dir, \
+         ThreadPoolExecutor(max_workers=1) as executor:
+      for name in report.SOURCES:
+        shutil.copy(os.path.join(report.LAB_DIR, name), lab_dir)
+
+      with unittest.mock.patch.object(report, 'LAB_DIR', lab_dir):
+        self.assertEqual(report.run(jobs=jobs, out_dir=dir, executor=executor)['rendered'], ['dich'])
+        self.assertEqual(report.run(jobs=jobs, out_dir=dir, executor=executor)['skipped'], ['dich'])
+
+        with open(os.path.join(lab_dir, 'steps.py'), 'a') as file:
+          file.write('\n')
+        self.assertEqual(report.run(jobs=jobs, out_dir=dir, executor=executor)['rendered'], ['dich'])
+
+  def test_failed(self):
+    job = report.Job(name='newton_diverge', method='newton', problem='newton_lecture', eps=1e-7, x0=3)
+
+    with tempfile.TemporaryDirectory() as dir, ThreadPoolExecutor(max_workers=1) as executor:
+      result = report.run(jobs=[job], out_dir=dir, executor=executor)
+
+    self.assertEqual(list(result['failed']), ['newton_diverge'])
+    self.assertEqual(result['rendered'], [])
+
+class TestAsync(unittest.TestCase):
+  @staticmethod
+  def get_async(f: Callable, delay=0):
+    async def async_f(x):
+      await asyncio.sleep(delay)
+      return f(x)
+
+    return async_f
+
+  def test_same_as_sync(self):
+    f = self.get_async(f_lecture)
+    eps = 1e-3
+
+    for async_method, method in ((brute_force_async, brute_force), (bitwise_search_async, bitwise_search),
+                                 (dichotomy_async, dichotomy), (golden_ratio_async, golden_ratio),
+                                 (k_section_async, k_section), (brent_async, brent), (parabola_async, parabola)):
+      with self.subTest(method=async_method.__name__):
+        self.assertEqual(asyncio.run(async_method(f=f, a=0, b=1, eps=eps)), method(f=f_lecture, a=0, b=1, eps=eps))
+
+    get_L = lambda *args, **kwargs: 3.64
+    self.assertEqual(asyncio.run(polygonal_chain_async(f=f, a=0, b=1, eps=eps, get_L=get_L)),
+                     polygonal_chain(f=f_lecture, a=0, b=1, eps=eps, get_L=get_L))
+    self.assertEqual(asyncio.run(parallel_polygonal_chain_async(f=f, a=0, b=1, eps=eps, get_L=get_L, k=4)),
+                     parallel_polygonal_chain(f=f_lecture, a=0, b=1, eps=eps, get_L=get_L, k=4))
+    multi_f1 = lambda x: math.cos(x) / x**2
+    self.assertEqual(asyncio.run(polygonal_chain_async(f=self.get_async(multi_f1), a=1, b=12, eps=eps)),
+                     polygonal_chain(f=multi_f1, a=1, b=12, eps=eps))
+
+    self.assertEqual(asyncio.run(parabola_async(f=f, a=0, b=1, eps=eps, get_init_points=get_init_points_gr_async)),
+                     parabola(f=f_lecture, a=0, b=1, eps=eps, get_init_points=get_init_points_gr))
+    self.assertEqual(asyncio.run(midpoint_async(f=self.get_async(f_lecture_deriv), a=0, b=1, eps=eps)),
+                     midpoint(f=f_lecture_deriv, a=0, b=1, eps=eps))
+    self.assertEqual(asyncio.run(chord_async(f=self.get_async(f_lecture_deriv), a=0, b=1, eps=eps)),
+                     chord(f=f_lecture_deriv, a=0, b=1, eps=eps))
+
+    fd1, fd2 = lambda x: math.atan(x), lambda x: 1 / (1 + x * x)
+    self.assertEqual(asyncio.run(newton_async(fd1=self.get_async(fd1), fd2=self.get_async(fd2), x0=1, eps=eps, use_tau=True)),
+                     newton(fd1=fd1, fd2=fd2, x0=1, eps=eps, use_tau=True))
+
+  def test_sync_objective(self):
+    self.assertEqual(asyncio.run(golden_ratio_async(f=f_lecture, a=0, b=1, eps=1e-3)), golden_ratio(f=f_lecture, a=0, b=1, eps=1e-3))
+
+  def test_profile(self):
+    expected, actual = Profile(), Profile()
+    golden_ratio(f=f_lecture, a=0, b=1, eps=1e-6, profile=expected)
+    asyncio.run(golden_ratio_async(f=self.get_async(f_lecture), a=0, b=1, eps=1e-6, profile=actual))
+
+    self.assertEqual(actual.method, 'golden_ratio_async')
+    self.assertEqual(actual.f_evals, expected.f_evals)
+    np.testing.assert_array_equal(actual.widths, expected.widths)
+    self.assertGreater(actual.wall_time, 0)
+
+  def test_checkpoint(self):
+    with tempfile.TemporaryDirectory() as dir:
+      path = os.path.join(dir, 'run.pickle')
+      calls = 0
+      async def interrupted_f(x):
+        nonlocal calls
+        calls += 1
+        if calls > 10:
+          raise TestCheckpoint.Interrupt()
+        return f_lecture(x)
+
+      with self.assertRaises(TestCheckpoint.Interrupt):
+        asyncio.run(dichotomy_async(f=interrupted_f, a=0, b=1, eps=1e-6, checkpoint=Checkpoint(path=path, every=1)))
+
+      log_points = LogPointsWrap(f_lecture)
+      expected_xy = dichotomy(f=log_points, a=0, b=1, eps=1e-6)
+      resumed_points = LogPointsWrap(f_lecture)
+      self.assertEqual(asyncio.run(dichotomy_async(f=self.get_async(resumed_points), a=0, b=1, eps=1e-6,
+                                                   checkpoint=Checkpoint(path=path, every=1))), expected_xy)
+      self.assertEqual(len(resumed_points.points), len(log_points.points) - 10)
+      self.assertFalse(os.path.exists(path))
+
+  def test_brute_force_concurrent(self):
+    in_flight, peak = 0, 0
+    async def f(x):
+      nonlocal in_flight, peak
+      in_flight += 1
+      peak = max(peak, in_flight)
+      await asyncio.sleep(0)
+      in_flight -= 1
+      return f_lecture(x)
+
+    actual_xy = asyncio.run(brute_force_async(f=f, a=0, b=1, eps=1e-2, concurrency=16))
+
+    self.assertEqual(actual_xy, brute_force(f=f_lecture, a=0, b=1, eps=1e-2))
+    # the grid is evaluated 16 points at a time, not one by one
+    self.assertEqual(peak, 16)
+
+    peak = 0
+    asyncio.run(dichotomy_async(f=f, a=0, b=1, eps=1e-3))
+    self.assertEqual(peak, 2)
+
+
+class TestJit(unittest.TestCase):
+  def get_cases(self):
+    return {
+      'dichotomy': (jit.dichotomy, dichotomy, f_lecture, {'eps': 1e-9}),
+      'golden_ratio': (jit.golden_ratio, golden_ratio, f_lecture, {'eps': 1e-9}),
+      'parabola': (jit.parabola, parabola, f_lecture, {'eps': 1e-9}),
+      'parabola_gr': (jit.parabola, parabola, f_lecture, {'eps': 1e-9, 'get_init_points': get_init_points_gr}),
+      'midpoint': (jit.midpoint, midpoint, f_lecture_deriv, {'eps': 1e-9}),
+      'chord': (jit.chord, chord, f_lecture_deriv, {'eps': 1e-12}),
+    }
+
+  def test_kernels(self):
+    # the loops numba compiles, run uncompiled
+    eps = 1e-9
+    self.assertEqual(Point(*jit._dichotomy(f_lecture)(0.0, 1.0, eps)), dichotomy(f=f_lecture, a=0, b=1, eps=eps))
+    self.assertEqual(Point(*jit._golden_ratio(f_lecture)(0.0, 1.0, eps)), golden_ratio(f=f_lecture, a=0, b=1, eps=eps))
+    self.assertEqual(jit._parabola(f_lecture)(0.25, 0.5, 0.75, *map(f_lecture, (0.25, 0.5, 0.75)), eps),
+                     parabola(f=f_lecture, a=0, b=1, eps=eps).x)
+    self.assertEqual(jit._midpoint(f_lecture_deriv)(0.0, 1.0, eps), midpoint(f=f_lecture_deriv, a=0, b=1, eps=eps).x)
+    self.assertEqual(jit._chord(f_lecture_deriv)(0.0, 1.0, 1e-12), chord(f=f_lecture_deriv, a=0, b=1, eps=1e-12).x)
+
+  @unittest.skipIf(jit.ENABLED, 'numba is installed')
+  def test_fallback(self):
+    for name, (method, reference, f, kwargs) in self.get_cases().items():
+      with self.subTest(method=name):
+        self.assertEqual(method(f=f, a=0, b=1, **kwargs), reference(f=f, a=0, b=1, **kwargs))
+
+  @unittest.skipUnless(jit.ENABLED, 'numba is not installed')
+  def test_compiled(self):
+    for name, (method, reference, f, kwargs) in self.get_cases().items():
+      with self.subTest(method=name):
+        jitted = jit._jit(f)
+        self.assertIsNotNone(jitted)
+
+        # the compiled f may round differently from the python one in the last bit, which parabola turns into
+        # about 1e-8 in x, so the methods of algos get the compiled f too and must agree exactly
+        self.assertEqual(method(f=f, a=0, b=1, **kwargs), reference(f=jitted, a=0, b=1, **kwargs))
+
+  @unittest.skipUnless(jit.ENABLED, 'numba is not installed')
+  def test_specialized(self):
+    jitted = jit._jit(f_lecture)
+    jit.golden_ratio(f=f_lecture, a=0, b=1, eps=1e-6)
+
+    # compiled once per f, with f built in instead of passed to the kernel
+    kernel = jit._compile(jit._golden_ratio, jitted)
+    self.assertIs(jit._compile(jit._golden_ratio, jit._jit(f_lecture)), kernel)
+    self.assertEqual(len(kernel.signatures), 1)
+    self.assertEqual(len(kernel.signatures[0]), 3)
+
+  def test_uncompilable(self):
+    # objects, AutoDiff and profiled runs go to the methods of algos
+    log_points = LogPointsWrap(f_lecture)
+    self.assertEqual(jit.golden_ratio(f=log_points, a=0, b=1, eps=1e-6), golden_ratio(f=f_lecture, a=0, b=1, eps=1e-6))
+    self.assertGreater(len(log_points.points.x), 0)
+
+    f_autodiff = AutoDiff(TestAutoDiff.f_lecture)
+    self.assertEqual(jit.midpoint(f=f_autodiff, a=0, b=1, eps=1e-9), midpoint(f=f_autodiff, a=0, b=1, eps=1e-9))
+
+    profile = Profile()
+    jit.dichotomy(f=f_lecture, a=0, b=1, eps=1e-6, profile=profile)
+    self.assertGreater(profile.f_evals, 0)
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -1,18 +1,424 @@
-from typing import Callable, Any
+from typing import Callable, Any, Sequence
+from concurrent.futures import Executor
 from dataclasses import dataclass
+from collections import OrderedDict
+import shelve
+import pickle
+import math
+import os
+import time
+import numpy as np
 
-@dataclass(order=True)
+@dataclass(order=True, slots=True)
 class Point:
   x: Any
   y: Any
 
+class Trace:
+  """
+  sequence of points stored as two growable numpy columns,
+  indexing and iteration give Point copies, x and y give the columns without copying
+  """
+  def __init__(self, capacity: int=64):
+    assert capacity > 0
+
+    self._x = np.empty(capacity)
+    self._y = np.empty(capacity)
+    self._len = 0
+
+  @property
+  def x(self)->np.ndarray:
+    return self._x[:self._len]
+
+  @property
+  def y(self)->np.ndarray:
+    return self._y[:self._len]
+
+  def append(self, x, y):
+    if self._len == len(self._x):
+      self._x = np.concatenate([self._x, np.empty_like(self._x)])
+      self._y = np.concatenate([self._y, np.empty_like(self._y)])
+
+    try:
+      self._x[self._len] = x
+      self._y[self._len] = y
+    except (TypeError, ValueError):
+      # arrays (vectorized calls) or None don't fit in a float column
+      self._x = self._x.astype(object)
+      self._y = self._y.astype(object)
+      self._x[self._len] = x
+      self._y[self._len] = y
+
+    self._len += 1
+
+  def __len__(self):
+    return self._len
+
+  def __getitem__(self, ind):
+    if isinstance(ind, slice):
+      return [Point(x=x, y=y) for x, y in zip(self.x[ind], self.y[ind])]
+
+    if ind < 0:
+      ind += self._len
+    if not 0 <= ind < self._len:
+      raise IndexError('trace index out of range')
+
+    return Point(x=self._x[ind], y=self._y[ind])
+
+  def __iter__(self):
+    return (Point(x=x, y=y) for x, y in zip(self.x, self.y))
+
+  def __add__(self, other)->list[Point]:
+    return list(self) + list(other)
+
+def get_xy(points: Trace | list[Point])->tuple[np.ndarray, np.ndarray]:
+  """
+  x and y columns of points, without copying for a Trace
+  """
+  if isinstance(points, Trace):
+    return points.x, points.y
+
+  return np.array([point.x for point in points]), np.array([point.y for point in points])
+
 class LogPointsWrap:
   def __init__(self, f:Callable[[Any], Any]):
-    self.points = []
+    self.points = Trace()
     self._f = f
 
   def __call__(self, x):
     y = self._f(x)
-    self.points.append(Point(x=x, y=y))
+    self.points.append(x=x, y=y)
+
+    return y
+
+class CachedWrap:
+  """
+  memoizes a scalar objective
+  :param maxsize: max number of values kept in memory (least recently used are evicted), None for unbounded
+  :param grid: if set, x is snapped to the grid of this step and f is evaluated at the snapped x,
+               so points closer than grid/2 share a value
+  :param path: if set, values are also kept in a shelve file at this path and reused by later runs;
+               one file should be used for one objective only
+  """
+  def __init__(self, f: Callable[[Any], Any], maxsize: int | None=None, grid=None, path=None):
+    assert maxsize is None or maxsize > 0
+    assert grid is None or grid > 0
+
+    self._f = f
+    self._maxsize = maxsize
+    self._grid = grid
+    self._cache = OrderedDict()
+    self._store = shelve.open(path) if path is not None else None
+    self.hits = 0
+    self.misses = 0
+
+  def _key(self, x):
+    if self._grid is None:
+      return float(x)
+
+    # the snapped x rather than its index on the grid: a store filled with another grid must not give another point's value
+    return round(x / self._grid) * self._grid
+
+  def _lookup(self, key)->tuple[bool, Any]:
+    if key in self._cache:
+      self._cache.move_to_end(key)
+      return True, self._cache[key]
+
+    store_key = repr(key)
+    if self._store is not None and store_key in self._store:
+      y = self._store[store_key]
+      self._remember(key=key, y=y)
+      return True, y
+
+    return False, None
+
+  def _remember(self, key, y):
+    self._cache[key] = y
+    if self._maxsize is not None and len(self._cache) > self._maxsize:
+      self._cache.popitem(last=False)
+
+  def _put(self, key, y):
+    if self._store is not None:
+      self._store[repr(key)] = y
+    self._remember(key=key, y=y)
+
+  def __call__(self, x):
+    key = self._key(x)
+
+    found, y = self._lookup(key)
+    if found:
+      self.hits += 1
+      return y
+
+    self.misses += 1
+    y = self._f(x if self._grid is None else key)
+    self._put(key=key, y=y)
+
+    return y
+
+  def map(self, x, executor: Executor | None=None)->list:
+    """
+    [self(el) for el in x], the points missing from the cache are evaluated once each and together,
+    by executor if it's set
+    """
+    values = {}
+    new_x = {}
+    for el in x:
+      key = self._key(el)
+      if key in values or key in new_x: continue
+
+      found, y = self._lookup(key)
+      if found:
+        values[key] = y
+      else:
+        new_x[key] = el if self._grid is None else key
+
+    new_y = map(self._f, new_x.values()) if executor is None else executor.map(self._f, list(new_x.values()))
+    for key, y in zip(new_x, new_y):
+      self._put(key=key, y=y)
+      values[key] = y
+
+    self.misses += len(new_x)
+    self.hits += len(x) - len(new_x)
+
+    return [values[self._key(el)] for el in x]
+
+  def __contains__(self, x):
+    key = self._key(x)
+    return key in self._cache or self._store is not None and repr(key) in self._store
+
+  def __len__(self):
+    return len(self._cache)
+
+  def close(self):
+    if self._store is not None:
+      self._store.close()
+      self._store = None
+
+  def __enter__(self):
+    return self
+
+  def __exit__(self, *args):
+    self.close()
+
+def get_chunk_size(n: int)->int:
+  """
+  splits n points into about 4 tasks per cpu
+  """
+  return max(1, math.ceil(n / (4 * (os.cpu_count() or 1))))
+
+def eval_vectorized(f: Callable[[Any], Any], x: np.ndarray):
+  """
+  calls f once on the whole array
+  :return: array of values or None if f doesn't accept arrays
+  """
+  # f of a profile counts the values only if they are taken
+  counted = f if isinstance(f, _CountWrap) else None
+  if counted is not None:
+    f = counted.f
+
+  try:
+    y = np.asarray(f(x), dtype=float)
+  except (TypeError, ValueError):
+    return None
+
+  if y.shape != x.shape:
+    return None
+
+  if counted is not None:
+    counted.add(y.size)
+
+  return y
+
+def _eval_chunk(f: Callable[[Any], Any], x, vectorized=False)->tuple[Sequence, bool]:
+  """
+  :return: values of f at x and whether f accepted the whole x at once
+  """
+  if vectorized:
+    y = eval_vectorized(f=f, x=np.asarray(x, dtype=float))
+    if y is not None:
+      return y, True
+
+  return [f(el) for el in x], False
+
+def eval_chunks(f: Callable[[Any], Any], x, executor: Executor | None=None, chunk_size=None,
+                vectorized=False)->tuple[Sequence, bool]:
+  """
+  values of f at x, split into chunks evaluated by executor if it's set
+  :param chunk_size: number of points per task, about 4 tasks per cpu by default
+  :param vectorized: try a single call of f on each chunk first
+  :return: the values and whether f accepted every chunk as an array
+  """
+  if executor is None:
+    return _eval_chunk(f=f, x=x, vectorized=vectorized)
+
+  if chunk_size is None:
+    chunk_size = get_chunk_size(len(x))
+  assert chunk_size > 0
+
+  # the workers get f of a profile without it, the values are counted here where the profile is
+  counted = f if isinstance(f, _CountWrap) else None
+  if counted is not None:
+    f = counted.f
+
+  futures = [executor.submit(_eval_chunk, f, x[start:start + chunk_size], vectorized) for start in range(0, len(x), chunk_size)]
+
+  y = []
+  for future in futures:
+    y_chunk, accepted = future.result()
+    y.extend(y_chunk)
+    vectorized = vectorized and accepted
+
+  if counted is not None:
+    counted.add(len(y))
+
+  return y, vectorized
+
+def eval_points(f: Callable[[Any], Any], x, executor: Executor | None=None, chunk_size=None, vectorized=False)->np.ndarray:
+  """
+  [f(el) for el in x] as eval_chunks
+  """
+  return np.asarray(eval_chunks(f=f, x=x, executor=executor, chunk_size=chunk_size, vectorized=vectorized)[0])
+
+class Profile:
+  """
+  collects the cost of one method run: evaluations of f, f' and f'', iterations,
+  the bracket width after each iteration and the wall time.
+  Pass it as profile= to any method of algos; it is reset at the start of each run.
+  """
+  def __init__(self, capacity: int=1024):
+    assert capacity > 0
+
+    self._widths = np.empty(capacity)
+    self.running = False
+    self.reset()
+
+  def reset(self, method: str | None=None):
+    self.method = method
+    self._evals = [0, 0, 0]
+    self.iterations = 0
+    self.wall_time = 0.0
+
+  @property
+  def f_evals(self)->int:
+    return self._evals[0]
+
+  @property
+  def fd1_evals(self)->int:
+    return self._evals[1]
+
+  @property
+  def fd2_evals(self)->int:
+    return self._evals[2]
+
+  @property
+  def widths(self)->np.ndarray:
+    return self._widths[:self.iterations]
+
+  def wrap(self, f: Callable[[Any], Any], name: str)->Callable[[Any], Any]:
+    """
+    :param name: one of 'f', 'fd1', 'fd2'
+    """
+    return _CountWrap(f=f, evals=self._evals, ind=('f', 'fd1', 'fd2').index(name))
+
+  def iteration(self, width=math.nan):
+    if self.iterations == len(self._widths):
+      self._widths = np.concatenate([self._widths, np.empty_like(self._widths)])
+
+    self._widths[self.iterations] = width
+    self.iterations += 1
+
+  def as_record(self)->dict:
+    return {
+      'method': self.method,
+      'f_evals': self.f_evals,
+      'fd1_evals': self.fd1_evals,
+      'fd2_evals': self.fd2_evals,
+      'iterations': self.iterations,
+      'wall_time': self.wall_time,
+      'widths': self.widths.copy(),
+    }
+
+class _CountWrap:
+  """
+  counts the calls of f that return, np.size(x) values each; eval_vectorized counts its calls itself
+  """
+  def __init__(self, f: Callable[[Any], Any], evals: list[int], ind: int):
+    self.f = f
+    self._evals = evals
+    self._ind = ind
+
+  def add(self, n: int):
+    self._evals[self._ind] += n
+
+  def __call__(self, x):
+    y = self.f(x)
+    self._evals[self._ind] += np.size(x)
 
     return y
+
+class Checkpoint:
+  """
+  snapshots the state of a method run to a file every `every` iterations and/or every `interval` seconds.
+  Pass it as checkpoint= to an iterative method of algos: if the file holds a snapshot of the same method
+  run with the same arguments, the run continues from it without repeating the evaluations done before it.
+  The file is removed when the run returns.
+  """
+  def __init__(self, path, every: int | None=None, interval=None):
+    assert every is not None or interval is not None
+    assert every is None or every > 0
+    assert interval is None or interval > 0
+
+    self.path = path
+    self.every = every
+    self.interval = interval
+    self.saves = 0
+    self.start(method=None)
+
+  def start(self, method: str | None):
+    self.method = method
+    self._args = None
+    self._iterations = 0
+    self._saved_at = time.monotonic()
+
+  def resume(self, *args)->dict | None:
+    """
+    :param args: the arguments that determine the run, a snapshot of other ones is an error
+    :return: state of the snapshot or None if there is none
+    """
+    self._args = args
+
+    try:
+      with open(self.path, 'rb') as file:
+        snapshot = pickle.load(file)
+    except FileNotFoundError:
+      return None
+
+    if snapshot['method'] != self.method or snapshot['args'] != args:
+      raise ValueError(f"{self.path} holds a snapshot of {snapshot['method']}{snapshot['args']}, "
+                       f"not of {self.method}{args}")
+
+    return snapshot['state']
+
+  def iteration(self, get_state: Callable[[], dict]):
+    """
+    :param get_state: returns the state to resume from, called only when a snapshot is due
+    """
+    self._iterations += 1
+
+    if ((self.every is not None and self._iterations % self.every == 0) or
+        (self.interval is not None and time.monotonic() - self._saved_at >= self.interval)):
+      self.save(get_state())
+
+  def save(self, state: dict):
+    tmp_path = f'{self.path}.tmp'
+    with open(tmp_path, 'wb') as file:
+      pickle.dump({'method': self.method, 'args': self._args, 'state': state}, file)
+    os.replace(tmp_path, self.path)
+
+    self.saves += 1
+    self._saved_at = time.monotonic()
+
+  def clear(self):
+    if os.path.exists(self.path):
+      os.remove(self.path)